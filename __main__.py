@@ -1,9 +1,8 @@
-from pulumi.provider.experimental import component_provider_host
-
-from pulumi_aws_vpc import VPC
+from pulumi_aws_vpc import VPC, VPCFleet
+from pulumi_aws_vpc.provider import component_provider_host
 
 if __name__ == "__main__":
     component_provider_host(
-        components=[VPC],
+        components=[VPC, VPCFleet],
         name="aws-networking",
     )
@@ -0,0 +1,165 @@
+"""Shared runner for the benchmark suites.
+
+A suite is a list of `Case` objects. Every case is timed several times (best run
+wins), then run once more under tracemalloc to record peak memory. Results are
+compared against a JSON baseline stored in `benchmarks/baselines/<suite>.json`
+and the run fails when a case is slower or heavier than the baseline by more
+than the allowed tolerance, or slower than its own absolute time budget.
+
+    python -m benchmarks.allocator             # compare against the baseline
+    python -m benchmarks.allocator --update    # record a new baseline
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[Any], Any]
+    setup: Callable[[], Any] = lambda: None
+    repeat: int = 3
+    budget_seconds: float | None = None
+
+
+@dataclass
+class Result:
+    name: str
+    seconds: float
+    peak_bytes: int
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "seconds": round(self.seconds, 6),
+            "peak_bytes": self.peak_bytes,
+            **self.extra,
+        }
+
+
+def measure(case: Case) -> Result:
+    timings = []
+    extra: dict[str, Any] = {}
+    for _ in range(case.repeat):
+        workload = case.setup()
+        gc.collect()
+        start = time.perf_counter()
+        outcome = case.run(workload)
+        timings.append(time.perf_counter() - start)
+        if isinstance(outcome, dict):
+            extra = outcome
+
+    workload = case.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run(workload)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Result(case.name, min(timings), peak, extra)
+
+
+def compare(
+    results: list[Result],
+    baseline: dict[str, dict[str, Any]],
+    time_tolerance: float,
+    memory_tolerance: float,
+) -> list[str]:
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            continue
+        if result.seconds > reference["seconds"] * time_tolerance:
+            regressions.append(
+                f"{result.name}: {result.seconds:.4f}s vs baseline "
+                f"{reference['seconds']:.4f}s (tolerance x{time_tolerance})"
+            )
+        if result.peak_bytes > reference["peak_bytes"] * memory_tolerance:
+            regressions.append(
+                f"{result.name}: peak {result.peak_bytes} B vs baseline "
+                f"{reference['peak_bytes']} B (tolerance x{memory_tolerance})"
+            )
+    return regressions
+
+
+def check_budgets(results: list[Result], cases: list[Case]) -> list[str]:
+    budgets = {case.name: case.budget_seconds for case in cases}
+    return [
+        f"{result.name}: {result.seconds:.4f}s exceeds budget {budget:.4f}s"
+        for result in results
+        if (budget := budgets.get(result.name)) is not None and result.seconds > budget
+    ]
+
+
+def main(
+    suite: str,
+    cases: list[Case],
+    argv: list[str] | None = None,
+    report: Callable[[list[Result]], None] | None = None,
+) -> int:
+    parser = argparse.ArgumentParser(prog=f"python -m benchmarks.{suite}")
+    parser.add_argument("--update", action="store_true", help="rewrite the baseline")
+    parser.add_argument("-k", "--filter", default="", help="run matching cases only")
+    parser.add_argument(
+        "--baseline", type=Path, default=BASELINES_DIR / f"{suite}.json"
+    )
+    parser.add_argument("--time-tolerance", type=float, default=1.5)
+    parser.add_argument("--memory-tolerance", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    results = []
+    for case in cases:
+        if args.filter not in case.name:
+            continue
+        result = measure(case)
+        results.append(result)
+        extra = " ".join(f"{k}={v}" for k, v in result.extra.items())
+        print(
+            f"{result.name:<48} {result.seconds * 1000:>10.2f} ms "
+            f"{result.peak_bytes / 1024:>10.1f} KiB {extra}"
+        )
+
+    if report is not None:
+        report(results)
+
+    baseline: dict[str, Any] = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    if args.update:
+        baseline["environment"] = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        }
+        cases_baseline = baseline.setdefault("cases", {})
+        cases_baseline.update({result.name: result.as_dict() for result in results})
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(
+        results,
+        baseline.get("cases", {}),
+        args.time_tolerance,
+        args.memory_tolerance,
+    )
+    regressions += check_budgets(results, cases)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
@@ -0,0 +1,39 @@
+"""Pulumi mocks shared by the benchmark suites that construct components."""
+
+from collections import Counter
+from typing import Any
+
+import pulumi
+
+
+class CountingMocks(pulumi.runtime.Mocks):
+    """Echoes inputs back as state and counts registered resources and invokes."""
+
+    def __init__(self) -> None:
+        self.resources: Counter[str] = Counter()
+        self.invokes: Counter[str] = Counter()
+
+    def new_resource(
+        self, args: pulumi.runtime.MockResourceArgs
+    ) -> tuple[str, dict[str, Any]]:
+        self.resources[args.typ] += 1
+        state = dict(args.inputs)
+        if state.get("amazonProvidedIpv6CidrBlock") or state.get(
+            "assignGeneratedIpv6CidrBlock"
+        ):
+            state["ipv6CidrBlock"] = "2a05:d014:0:100::/56"
+        return f"{args.name}-id", state
+
+    def call(self, args: pulumi.runtime.MockCallArgs) -> dict[str, Any]:
+        self.invokes[args.token] += 1
+        if args.token == "aws:index/getAvailabilityZones:getAvailabilityZones":
+            return {"zoneIds": ["euc1-az1", "euc1-az2", "euc1-az3"]}
+        if args.token == "aws-native:index:getRegion":
+            return {"region": "eu-central-1"}
+        return {}
+
+
+def run_with_mocks(mocks: pulumi.runtime.Mocks, fn: Any) -> None:
+    """Run `fn` under `mocks` and wait until every registration has finished."""
+    pulumi.runtime.set_mocks(mocks, preview=False)
+    pulumi.runtime.test(fn)()
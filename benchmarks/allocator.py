@@ -0,0 +1,97 @@
+"""Micro-benchmarks for `divide_supernet_into_subnets`.
+
+Workloads mix prefix lengths inside a fixed supernet per IP version and feed
+them in different orders:
+
+- random: prefix lengths drawn uniformly from the range
+- ascending: smallest subnets first, so every larger subnet needs a fresh
+  aligned block further away
+- descending: largest subnets first, the friendliest order
+- interleaved: smallest and largest alternate, which keeps splitting blocks
+  and leaves the most fragments behind
+- tiered: runs of equal prefix lengths, one subnet per AZ like subnet tiers
+  expand to
+
+The stream cases place /64s (or nibble-aligned /62s) from an IPv6 pool with
+`iter_ipv6_subnets` and drop them as they come, up to a million subnets, to
+show its memory doesn't grow with the number of subnets.
+"""
+
+import itertools
+import random
+import sys
+from collections import deque
+
+from benchmarks._harness import Case, main
+from pulumi_aws_vpc.allocator import iter_ipv6_subnets
+from pulumi_aws_vpc.utils import divide_supernet_into_subnets
+
+SUPERNETS = {
+    "ipv4": ("10.0.0.0/8", (24, 28)),
+    "ipv6": ("2001:db8::/32", (48, 64)),
+}
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+ORDERS = ["random", "ascending", "descending", "interleaved", "tiered"]
+AZS = 6
+STREAM_POOL = "2001:db8::/32"
+STREAM_SIZES = [10_000, 1_000_000]
+
+
+def generate_workload(
+    ip_version: str, size: int, order: str, seed: int = 0
+) -> tuple[str, list[int]]:
+    supernet, (shortest, longest) = SUPERNETS[ip_version]
+    rng = random.Random(seed)
+    prefix_lengths = [rng.randint(shortest, longest) for _ in range(size)]
+    if order == "ascending":
+        prefix_lengths.sort(reverse=True)
+    elif order == "descending":
+        prefix_lengths.sort()
+    elif order == "interleaved":
+        prefix_lengths.sort()
+        half = len(prefix_lengths) // 2
+        largest, smallest = prefix_lengths[:half], prefix_lengths[half:][::-1]
+        prefix_lengths = [p for pair in zip(smallest, largest) for p in pair]
+        prefix_lengths += smallest[len(largest) :]
+    elif order == "tiered":
+        prefix_lengths = [
+            p for p in prefix_lengths[: -(-size // AZS)] for _ in range(AZS)
+        ]
+        prefix_lengths = prefix_lengths[:size]
+    elif order != "random":
+        raise ValueError(f"Unknown order: {order}")
+    return supernet, prefix_lengths
+
+
+def build_cases() -> list[Case]:
+    cases = []
+    for ip_version in SUPERNETS:
+        for size in SIZES:
+            for order in ORDERS:
+                cases.append(
+                    Case(
+                        name=f"{ip_version}-{order}-{size}",
+                        setup=lambda v=ip_version, s=size, o=order: generate_workload(
+                            v, s, o
+                        ),
+                        run=lambda workload: divide_supernet_into_subnets(*workload),
+                        repeat=5 if size <= 10_000 else 2,
+                    )
+                )
+    for size in STREAM_SIZES:
+        for prefixlen, nibble_aligned in ((64, False), (62, True)):
+            cases.append(
+                Case(
+                    name=f"ipv6-stream{'-nibble' if nibble_aligned else ''}-{size}",
+                    run=lambda _, s=size, p=prefixlen, n=nibble_aligned: deque(
+                        iter_ipv6_subnets(STREAM_POOL, itertools.repeat(p, s), n),
+                        maxlen=0,
+                    ),
+                    repeat=3 if size <= 10_000 else 1,
+                )
+            )
+    return cases
+
+
+if __name__ == "__main__":
+    sys.exit(main("allocator", build_cases()))
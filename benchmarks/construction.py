@@ -0,0 +1,232 @@
+"""Offline benchmarks for constructing the VPC component under Pulumi mocks.
+
+Configs are generated with N subnets, M route tables and K routes per route
+table, from a handful of resources to more than 5,000. Besides wall time and
+peak memory (for construction plus registration with the mock engine) every
+case reports the time spent in `VPC.__init__` alone, the number of registered
+resources and invokes, and how many Output applies each phase created.
+
+The fleet cases build a `VPCFleet` of small VPCs, to check that construction
+time per member stays flat as the fleet grows. The plan cases compare planning
+a validated config with loading the same plan from a warm plan cache. The
+bulk-routes cases build the same configs with one `RouteSet` per route table.
+"""
+
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import pulumi
+
+from benchmarks._harness import Case, main
+from benchmarks._mocks import CountingMocks, run_with_mocks
+from pulumi_aws_vpc import VPC, VPCFleet, lookups, planner
+from pulumi_aws_vpc.config import VPCConfig
+from pulumi_aws_vpc.plan_cache import PlanCache
+
+NEXT_HOPS = ["igw", "vgw", "tgw-0123456789abcdef0", "eni-0123456789abcdef0"]
+# (subnets, route tables, routes per route table)
+SCALES = {
+    "small": (6, 2, 5),
+    "medium": (60, 10, 20),
+    "large": (300, 30, 50),
+    "xlarge": (1200, 60, 50),
+}
+FLEET_SIZES = [10, 50, 150]
+
+
+def generate_config(subnets: int, route_tables: int, routes: int) -> dict[str, Any]:
+    return {
+        "name": f"bench-{subnets}-{route_tables}-{routes}",
+        "cidrs": {"ipv4": [{"cidr": "10.0.0.0/8"}], "ipv6": [{}]},
+        "subnets": [
+            {
+                "name": f"subnet-{i}",
+                "az_id": i % 3 + 1,
+                "ipv4": {"size": 24},
+                "ipv6": {} if i < 200 else None,
+                "route_table": f"rt-{i % route_tables}",
+            }
+            for i in range(subnets)
+        ],
+        "internet_gateway": {},
+        "virtual_private_gateway": {},
+        "route_tables": [
+            {
+                "name": f"rt-{i}",
+                "routes": [
+                    {
+                        "destination": f"172.{16 + j // 256}.{j % 256}.0/24",
+                        "next_hop": NEXT_HOPS[j % len(NEXT_HOPS)],
+                    }
+                    for j in range(routes)
+                ],
+            }
+            for i in range(route_tables)
+        ],
+        "endpoints": [
+            {
+                "name": "s3",
+                "service": "s3",
+                "type": "Gateway",
+                "route_tables": [f"rt-{i}" for i in range(route_tables)],
+            }
+        ],
+    }
+
+
+def generate_fleet_config(vpcs: int) -> dict[str, Any]:
+    members = []
+    for i in range(vpcs):
+        member = generate_config(6, 2, 5)
+        member["name"] = f"vpc-{i}"
+        member["cidrs"]["ipv4"] = [{"size": 20}]
+        members.append(member)
+    return {"supernet": "10.0.0.0/8", "vpcs": members}
+
+
+@contextmanager
+def count_applies_per_phase() -> Iterator[Counter[str]]:
+    """Count Output.apply calls made while each VPC phase runs.
+
+    Applies made by the SDK while resources are registered asynchronously, after
+    `VPC.__init__` has returned, are counted under "registration".
+    """
+    applies: Counter[str] = Counter()
+    current = ["registration"]
+    original_apply = pulumi.Output.apply
+    original_phase = VPC._phase
+
+    def apply(self: Any, *args: Any, **kwargs: Any) -> Any:
+        applies[current[0]] += 1
+        return original_apply(self, *args, **kwargs)
+
+    @contextmanager
+    def phase(vpc: VPC, name: str) -> Iterator[None]:
+        previous, current[0] = current[0], name
+        try:
+            with original_phase(vpc, name):
+                yield
+        finally:
+            current[0] = previous
+
+    pulumi.Output.apply = apply  # type: ignore[method-assign]
+    VPC._phase = phase  # type: ignore[method-assign,assignment]
+    try:
+        yield applies
+    finally:
+        pulumi.Output.apply = original_apply  # type: ignore[method-assign]
+        VPC._phase = original_phase  # type: ignore[method-assign]
+
+
+def construct(config: dict[str, Any]) -> dict[str, Any]:
+    mocks = CountingMocks()
+    lookups.facts_cache = lookups.FactsCache()
+    lookups.ReferenceLookups.shared.clear()
+    construct_seconds = 0.0
+
+    def build() -> None:
+        nonlocal construct_seconds
+        start = time.perf_counter()
+        VPC("vpc", config)
+        construct_seconds = time.perf_counter() - start
+
+    with count_applies_per_phase() as applies:
+        run_with_mocks(mocks, build)
+    return {
+        "construct_seconds": round(construct_seconds, 6),
+        "resources": sum(mocks.resources.values()),
+        "invokes": sum(mocks.invokes.values()),
+        "applies": dict(applies),
+    }
+
+
+def construct_fleet(config: dict[str, Any]) -> dict[str, Any]:
+    mocks = CountingMocks()
+    lookups.facts_cache = lookups.FactsCache()
+    lookups.ReferenceLookups.shared.clear()
+    construct_seconds = 0.0
+
+    def build() -> None:
+        nonlocal construct_seconds
+        start = time.perf_counter()
+        VPCFleet("fleet", config)
+        construct_seconds = time.perf_counter() - start
+
+    run_with_mocks(mocks, build)
+    return {
+        "construct_seconds": round(construct_seconds, 6),
+        "construct_seconds_per_vpc": round(construct_seconds / len(config["vpcs"]), 6),
+        "resources": sum(mocks.resources.values()),
+        "invokes": sum(mocks.invokes.values()),
+    }
+
+
+def with_bulk_routes(config: dict[str, Any]) -> dict[str, Any]:
+    for route_table in config["route_tables"]:
+        route_table["bulk_routes"] = True
+    return config
+
+
+def warm_plan_cache(config: VPCConfig) -> PlanCache:
+    cache = PlanCache(tempfile.mkdtemp(prefix="vpc-plans-"))
+    cache.get_or_plan(config)
+    return cache
+
+
+def plan_cases(scale: str) -> list[Case]:
+    config = VPCConfig.model_validate(generate_config(*SCALES[scale]))
+    return [
+        Case(
+            name=f"plan-{scale}",
+            run=lambda _: {"resources": len(planner.plan_vpc(config).resources)},
+        ),
+        Case(
+            name=f"plan-{scale}-cached",
+            setup=lambda: warm_plan_cache(config),
+            run=lambda cache: {"resources": len(cache.get_or_plan(config).resources)},
+        ),
+    ]
+
+
+def build_cases() -> list[Case]:
+    return (
+        [
+            Case(
+                name=f"vpc-{scale}-{subnets}x{route_tables}x{routes}",
+                setup=lambda s=subnets, m=route_tables, k=routes: generate_config(
+                    s, m, k
+                ),
+                run=construct,
+                repeat=3 if scale in ("small", "medium") else 1,
+            )
+            for scale, (subnets, route_tables, routes) in SCALES.items()
+        ]
+        + [
+            Case(
+                name=f"fleet-{vpcs}",
+                setup=lambda n=vpcs: generate_fleet_config(n),
+                run=construct_fleet,
+                repeat=1,
+            )
+            for vpcs in FLEET_SIZES
+        ]
+        + [
+            Case(
+                name=f"vpc-{scale}-bulk-routes",
+                setup=lambda s=scale: with_bulk_routes(generate_config(*SCALES[s])),
+                run=construct,
+                repeat=3 if scale == "medium" else 1,
+            )
+            for scale in ("medium", "xlarge")
+        ]
+        + plan_cases("medium")
+        + plan_cases("xlarge")
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main("construction", build_cases()))
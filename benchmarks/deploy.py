@@ -0,0 +1,192 @@
+"""Simulated deploy time of the VPC component's resource graph.
+
+Uses the construction configs and schedules their plans on the mock engine in
+`pulumi_aws_vpc.dag`, with unbounded parallelism (the `pulumi up` default) and
+with 16 parallel operations. Every case reports the graph depth and width and
+the simulated deploy time, once as planned by default and once with
+`deployment.detach_gateways`; the summary prints the improvement per config.
+Wall time is the cost of planning plus the analysis itself.
+
+The next-hop cases move every route of the config to another next hop and
+count the API operations of that deploy, with routes replaced on any change
+and with `deployment.route_updates: in_place`.
+
+The backend cases construct the component under Pulumi mocks with every
+resource on Cloud Control, every resource on the EC2 API and only routes and
+associations on the EC2 API. They report the registered resources per
+provider, the API calls they cost and the simulated deploy time. API calls are
+modelled: a Cloud Control operation is one request plus a status poll every
+`POLL_SECONDS` until it finishes, a classic resource is one EC2 call plus one
+describe call to read its state.
+"""
+
+import copy
+import math
+import sys
+from collections import Counter
+from typing import Any
+
+from benchmarks._harness import Case, Result, main
+from benchmarks._mocks import CountingMocks, run_with_mocks
+from benchmarks.construction import SCALES, generate_config
+from pulumi_aws_vpc import VPC, dag, lookups, planner
+from pulumi_aws_vpc.config import VPCConfig
+
+PARALLELISM = {"unbounded": None, "p16": 16}
+ROUTE_UPDATES = ["replace", "in_place"]
+BACKENDS: dict[str, dict[str, Any]] = {
+    "cloudcontrol": {"backend": "cloudcontrol"},
+    "ec2": {"backend": "ec2"},
+    "ec2-routes": {
+        "backends": {
+            "Route": "ec2",
+            "SubnetRouteTableAssociation": "ec2",
+            "GatewayRouteTableAssociation": "ec2",
+        }
+    },
+}
+POLL_SECONDS = 2
+
+
+def analyze(config: VPCConfig, parallelism: int | None) -> dict[str, Any]:
+    report = dag.analyze(planner.plan_vpc(config), parallelism=parallelism)
+    return {
+        "resources": report.resources,
+        "depth": report.depth,
+        "width": report.width,
+        "deploy_seconds": report.deploy_seconds,
+    }
+
+
+def change_next_hops(config: dict[str, Any]) -> dict[str, Any]:
+    changed = copy.deepcopy(config)
+    for route_table in changed["route_tables"]:
+        for route in route_table["routes"]:
+            route["next_hop"] = "tgw-0fedcba9876543210"
+    return changed
+
+
+def next_hop_change(
+    old: dict[str, Any], new: dict[str, Any], route_updates: str
+) -> dict[str, Any]:
+    deployment = {"deployment": {"route_updates": route_updates}}
+    steps = dag.steps(
+        planner.plan_vpc(VPCConfig.model_validate({**old, **deployment})),
+        planner.plan_vpc(VPCConfig.model_validate({**new, **deployment})),
+    )
+    counts = Counter(steps.values())
+    return {
+        **{step: counts[step] for step in dag.STEP_OPERATIONS},
+        "operations": sum(dag.STEP_OPERATIONS[step] for step in steps.values()),
+    }
+
+
+def construct_with_backend(config: dict[str, Any]) -> dict[str, Any]:
+    mocks = CountingMocks()
+    lookups.facts_cache = lookups.FactsCache()
+    lookups.ReferenceLookups.shared.clear()
+    vpcs = []
+    run_with_mocks(mocks, lambda: vpcs.append(VPC("vpc", config)))
+    plan = vpcs[0].resource_plan
+    durations = dag._create_seconds(plan, None)
+    api_calls = 0
+    for key, resource in plan.resources.items():
+        if resource.type.startswith("aws-native:"):
+            api_calls += 1 + math.ceil(durations[key] / POLL_SECONDS)
+        else:
+            api_calls += 2
+    return {
+        "cloudcontrol": sum(
+            n for typ, n in mocks.resources.items() if typ.startswith("aws-native:")
+        ),
+        "ec2": sum(n for typ, n in mocks.resources.items() if typ.startswith("aws:")),
+        "api_calls": api_calls,
+        "deploy_seconds": dag.simulate_deploy(plan),
+        "deploy_seconds_p16": dag.simulate_deploy(plan, parallelism=16),
+    }
+
+
+def build_cases() -> list[Case]:
+    cases = []
+    for scale, sizes in SCALES.items():
+        for detach in (False, True):
+            config = VPCConfig.model_validate(
+                {
+                    **generate_config(*sizes),
+                    "deployment": {"detach_gateways": detach},
+                }
+            )
+            for label, parallelism in PARALLELISM.items():
+                cases.append(
+                    Case(
+                        name=f"{scale}-{label}{'-detached' if detach else ''}",
+                        run=lambda _, c=config, p=parallelism: analyze(c, p),
+                        repeat=3 if scale in ("small", "medium") else 1,
+                    )
+                )
+        old = generate_config(*sizes)
+        new = change_next_hops(old)
+        for route_updates in ROUTE_UPDATES:
+            cases.append(
+                Case(
+                    name=f"{scale}-next-hop-{route_updates.replace('_', '-')}",
+                    run=lambda _, u=route_updates, o=old, n=new: next_hop_change(
+                        o, n, u
+                    ),
+                    repeat=3 if scale in ("small", "medium") else 1,
+                )
+            )
+        if scale == "xlarge":
+            # construction under mocks takes tens of seconds at this scale
+            continue
+        for backend, deployment in BACKENDS.items():
+            cases.append(
+                Case(
+                    name=f"{scale}-backend-{backend}",
+                    setup=lambda s=sizes, d=deployment: {
+                        **generate_config(*s),
+                        "deployment": d,
+                    },
+                    run=construct_with_backend,
+                    repeat=3 if scale == "small" else 1,
+                )
+            )
+    return cases
+
+
+def report(results: list[Result]) -> None:
+    by_name = {result.name: result for result in results}
+    for name, result in by_name.items():
+        if name.endswith("-backend-cloudcontrol"):
+            scale = name.removesuffix("-backend-cloudcontrol")
+            for backend in BACKENDS:
+                other = by_name.get(f"{scale}-backend-{backend}")
+                if other is not None and backend != "cloudcontrol":
+                    print(
+                        f"{scale} {backend}: {result.extra['api_calls']} -> "
+                        f"{other.extra['api_calls']} API calls, "
+                        f"{result.extra['deploy_seconds_p16']:.0f}s -> "
+                        f"{other.extra['deploy_seconds_p16']:.0f}s with 16 "
+                        "parallel operations"
+                    )
+        if name.endswith("-next-hop-replace") and (
+            in_place := by_name.get(name.replace("-replace", "-in-place"))
+        ):
+            print(
+                f"{name.removesuffix('-replace')}: "
+                f"{result.extra['operations']} -> {in_place.extra['operations']} "
+                "operations in place"
+            )
+        detached = by_name.get(f"{name}-detached")
+        if detached is None:
+            continue
+        before = result.extra["deploy_seconds"]
+        after = detached.extra["deploy_seconds"]
+        print(
+            f"{name}: {before:.0f}s -> {after:.0f}s detached "
+            f"({(before - after) / before:.0%} faster)"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main("deploy", build_cases(), report=report))
@@ -0,0 +1,79 @@
+"""Benchmarks for bulk config ingestion with a growing number of worker processes.
+
+Every case loads a file of generated VPC configs with `load_config_files`,
+which parses, validates and plans subnet CIDRs in a process pool. JSON Lines
+input is cheap to parse, so it mostly measures validation and planning; YAML
+parsing costs an order of magnitude more than both. After the run the speedup
+of each worker count over a single process is printed. Worker counts above the
+number of cores only measure pool overhead, so they aren't run; on a single
+core machine only the in-process case runs and no speedup is reported.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from benchmarks._harness import Case, Result, main
+from benchmarks.construction import generate_config
+from pulumi_aws_vpc.ingest import load_config_files
+
+# number of configs per input format
+CONFIGS = {"jsonl": 300, "yaml": 100}
+# (subnets, route tables, routes per route table) of every config
+SCALE = (60, 10, 20)
+CPU_COUNT = os.cpu_count() or 1
+WORKERS = sorted(
+    {workers for workers in (1, 2, 4) if workers <= CPU_COUNT} | {CPU_COUNT}
+)
+
+
+def write_documents(fmt: str, configs: int) -> Path:
+    path = Path(tempfile.mkdtemp(prefix="vpc-ingest-")) / f"vpcs.{fmt}"
+    with open(path, "w") as f:
+        for i in range(configs):
+            document = generate_config(*SCALE)
+            document["name"] = f"vpc-{i}"
+            if fmt == "yaml":
+                f.write("---\n" + yaml.safe_dump(document, sort_keys=False))
+            else:
+                f.write(json.dumps(document) + "\n")
+    return path
+
+
+def build_cases() -> list[Case]:
+    cases = []
+    for fmt, configs in CONFIGS.items():
+        path = write_documents(fmt, configs)
+        cases += [
+            Case(
+                name=f"ingest-{fmt}-{configs}-workers-{workers}",
+                run=lambda _, path=path, workers=workers: {
+                    "configs": len(load_config_files(path, max_workers=workers)),
+                    "cpu_count": CPU_COUNT,
+                },
+                repeat=3,
+            )
+            for workers in WORKERS
+        ]
+    return cases
+
+
+def report_speedup(results: list[Result]) -> None:
+    serial = {
+        result.name.removesuffix("-workers-1"): result.seconds
+        for result in results
+        if result.name.endswith("-workers-1")
+    }
+    for result in results:
+        prefix, workers = result.name.rsplit("-workers-", 1)
+        if prefix in serial and workers != "1":
+            speedup = serial[prefix] / result.seconds
+            print(f"{result.name:<48} speedup x{speedup:.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main("ingest", build_cases(), report=report_speedup))
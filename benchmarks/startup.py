@@ -0,0 +1,94 @@
+"""Cold start benchmarks for the component provider host.
+
+Every case runs in a fresh interpreter, like the language host starting the
+plugin for a `pulumi preview`, so module caches in this process don't hide the
+import cost. The measured time is the wall time of the child process. Each case
+also reports how long the child spent importing the component and building (or
+loading the cached) provider schema, and how many provider SDK modules it actually loaded.
+
+Besides the usual baseline comparison, every case has an absolute time budget.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+from benchmarks._harness import Case, main
+
+ROOT = Path(__file__).parent.parent
+
+PRELUDE = """
+import json, sys, time
+start = time.perf_counter()
+from pulumi.provider.experimental.component import ComponentProvider
+from pulumi_aws_vpc import VPC
+timings = {"import_seconds": time.perf_counter() - start}
+"""
+SCHEMA = """
+start = time.perf_counter()
+ComponentProvider(components=[VPC], name="aws-networking")
+timings["schema_seconds"] = time.perf_counter() - start
+"""
+# The provider host in __main__.py; the best of several runs hits a warm cache.
+CACHED_SCHEMA = """
+from pulumi_aws_vpc.provider import CachedComponentProvider
+start = time.perf_counter()
+provider = CachedComponentProvider(components=[VPC], name="aws-networking")
+timings["schema_seconds"] = time.perf_counter() - start
+timings["cache_hit"] = provider.cache_hit
+"""
+CONSTRUCT = """
+from benchmarks._mocks import CountingMocks, run_with_mocks
+from benchmarks.construction import generate_config
+config = generate_config(6, 2, 5)
+start = time.perf_counter()
+run_with_mocks(CountingMocks(), lambda: VPC("vpc", config))
+timings["construct_seconds"] = time.perf_counter() - start
+"""
+# Lazily imported modules sit in sys.modules as `_LazyModule` until first use.
+REPORT = """
+sdk_modules = [
+    name for name, module in sys.modules.items()
+    if name.split(".")[0] in ("pulumi_aws", "pulumi_aws_native")
+    and type(module).__name__ != "_LazyModule"
+]
+print(json.dumps({**timings, "sdk_modules": len(sdk_modules)}))
+"""
+
+# (name, script, budget in seconds for the whole child process)
+SCENARIOS = [
+    ("import", PRELUDE, 1.5),
+    ("provider-schema", PRELUDE + SCHEMA, 2.0),
+    ("provider-schema-cached", PRELUDE + CACHED_SCHEMA, 1.5),
+    ("first-construct-small", PRELUDE + CONSTRUCT, 4.0),
+]
+
+
+def cold_start(script: str) -> dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, "-c", script + REPORT],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report: dict[str, Any] = json.loads(completed.stdout.splitlines()[-1])
+    return {k: round(v, 6) if isinstance(v, float) else v for k, v in report.items()}
+
+
+def build_cases() -> list[Case]:
+    return [
+        Case(
+            name=name,
+            run=lambda _, script=script: cold_start(script),
+            repeat=5,
+            budget_seconds=budget,
+        )
+        for name, script, budget in SCENARIOS
+    ]
+
+
+if __name__ == "__main__":
+    sys.exit(main("startup", build_cases()))
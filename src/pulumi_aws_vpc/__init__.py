@@ -1,3 +1,4 @@
+from .fleet import VPCFleet
 from .vpc import VPC
 
-__all__ = ["VPC"]
\ No newline at end of file
+__all__ = ["VPC", "VPCFleet"]
@@ -0,0 +1,156 @@
+import heapq
+from collections.abc import Iterable, Iterator
+from ipaddress import IPv6Address, IPv6Network
+from typing import Literal
+
+import netaddr
+
+IPV6_WIDTH = 128
+NIBBLE = 4
+IPV6_INTERFACE_ID_MASK = (1 << 64) - 1
+
+
+class SubnetAllocator:
+    """First-fit subnet allocator working on integer prefixes.
+
+    Free space is tracked as maximal aligned blocks, with one min-heap of block
+    start addresses per prefix length. A request takes the lowest-addressed free
+    block that is large enough, carves the subnet from its start and pushes the
+    remaining buddy blocks back. Since blocks are never freed, the heaps always
+    hold the same canonical blocks `netaddr.cidr_merge` would produce, and every
+    placement costs O(W + log n) where W is the address width.
+
+    Examples:
+    >>> allocator = SubnetAllocator("10.10.10.0/24")
+    >>> allocator.allocate(26), allocator.allocate(25), allocator.allocate(26)
+    ('10.10.10.0/26', '10.10.10.128/25', '10.10.10.64/26')
+    """
+
+    def __init__(self, supernet: str) -> None:
+        network = netaddr.IPNetwork(supernet).cidr
+        self.supernet = network
+        self.version: Literal[4, 6] = network.version
+        self.width: int = 32 if network.version == 4 else 128
+        self._free: list[list[int]] = [[] for _ in range(self.width + 1)]
+        self._free[network.prefixlen].append(network.first)
+
+    def allocate(self, prefixlen: int) -> str:
+        """Allocate the lowest free subnet of the given prefix length."""
+        start, block_prefixlen = self._take_block(prefixlen)
+        for buddy_prefixlen in range(block_prefixlen + 1, prefixlen + 1):
+            buddy = start + (1 << (self.width - buddy_prefixlen))
+            heapq.heappush(self._free[buddy_prefixlen], buddy)
+        return f"{netaddr.IPAddress(start, self.version)}/{prefixlen}"
+
+    def allocate_many(self, prefixlen: int, count: int) -> list[str]:
+        """Allocate `count` subnets of one prefix length, e.g. a tier across AZs.
+
+        The result is the same as calling `allocate` `count` times, but every
+        free block is split once for all the subnets it can hold.
+
+        Examples:
+        >>> SubnetAllocator("10.0.0.0/16").allocate_many(24, 3)
+        ['10.0.0.0/24', '10.0.1.0/24', '10.0.2.0/24']
+        """
+        size = 1 << (self.width - prefixlen)
+        subnets: list[str] = []
+        while len(subnets) < count:
+            start, block_prefixlen = self._take_block(prefixlen)
+            taken = min(count - len(subnets), 1 << (prefixlen - block_prefixlen))
+            subnets.extend(
+                f"{netaddr.IPAddress(start + i * size, self.version)}/{prefixlen}"
+                for i in range(taken)
+            )
+            # the rest of the block goes back as maximal aligned blocks
+            free_start = start + taken * size
+            block_end = start + (1 << (self.width - block_prefixlen))
+            while free_start < block_end:
+                free_prefixlen = max(
+                    self.width - ((free_start & -free_start).bit_length() - 1),
+                    self.width - ((block_end - free_start).bit_length() - 1),
+                )
+                heapq.heappush(self._free[free_prefixlen], free_start)
+                free_start += 1 << (self.width - free_prefixlen)
+        return subnets
+
+    def _take_block(self, prefixlen: int) -> tuple[int, int]:
+        """Pop the lowest free block that can hold a subnet of `prefixlen`."""
+        if not self.supernet.prefixlen <= prefixlen <= self.width:
+            raise ValueError(
+                f"Can't allocate /{prefixlen} from {self.supernet}: prefix length "
+                f"must be between {self.supernet.prefixlen} and {self.width}"
+            )
+
+        start = block_prefixlen = None
+        for candidate_prefixlen in range(self.supernet.prefixlen, prefixlen + 1):
+            heap = self._free[candidate_prefixlen]
+            if heap and (start is None or heap[0] < start):
+                start, block_prefixlen = heap[0], candidate_prefixlen
+        if start is None or block_prefixlen is None:
+            raise ValueError(
+                f"No free blocks left to allocate /{prefixlen} from {self.supernet}"
+            )
+        heapq.heappop(self._free[block_prefixlen])
+        return start, block_prefixlen
+
+
+def _format_ipv6(value: int) -> str:
+    """Compressed text form of an IPv6 address given as an integer.
+
+    Subnets of /64 and shorter have an all-zero interface ID, which is always
+    the longest zero run, so only the upper four groups need formatting.
+    """
+    if value & IPV6_INTERFACE_ID_MASK:
+        return str(IPv6Address(value))
+    high = value >> 64
+    groups = [f"{(high >> shift) & 0xFFFF:x}" for shift in (48, 32, 16, 0)]
+    # trailing zero groups join the zero run of the interface ID
+    while groups and groups[-1] == "0":
+        groups.pop()
+    return ":".join(groups) + "::"
+
+
+def iter_ipv6_subnets(
+    supernet: str, prefix_lengths: Iterable[int], nibble_aligned: bool = False
+) -> Iterator[str]:
+    """Lazily place IPv6 subnets one after another, in constant memory.
+
+    A bump allocator on 128-bit integers: every subnet starts at the first
+    address after the previous one that is aligned to its size. Nothing but
+    the next free address is kept, so pools like a /32 divided into /64s can
+    be streamed without holding free blocks or subnet objects. Gaps left by
+    alignment are not filled, so the result equals `SubnetAllocator` whenever
+    prefix lengths never decrease, e.g. one size or largest subnets first.
+
+    With `nibble_aligned`, subnets start on a hex digit boundary of their
+    prefix length (rounded down to a multiple of 4 bits), so a /62 takes the
+    start of a /60 and every subnet differs from its neighbours in whole hex
+    digits.
+
+    Examples:
+    >>> list(iter_ipv6_subnets("2001:db8::/56", [64, 64, 62]))
+    ['2001:db8::/64', '2001:db8:0:1::/64', '2001:db8:0:4::/62']
+    >>> list(iter_ipv6_subnets("2001:db8::/56", [64, 62], nibble_aligned=True))
+    ['2001:db8::/64', '2001:db8:0:10::/62']
+    """
+    network = IPv6Network(supernet, strict=False)
+    start = int(network.network_address)
+    end = start + (1 << (IPV6_WIDTH - network.prefixlen))
+    for prefixlen in prefix_lengths:
+        if not network.prefixlen <= prefixlen <= IPV6_WIDTH:
+            raise ValueError(
+                f"Can't allocate /{prefixlen} from {network}: prefix length "
+                f"must be between {network.prefixlen} and {IPV6_WIDTH}"
+            )
+        align_prefixlen = prefixlen
+        if nibble_aligned:
+            align_prefixlen = max(network.prefixlen, prefixlen - prefixlen % NIBBLE)
+        # round up to the next aligned address
+        alignment = (1 << (IPV6_WIDTH - align_prefixlen)) - 1
+        start = (start + alignment) & ~alignment
+        if start + (1 << (IPV6_WIDTH - prefixlen)) > end:
+            raise ValueError(
+                f"No free blocks left to allocate /{prefixlen} from {network}"
+            )
+        yield f"{_format_ipv6(start)}/{prefixlen}"
+        start += 1 << (IPV6_WIDTH - prefixlen)
@@ -15,6 +15,18 @@ class SubnetArgs(TypedDict):
     ipv4: Optional[SubnetCidrArgs]
     ipv6: Optional[SubnetCidrArgs]
     route_table: Optional[Input[str]]
+    tier: Optional[Input[str]]
+    tags: Optional[dict[str, Input[str]]]
+    extra_options: Optional[dict[str, Input[Any]]]
+
+
+class SubnetTierArgs(TypedDict):
+    name: Input[str]
+    az_ids: list[Input[str]]
+    ipv4: Optional[SubnetCidrArgs]
+    ipv6: Optional[SubnetCidrArgs]
+    route_table: Optional[Input[str]]
+    tier: Optional[Input[str]]
     tags: Optional[dict[str, Input[str]]]
     extra_options: Optional[dict[str, Input[Any]]]
 
@@ -56,6 +68,10 @@ class RouteArgs(TypedDict):
 class RouteTableArgs(TypedDict):
     name: Input[str]
     routes: Optional[list[RouteArgs]]
+    summarize: Optional[Input[bool]]
+    prefix_list_threshold: Optional[Input[int]]
+    bulk_routes: Optional[Input[bool]]
+    retain_routes: Optional[Input[bool]]
     tags: Optional[dict[str, Input[str]]]
     extra_options: Optional[dict[str, Input[Any]]]
 
@@ -74,15 +90,38 @@ class VPCEndpointArgs(TypedDict):
     extra_options: Optional[dict[str, Input[Any]]]
 
 
+class InstrumentationArgs(TypedDict):
+    spans_file: Optional[Input[str]]
+
+
+class DeploymentArgs(TypedDict):
+    detach_gateways: Optional[Input[bool]]
+    route_updates: Optional[Input[str]]  # "replace" or "in_place"
+    backend: Optional[Input[str]]  # "cloudcontrol" or "ec2"
+    # backend per Cloud Control resource type, e.g. {"Route": "ec2"}
+    backends: Optional[dict[str, Input[str]]]
+    route_set_profile: Optional[Input[str]]
+    route_set_role_arn: Optional[Input[str]]
+
+
 class VPCArgs(TypedDict):
     name: Input[str]
     cidrs: VPCCidrsArgs
     subnets: Optional[list[SubnetArgs]]
+    subnet_tiers: Optional[list[SubnetTierArgs]]
     internet_gateway: Optional[InternetGatewayArgs]
     virtual_private_gateway: Optional[VirtualPrivateGatewayArgs]
     egress_only_internet_gateway: Optional[EgressOnlyInternetGatewayArgs]
     route_tables: Optional[list[RouteTableArgs]]
     endpoints: Optional[list[VPCEndpointArgs]]
+    instrumentation: Optional[InstrumentationArgs]
+    deployment: Optional[DeploymentArgs]
     tags: Optional[dict[str, Input[str]]]
     common_tags: Optional[dict[str, Input[str]]]
     extra_options: Optional[dict[str, Input[Any]]]
+
+
+class VPCFleetArgs(TypedDict):
+    supernet: Optional[Input[str]]
+    vpcs: list[VPCArgs]
+    common_tags: Optional[dict[str, Input[str]]]
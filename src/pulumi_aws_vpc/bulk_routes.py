@@ -0,0 +1,283 @@
+"""Bulk route programming: one resource for all routes of a route table.
+
+Every `Route` resource is registered, diffed and applied on its own, which
+adds up for route tables with hundreds of entries. `RouteSet` is a dynamic
+provider resource that owns the routes of one table. Each create or update
+reads the table once, compares the desired routes with the actual ones and
+only creates, replaces or deletes the routes that differ. Routes the set
+didn't create, like the local route, propagated routes or routes of gateway
+endpoints, are left alone.
+
+A set refuses to take over a route that exists but that it didn't program,
+e.g. one of the `Route` resources a table had before `bulk_routes` was turned
+on, unless `retain_routes` is set. With it, existing routes are adopted and
+deleting the set leaves its routes in the table.
+
+Routes use the planner's input names, e.g.
+`{"destination_cidr_block": "0.0.0.0/0", "gateway_id": "igw-..."}`. The
+provider calls the EC2 API with boto3, which has to be installed where the
+Pulumi program runs (`pip install pulumi-aws-vpc[bulk]`). Dynamic providers
+don't get the credentials of a Pulumi provider, so the client is built from
+the `region`, `profile` and `role_arn` inputs, on top of boto3's own
+credential chain.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+import pulumi
+import pulumi.dynamic
+
+DESTINATION_KEYS = (
+    "destination_cidr_block",
+    "destination_ipv6_cidr_block",
+    "destination_prefix_list_id",
+)
+TARGET_KEYS = (
+    "gateway_id",
+    "egress_only_internet_gateway_id",
+    "network_interface_id",
+    "transit_gateway_id",
+    "vpc_peering_connection_id",
+    "nat_gateway_id",
+    "core_network_arn",
+)
+# only routes with this origin were created with CreateRoute
+CREATE_ROUTE_ORIGIN = "CreateRoute"
+
+Route = dict[str, str]
+RouteKey = tuple[str, str]
+
+
+def _api_name(name: str) -> str:
+    return "".join(part.capitalize() for part in name.split("_"))
+
+
+def _destination(route: Route) -> RouteKey:
+    for key in DESTINATION_KEYS:
+        if route.get(key):
+            return key, route[key]
+    raise ValueError(f"Route without a destination: {route}")
+
+
+def _target(route: Route) -> Route:
+    return {key: route[key] for key in TARGET_KEYS if route.get(key)}
+
+
+def _from_api(route: dict[str, Any]) -> Route:
+    return {
+        key: route[_api_name(key)]
+        for key in DESTINATION_KEYS + TARGET_KEYS
+        if route.get(_api_name(key))
+    }
+
+
+def _is_not_found(error: Exception) -> bool:
+    response = getattr(error, "response", None) or {}
+    code: str | None = response.get("Error", {}).get("Code")
+    return code == "InvalidRoute.NotFound"
+
+
+def ec2_client(
+    region: str | None, profile: str | None = None, role_arn: str | None = None
+) -> Any:
+    """EC2 client of the profile, assuming `role_arn` if given."""
+    try:
+        import boto3
+    except ImportError as e:
+        raise ImportError(
+            "boto3 is required to program bulk routes, "
+            "install it with `pip install pulumi-aws-vpc[bulk]`"
+        ) from e
+    session = boto3.Session(profile_name=profile, region_name=region)
+    if role_arn:
+        credentials = session.client("sts").assume_role(
+            RoleArn=role_arn, RoleSessionName="pulumi-aws-vpc-route-set"
+        )["Credentials"]
+        session = boto3.Session(
+            aws_access_key_id=credentials["AccessKeyId"],
+            aws_secret_access_key=credentials["SecretAccessKey"],
+            aws_session_token=credentials["SessionToken"],
+            region_name=region,
+        )
+    return session.client("ec2")
+
+
+def _actual_routes(client: Any, route_table_id: str) -> dict[RouteKey, Route]:
+    """Targets of the routes created with CreateRoute, by destination."""
+    response = client.describe_route_tables(RouteTableIds=[route_table_id])
+    actual = {}
+    for route in response["RouteTables"][0]["Routes"]:
+        if route.get("Origin") == CREATE_ROUTE_ORIGIN:
+            route = _from_api(route)
+            actual[_destination(route)] = _target(route)
+    return actual
+
+
+def reconcile(
+    client: Any,
+    route_table_id: str,
+    routes: list[Route],
+    previous: list[Route] | None = None,
+    adopt: bool = False,
+) -> dict[str, int]:
+    """Make the routes of a table match `routes`, with one describe call.
+
+    Missing routes are created and routes with another target are replaced.
+    Routes in `previous` (the routes the set programmed before) that are no
+    longer wanted are deleted. A wanted route that exists but isn't in
+    `previous` raises a `ValueError` before anything changes, unless `adopt`
+    is set. Returns the number of routes per operation.
+    """
+    actual = _actual_routes(client, route_table_id)
+    desired = {_destination(route): _target(route) for route in routes}
+    owned = {_destination(route) for route in previous or []}
+    if not adopt:
+        conflicts = sorted(
+            destination for _, destination in desired.keys() & actual.keys() - owned
+        )
+        if conflicts:
+            raise ValueError(
+                f"Routes to {', '.join(conflicts)} in {route_table_id} exist but "
+                "weren't created by this route set, e.g. by the Route resources "
+                "it replaces. Set retain_routes to adopt them"
+            )
+
+    counts = {"created": 0, "replaced": 0, "deleted": 0, "unchanged": 0}
+    for (dest_key, destination), target in desired.items():
+        params = {
+            "RouteTableId": route_table_id,
+            _api_name(dest_key): destination,
+            **{_api_name(k): v for k, v in target.items()},
+        }
+        current = actual.get((dest_key, destination))
+        if current is None:
+            client.create_route(**params)
+            counts["created"] += 1
+        elif current != target:
+            client.replace_route(**params)
+            counts["replaced"] += 1
+        else:
+            counts["unchanged"] += 1
+
+    stale = owned - desired.keys()
+    for dest_key, destination in stale:
+        if (dest_key, destination) not in actual:
+            continue
+        try:
+            client.delete_route(
+                RouteTableId=route_table_id, **{_api_name(dest_key): destination}
+            )
+        except Exception as e:
+            # deleted concurrently, which is the state we want anyway
+            if not _is_not_found(e):
+                raise
+        counts["deleted"] += 1
+    return counts
+
+
+class RouteSetProvider(pulumi.dynamic.ResourceProvider):
+    def __init__(
+        self,
+        client_factory: Callable[[str | None, str | None, str | None], Any]
+        | None = None,
+    ):
+        # tests pass a stand-in for the boto3 EC2 client
+        self.client_factory = client_factory or ec2_client
+
+    def _client(self, props: dict[str, Any]) -> Any:
+        if not props.get("region"):
+            raise ValueError(
+                "RouteSet needs a region, it doesn't use the Pulumi provider's"
+            )
+        return self.client_factory(
+            props["region"], props.get("profile"), props.get("role_arn")
+        )
+
+    def _reconcile(
+        self, props: dict[str, Any], previous: list[Route] | None = None
+    ) -> dict[str, Any]:
+        client = self._client(props)
+        counts = reconcile(
+            client,
+            props["route_table_id"],
+            props["routes"],
+            previous,
+            adopt=bool(props.get("retain_routes")),
+        )
+        return {**props, "last_changes": counts}
+
+    def create(self, props: dict[str, Any]) -> pulumi.dynamic.CreateResult:
+        outs = self._reconcile(props)
+        return pulumi.dynamic.CreateResult(f"{props['route_table_id']}-routes", outs)
+
+    def diff(
+        self, _id: str, olds: dict[str, Any], news: dict[str, Any]
+    ) -> pulumi.dynamic.DiffResult:
+        replaces = []
+        if olds.get("route_table_id") != news.get("route_table_id"):
+            replaces.append("route_table_id")
+        old_routes = {_destination(r): _target(r) for r in olds.get("routes", [])}
+        new_routes = {_destination(r): _target(r) for r in news.get("routes", [])}
+        retain_changed = bool(olds.get("retain_routes")) != bool(
+            news.get("retain_routes")
+        )
+        return pulumi.dynamic.DiffResult(
+            changes=bool(replaces) or old_routes != new_routes or retain_changed,
+            replaces=replaces,
+            delete_before_replace=True,
+        )
+
+    def update(
+        self, _id: str, olds: dict[str, Any], news: dict[str, Any]
+    ) -> pulumi.dynamic.UpdateResult:
+        return pulumi.dynamic.UpdateResult(self._reconcile(news, olds.get("routes")))
+
+    def read(self, id_: str, props: dict[str, Any]) -> pulumi.dynamic.ReadResult:
+        """Current targets of the set's routes, so refresh shows drift."""
+        client = self._client(props)
+        actual = _actual_routes(client, props["route_table_id"])
+        routes = []
+        for route in props.get("routes", []):
+            destination = _destination(route)
+            if destination in actual:
+                dest_key, value = destination
+                routes.append({dest_key: value, **actual[destination]})
+        return pulumi.dynamic.ReadResult(id_, {**props, "routes": routes})
+
+    def delete(self, _id: str, props: dict[str, Any]) -> None:
+        if props.get("retain_routes"):
+            return
+        client = self._client(props)
+        reconcile(client, props["route_table_id"], [], props["routes"])
+
+
+class RouteSet(pulumi.dynamic.Resource):
+    route_table_id: pulumi.Output[str]
+    routes: pulumi.Output[list[dict[str, str]]]
+
+    def __init__(
+        self,
+        name: str,
+        route_table_id: pulumi.Input[str],
+        routes: pulumi.Input[list[dict[str, pulumi.Input[str]]]],
+        region: pulumi.Input[str],
+        profile: pulumi.Input[str] | None = None,
+        role_arn: pulumi.Input[str] | None = None,
+        retain_routes: pulumi.Input[bool] = False,
+        opts: pulumi.ResourceOptions | None = None,
+    ) -> None:
+        super().__init__(
+            RouteSetProvider(),
+            name,
+            {
+                "route_table_id": route_table_id,
+                "routes": routes,
+                "region": region,
+                "profile": profile,
+                "role_arn": role_arn,
+                "retain_routes": retain_routes,
+                "last_changes": None,
+            },
+            opts,
+        )
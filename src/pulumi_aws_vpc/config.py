@@ -1,4 +1,5 @@
 import pydantic
+import re
 from pydantic import ConfigDict, model_validator, Field
 from ipaddress import IPv4Address, IPv4Network, IPv6Network
 from pydantic.alias_generators import to_snake
@@ -8,7 +9,9 @@ from pulumi_aws_vpc.errors import VPCConfigError
 
 
 class BaseModel(pydantic.BaseModel):
-    model_config = ConfigDict(extra="forbid", coerce_numbers_to_str=True)
+    model_config = ConfigDict(
+        extra="forbid", coerce_numbers_to_str=True, defer_build=True
+    )
 
 
 class ApiResource(BaseModel):
@@ -42,6 +45,53 @@ class Subnet(ApiResource):
     ipv4: SubnetIPv4Cidr | None = None
     ipv6: SubnetIPv6Cidr | None = None
     route_table: str | None = None
+    # label to group subnets by in the outputs, set for subnets of a tier
+    tier: str | None = None
+
+
+class SubnetTier(ApiResource):
+    """Subnets of one size and route table, one per availability zone.
+
+    `name` is a pattern where `{az}` is replaced by the AZ ID, e.g. `int-az{az}`
+    expands to `int-az1`, `int-az2` for `az_ids: [1, 2]`. The subnets are
+    labeled with `tier`, by default the pattern without the placeholder and the
+    separator next to it, e.g. `int-az`.
+    """
+
+    name: str
+    az_ids: list[int | str]
+    ipv4: SubnetIPv4Cidr | None = None
+    ipv6: SubnetIPv6Cidr | None = None
+    route_table: str | None = None
+    tier: str | None = None
+
+    @property
+    def label(self) -> str:
+        return self.tier or self.name.replace("{az}", "").strip("-_.")
+
+    def check(self) -> list[str]:
+        errors = []
+        if len(self.az_ids) > 1 and "{az}" not in self.name:
+            errors.append(f"Subnet tier {self.name!r} needs an {{az}} placeholder")
+        for ip_version in ("ipv4", "ipv6"):
+            cidr_cfg = getattr(self, ip_version)
+            if cidr_cfg and cidr_cfg.cidr:
+                errors.append(
+                    f"Subnet tier {self.name!r} can't have a literal {ip_version} cidr"
+                )
+        return errors
+
+    def expand(self) -> list[Subnet]:
+        # validating plain dicts is cheaper than copying the tier's models
+        base = self.model_dump(exclude={"name", "az_ids"})
+        base["extra_options"] = self.extra_options
+        base["tier"] = self.label
+        return [
+            Subnet.model_validate(
+                {**base, "name": self.name.replace("{az}", str(az_id)), "az_id": az_id}
+            )
+            for az_id in self.az_ids
+        ]
 
 
 # class VPCCidr(BaseModel):
@@ -63,6 +113,9 @@ class Subnet(ApiResource):
 #         return self.subnets
 
 
+SUBNET_REFERENCE_RE = re.compile(r"subnet\@(?P<subnet>[\w\-]+)\.(?P<attr>\w+)")
+
+
 class Route(BaseModel):
     destination: str
     next_hop: str
@@ -71,6 +124,13 @@ class Route(BaseModel):
 class RouteTable(ApiResource):
     name: str
     routes: list[Route]
+    summarize: bool = False
+    prefix_list_threshold: int | None = None
+    # program all routes with one RouteSet resource instead of one per route
+    bulk_routes: bool = False
+    # leave routes in AWS when the resources managing them are removed, and let
+    # a RouteSet take over routes that already exist; for switching bulk_routes
+    retain_routes: bool = False
 
 
 class VirtualPrivateGateway(ApiResource):
@@ -152,12 +212,15 @@ class IPv4VPCCidr(BaseModel):
     cidr: IPv4Network | None = None
     ipam_pool_id: str | None = None
     size: int | None = None
+    # block an IPAM allocator simulated for a preview, only to plan subnet CIDRs
+    allocated_cidr: IPv4Network | None = None
 
 
 class IPv6VPCCidr(BaseModel):
     cidr: IPv6Network | None = None
     ipam_pool_id: str | None = None
     size: int | None = 56
+    allocated_cidr: IPv6Network | None = None
 
 
 class VPCCidrs(BaseModel):
@@ -189,11 +252,56 @@ class VPCEndpoint(ApiResource):
         return self.private_dns_enabled
 
 
+class Instrumentation(BaseModel):
+    spans_file: str | None = None
+
+
+RouteUpdates = Literal["replace", "in_place"]
+Backend = Literal["cloudcontrol", "ec2"]
+# Cloud Control resource types the component creates
+ResourceType = Literal[
+    "Vpc",
+    "VpcCidrBlock",
+    "Subnet",
+    "InternetGateway",
+    "VpnGateway",
+    "VpcGatewayAttachment",
+    "EgressOnlyInternetGateway",
+    "RouteTable",
+    "PrefixList",
+    "Route",
+    "VpcEndpoint",
+    "SubnetRouteTableAssociation",
+    "GatewayRouteTableAssociation",
+]
+
+
+class Deployment(BaseModel):
+    # parent gateways and prefix lists to the component instead of the VPC, so
+    # they are created in parallel with it
+    detach_gateways: bool = False
+    # "in_place" updates the next hop of existing routes, only a new route
+    # table or destination replaces them
+    route_updates: RouteUpdates = "replace"
+    # "ec2" creates resources with the classic AWS provider, which calls the
+    # EC2 API directly instead of going through Cloud Control
+    backend: Backend = "cloudcontrol"
+    backends: dict[ResourceType, Backend] = Field(default_factory=dict)
+    # AWS profile and role the RouteSets of bulk_routes call the EC2 API with,
+    # instead of those of the default aws-native provider
+    route_set_profile: str | None = None
+    route_set_role_arn: str | None = None
+
+    def backend_for(self, resource_type: ResourceType) -> Backend:
+        return self.backends.get(resource_type, self.backend)
+
+
 class VPCConfig(ApiResource):
     name: str
     cidrs: VPCCidrs
     common_tags: dict[str, str] = Field(default_factory=dict)
     subnets: list[Subnet] = []
+    subnet_tiers: list[SubnetTier] = []
     internet_gateway: InternetGateway | None = None
     virtual_private_gateway: VirtualPrivateGateway | None = None
     egress_only_internet_gateway: EgressOnlyInternetGateway | None = None
@@ -202,6 +310,8 @@ class VPCConfig(ApiResource):
     # nat_gateways: list[NATGateway] = []
     # attachments: list[VPCAttachment] = []
     endpoints: list[VPCEndpoint] = []
+    instrumentation: Instrumentation | None = None
+    deployment: Deployment = Field(default_factory=Deployment)
     # dns: Any = None
     # flow_logs: list[Any] = []
 
@@ -214,29 +324,183 @@ class VPCConfig(ApiResource):
         return self.cidrs.ipv4[1:]
 
     @model_validator(mode="after")
-    def check_route_tables_references(self) -> Self:
-        route_tables = [rt.name for rt in self.route_tables]
+    def expand_subnet_tiers(self) -> Self:
+        """Append the subnets of every tier to `subnets`, in tier and AZ order.
+
+        Tiers are emptied afterwards, so a dumped config validates again to the
+        same subnets.
+        """
+        if not self.subnet_tiers:
+            return self
+        errors = []
+        for tier in self.subnet_tiers:
+            errors.extend(tier.check())
+        if errors:
+            raise VPCConfigError(errors)
+        for tier in self.subnet_tiers:
+            self.subnets.extend(tier.expand())
+        self.subnet_tiers = []
+        return self
+
+    @model_validator(mode="after")
+    def check_references(self) -> Self:
+        """Check all cross-references in one pass and report every error at once."""
+        errors = []
+        subnets = {}
+        for subnet in self.subnets:
+            if subnet.name in subnets:
+                errors.append(f"Subnet {subnet.name!r} is defined more than once")
+            subnets[subnet.name] = subnet
+        route_tables = set()
+        for rt in self.route_tables:
+            if rt.name in route_tables:
+                errors.append(f"Route table {rt.name!r} is defined more than once")
+            route_tables.add(rt.name)
+        cidr_counts = {"ipv4": len(self.cidrs.ipv4), "ipv6": len(self.cidrs.ipv6)}
+
         for subnet in self.subnets:
             if subnet.route_table and subnet.route_table not in route_tables:
-                raise ValueError(
+                errors.append(
                     f"Subnet {subnet.name!r} references a route table {subnet.route_table!r} which is not defined"
                 )
-        if (
-            self.internet_gateway
-            and self.internet_gateway.route_table
-            and self.internet_gateway.route_table not in route_tables
-        ):
-            raise ValueError(
-                f"Internet Gateway references a route table {self.internet_gateway.route_table!r} which is not defined"
-            )
-        if (
-            self.virtual_private_gateway
-            and self.virtual_private_gateway.route_table
-            and self.virtual_private_gateway.route_table not in route_tables
-        ):
-            raise ValueError(
-                f"Virtual Private Gateway references a route table {self.virtual_private_gateway.route_table!r} which is not defined"
-            )
+            for ip_version in ("ipv4", "ipv6"):
+                cidr_cfg = getattr(subnet, ip_version)
+                if cidr_cfg and not 1 <= cidr_cfg.cidr_num <= cidr_counts[ip_version]:
+                    errors.append(
+                        f"Subnet {subnet.name!r} references {ip_version} VPC CIDR number {cidr_cfg.cidr_num}, but {cidr_counts[ip_version]} are defined"
+                    )
+            if subnet.ipv4 and not subnet.ipv4.cidr and not subnet.ipv4.size:
+                errors.append(f"Subnet {subnet.name!r} needs an ipv4 cidr or size")
+
+        gateways = {
+            "Internet Gateway": self.internet_gateway,
+            "Virtual Private Gateway": self.virtual_private_gateway,
+            "Egress-Only Internet Gateway": self.egress_only_internet_gateway,
+        }
+        for gateway_name, gateway in gateways.items():
+            if (
+                gateway
+                and gateway.route_table
+                and gateway.route_table not in route_tables
+            ):
+                errors.append(
+                    f"{gateway_name} references a route table {gateway.route_table!r} which is not defined"
+                )
+        next_hop_gateways = {
+            "igw": self.internet_gateway,
+            "vgw": self.virtual_private_gateway,
+            "eigw": self.egress_only_internet_gateway,
+        }
+
+        for rt in self.route_tables:
+            destinations = set()
+            for route in rt.routes:
+                if route.destination in destinations:
+                    errors.append(
+                        f"Route table {rt.name!r} has more than one route to {route.destination!r}"
+                    )
+                destinations.add(route.destination)
+                if route.destination.startswith("subnet@"):
+                    match = SUBNET_REFERENCE_RE.fullmatch(route.destination)
+                    if not match:
+                        errors.append(
+                            f"Route table {rt.name!r} has a route with destination {route.destination!r} which can't be parsed"
+                        )
+                        continue
+                    subnet = subnets.get(match.group("subnet"))
+                    ip_version = match.group("attr")
+                    if subnet is None:
+                        errors.append(
+                            f"Route table {rt.name!r} references a subnet {match.group('subnet')!r} which is not defined"
+                        )
+                    elif ip_version not in ("ipv4", "ipv6"):
+                        errors.append(
+                            f"Route table {rt.name!r} references unknown IP version {ip_version!r} of subnet {subnet.name!r}"
+                        )
+                    elif getattr(subnet, ip_version) is None:
+                        errors.append(
+                            f"Route table {rt.name!r} references {ip_version} CIDR of subnet {subnet.name!r} which has none"
+                        )
+                if (
+                    route.next_hop in next_hop_gateways
+                    and next_hop_gateways[route.next_hop] is None
+                ):
+                    errors.append(
+                        f"Route table {rt.name!r} uses next hop {route.next_hop!r} which is not defined"
+                    )
+
+        endpoints = set()
+        for vpce in self.endpoints:
+            if vpce.name in endpoints:
+                errors.append(f"Endpoint {vpce.name!r} is defined more than once")
+            endpoints.add(vpce.name)
+            for rt_name in vpce.route_tables:
+                if rt_name not in route_tables:
+                    errors.append(
+                        f"Endpoint {vpce.name!r} references a route table {rt_name!r} which is not defined"
+                    )
+
+        if errors:
+            raise VPCConfigError(errors)
+        return self
+
+
+class VPCFleetConfig(BaseModel):
+    supernet: IPv4Network | None = None
+    common_tags: dict[str, str] = Field(default_factory=dict)
+    vpcs: list[VPCConfig]
+
+    def needs_allocation(self, vpc: VPCConfig) -> bool:
+        """Primary CIDR only has a size, so it is allocated from the supernet."""
+        primary = vpc.primary_cidr
+        return primary.cidr is None and primary.ipam_pool_id is None
+
+    @model_validator(mode="after")
+    def check_vpcs(self) -> Self:
+        errors = []
+        names = set()
+        literal_cidrs: list[tuple[str, IPv4Network]] = []
+        for vpc in self.vpcs:
+            if vpc.name in names:
+                errors.append(f"VPC {vpc.name!r} is defined more than once")
+            names.add(vpc.name)
+            if not vpc.cidrs.ipv4:
+                errors.append(f"VPC {vpc.name!r} needs a primary ipv4 CIDR")
+                continue
+            if not self.needs_allocation(vpc):
+                if vpc.primary_cidr.cidr is not None:
+                    literal_cidrs.append((f"VPC {vpc.name!r}", vpc.primary_cidr.cidr))
+                continue
+            if vpc.primary_cidr.size is None:
+                errors.append(f"VPC {vpc.name!r} needs a primary ipv4 cidr or size")
+            elif self.supernet is None:
+                errors.append(
+                    f"VPC {vpc.name!r} has no primary ipv4 cidr, but no supernet is defined"
+                )
+            elif not self.supernet.prefixlen <= vpc.primary_cidr.size <= 28:
+                errors.append(
+                    f"VPC {vpc.name!r} size /{vpc.primary_cidr.size} doesn't fit supernet {self.supernet}"
+                )
+
+        # VPCs with a literal CIDR are left alone by the allocator, so neither
+        # they nor the supernet may overlap
+        if self.supernet is not None:
+            literal_cidrs.append(("the supernet", self.supernet))
+        literal_cidrs.sort(
+            key=lambda item: (item[1].network_address, -item[1].prefixlen)
+        )
+        widest: tuple[str, IPv4Network] | None = None
+        for owner, cidr in literal_cidrs:
+            if (
+                widest is not None
+                and cidr.network_address <= widest[1].broadcast_address
+            ):
+                errors.append(f"{cidr} of {owner} overlaps {widest[1]} of {widest[0]}")
+            if widest is None or cidr.broadcast_address > widest[1].broadcast_address:
+                widest = (owner, cidr)
+
+        if errors:
+            raise VPCConfigError(errors)
         return self
 
 
@@ -0,0 +1,247 @@
+"""Dependency graph of a VPC plan: depth, width, critical path and deploy time.
+
+A resource is created once everything it waits for exists: resources whose
+outputs are in its inputs, explicit `depends_on` and its parent (the SDK only
+registers a child after the parent's registration has finished). The longer
+the chains in that graph, the less the Pulumi engine can create in parallel.
+
+`simulate_deploy` is a small mock engine that schedules the planned resources
+like `pulumi up` does, with a fixed create time per resource type, so configs
+and construction options can be compared without deploying anything::
+
+    python -m pulumi_aws_vpc.dag vpc.yaml [--parallelism N] [--json]
+
+`steps` lists what the engine does to move from one plan to another, to count
+the operations a config change costs.
+"""
+
+import argparse
+import heapq
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass
+from graphlib import TopologicalSorter
+from typing import Any
+
+from pulumi_aws_vpc.planner import Plan, iter_refs, plan_vpc
+
+# Rough create times in seconds; the absolute numbers vary by region and load,
+# the ratios are what matters for comparisons. Cloud Control resources include
+# the polling of the request status, classic resources call EC2 directly.
+DEFAULT_CREATE_SECONDS: dict[str, float] = {
+    "aws-native:ec2:Vpc": 10,
+    "aws-native:ec2:VpcCidrBlock": 15,
+    "aws-native:ec2:Subnet": 5,
+    "aws-native:ec2:InternetGateway": 5,
+    "aws-native:ec2:VpnGateway": 60,
+    "aws-native:ec2:VpcGatewayAttachment": 15,
+    "aws-native:ec2:EgressOnlyInternetGateway": 5,
+    "aws-native:ec2:RouteTable": 5,
+    "aws-native:ec2:PrefixList": 10,
+    "aws-native:ec2:Route": 5,
+    "aws-native:ec2:VpcEndpoint": 15,
+    "aws-native:ec2:SubnetRouteTableAssociation": 5,
+    "aws-native:ec2:GatewayRouteTableAssociation": 5,
+    "aws:ec2:Vpc": 3,
+    "aws:ec2:VpcIpv4CidrBlockAssociation": 5,
+    "aws:ec2:VpcIpv6CidrBlockAssociation": 5,
+    "aws:ec2:Subnet": 2,
+    "aws:ec2:InternetGateway": 1,
+    "aws:ec2:InternetGatewayAttachment": 2,
+    "aws:ec2:VpnGateway": 50,
+    "aws:ec2:VpnGatewayAttachment": 10,
+    "aws:ec2:EgressOnlyInternetGateway": 1,
+    "aws:ec2:RouteTable": 2,
+    "aws:ec2:ManagedPrefixList": 5,
+    "aws:ec2:Route": 1,
+    "aws:ec2:VpcEndpoint": 10,
+    "aws:ec2:RouteTableAssociation": 1,
+}
+FALLBACK_CREATE_SECONDS = 5.0
+# API operations per engine step; a replacement deletes and creates
+STEP_OPERATIONS = {"create": 1, "update": 1, "replace": 2, "delete": 1}
+
+
+@dataclass(slots=True)
+class DagReport:
+    resources: int
+    edges: int
+    # resources on the longest dependency chain
+    depth: int
+    # most resources that can be created at the same time
+    width: int
+    # longest chain by create time, and the deploy time it bounds
+    critical_path: list[str]
+    critical_path_seconds: float
+    # simulated deploy time with the given parallelism
+    deploy_seconds: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def dependencies(plan: Plan) -> dict[str, tuple[str, ...]]:
+    """Keys of the resources each planned resource waits for, in plan order."""
+    graph = {}
+    for key, resource in plan.resources.items():
+        deps = dict.fromkeys(ref.key for ref in iter_refs(resource.inputs))
+        deps.update(dict.fromkeys(resource.depends_on))
+        if resource.parent is not None:
+            deps[resource.parent] = None
+        graph[key] = tuple(deps)
+    return graph
+
+
+def _create_seconds(
+    plan: Plan, create_seconds: dict[str, float] | None
+) -> dict[str, float]:
+    durations = {**DEFAULT_CREATE_SECONDS, **(create_seconds or {})}
+    return {
+        key: durations.get(resource.type, FALLBACK_CREATE_SECONDS)
+        for key, resource in plan.resources.items()
+    }
+
+
+def simulate_deploy(
+    plan: Plan,
+    create_seconds: dict[str, float] | None = None,
+    parallelism: int | None = None,
+) -> float:
+    """Simulated time to create every resource of `plan` from scratch.
+
+    Resources start in plan order (the order the program registers them) as
+    soon as their dependencies exist and one of `parallelism` slots is free;
+    `None` is unbounded, the `pulumi up` default.
+    """
+    graph = dependencies(plan)
+    durations = _create_seconds(plan, create_seconds)
+    order = {key: i for i, key in enumerate(graph)}
+    waiting = {key: len(deps) for key, deps in graph.items()}
+    dependents: dict[str, list[str]] = {key: [] for key in graph}
+    for key, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(key)
+
+    ready = [order[key] for key, count in waiting.items() if count == 0]
+    heapq.heapify(ready)
+    keys = list(graph)
+    running: list[tuple[float, int]] = []
+    now = 0.0
+    while ready or running:
+        while ready and (parallelism is None or len(running) < parallelism):
+            i = heapq.heappop(ready)
+            heapq.heappush(running, (now + durations[keys[i]], i))
+        now, i = heapq.heappop(running)
+        for dependent in dependents[keys[i]]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                heapq.heappush(ready, order[dependent])
+    return now
+
+
+def analyze(
+    plan: Plan,
+    create_seconds: dict[str, float] | None = None,
+    parallelism: int | None = None,
+) -> DagReport:
+    graph = dependencies(plan)
+    durations = _create_seconds(plan, create_seconds)
+    level: dict[str, int] = {}
+    finish: dict[str, float] = {}
+    slowest_dep: dict[str, str | None] = {}
+    for key in TopologicalSorter(graph).static_order():
+        deps = graph[key]
+        level[key] = max((level[d] + 1 for d in deps), default=0)
+        slowest = max(deps, key=finish.__getitem__, default=None)
+        slowest_dep[key] = slowest
+        finish[key] = (finish[slowest] if slowest else 0.0) + durations[key]
+
+    widths: dict[int, int] = {}
+    for n in level.values():
+        widths[n] = widths.get(n, 0) + 1
+    path: list[str] = []
+    last = max(finish, key=finish.__getitem__, default=None)
+    while last is not None:
+        path.append(last)
+        last = slowest_dep[last]
+    return DagReport(
+        resources=len(graph),
+        edges=sum(len(deps) for deps in graph.values()),
+        depth=max(level.values(), default=-1) + 1,
+        width=max(widths.values(), default=0),
+        critical_path=path[::-1],
+        critical_path_seconds=max(finish.values(), default=0.0),
+        deploy_seconds=simulate_deploy(plan, create_seconds, parallelism),
+    )
+
+
+def _snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def steps(old: Plan, new: Plan) -> dict[str, str]:
+    """Engine step per resource that differs between two plans of a VPC.
+
+    A changed resource is replaced when one of the changed inputs is in its
+    `replace_on_changes` and updated in place otherwise. A new parent changes
+    the URN, so it replaces the resource too, unless the old parent is one of
+    its `alias_parents`. Replacements the provider forces on its own aren't
+    known here.
+    """
+    result = {}
+    for key, resource in new.resources.items():
+        previous = old.resources.get(key)
+        if previous is None:
+            result[key] = "create"
+            continue
+        if (
+            resource.parent != previous.parent
+            and previous.parent not in resource.alias_parents
+        ):
+            result[key] = "replace"
+            continue
+        changed = {
+            name
+            for name in resource.inputs.keys() | previous.inputs.keys()
+            if resource.inputs.get(name) != previous.inputs.get(name)
+        }
+        if not changed:
+            continue
+        replace_on = {_snake_case(name) for name in resource.replace_on_changes}
+        if "*" in replace_on or changed & replace_on:
+            result[key] = "replace"
+        else:
+            result[key] = "update"
+    for key in old.resources.keys() - new.resources.keys():
+        result[key] = "delete"
+    return result
+
+
+def main(argv: list[str] | None = None) -> None:
+    from pulumi_aws_vpc.ingest import load_config_files
+
+    parser = argparse.ArgumentParser(prog="python -m pulumi_aws_vpc.dag")
+    parser.add_argument("paths", nargs="+", help="VPC config files")
+    parser.add_argument("--parallelism", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    args = parser.parse_args(argv)
+
+    for config in load_config_files(*args.paths, max_workers=1):
+        report = analyze(plan_vpc(config), parallelism=args.parallelism)
+        if args.json:
+            print(json.dumps({"name": config.name, **report.to_dict()}))
+            continue
+        print(
+            f"{config.name}: {report.resources} resources, {report.edges} edges, "
+            f"depth {report.depth}, width {report.width}, "
+            f"~{report.deploy_seconds:.0f}s to deploy"
+        )
+        print(
+            f"  critical path ({report.critical_path_seconds:.0f}s): "
+            + " -> ".join(report.critical_path)
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
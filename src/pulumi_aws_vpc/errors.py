@@ -1,2 +1,5 @@
-class VPCConfigError(Exception):
-    pass
+class VPCConfigError(ValueError):
+    def __init__(self, errors: list[str]) -> None:
+        self.errors = errors
+        message = "\n".join(f"- {error}" for error in errors)
+        super().__init__(f"{len(errors)} error(s) in VPC config:\n{message}")
@@ -0,0 +1,111 @@
+import pulumi
+from ipaddress import IPv4Network
+from pulumi import Output, ResourceOptions
+from typing import Any, cast
+
+from pulumi_aws_vpc import ipam
+from pulumi_aws_vpc.allocator import SubnetAllocator
+from pulumi_aws_vpc.args import VPCArgs, VPCFleetArgs
+from pulumi_aws_vpc.config import VPCConfig, VPCFleetConfig
+from pulumi_aws_vpc.vpc import VPC
+
+RESOURCE_TYPE = "aws-networking:index:VPCFleet"
+
+
+class VPCFleet(pulumi.ComponentResource):
+    """Many VPCs built by one component.
+
+    VPCs whose primary IPv4 CIDR only has a size get a non-overlapping CIDR from
+    the fleet supernet. With a `LocalIpamAllocator` configured, the supernet is
+    a pool in its file and every member keeps its CIDR once allocated.
+    Otherwise CIDRs are allocated in list order: appending VPCs never moves
+    existing ones, but removing or resizing one moves all later members.
+    Member VPCs share the process-wide region, AZ and next hop lookup caches,
+    so a fleet makes the same invokes as a single VPC.
+    """
+
+    vpc_ids: Output[dict[str, str]]
+    cidrs: Output[dict[str, str]]
+
+    def __init__(
+        self,
+        name: str,
+        args: VPCFleetArgs,
+        opts: ResourceOptions | None = None,
+    ):
+        self.config = VPCFleetConfig.model_validate(args)
+        super().__init__(RESOURCE_TYPE, name, None, opts)
+        # member names are only unique within a fleet
+        self.ipam_owner = f"{pulumi.get_project()}/{pulumi.get_stack()}/{name}"
+        self.allocated_cidrs = self._allocate_vpc_cidrs(self.config)
+        # URNs don't include the parent's name, so member names are prefixed
+        # with the fleet's to keep members of different fleets apart
+        # VPC validates its args with VPCConfig.model_validate, which takes a
+        # validated config as is
+        self.vpcs = {
+            vpc_config.name: VPC(
+                f"{name}-{vpc_config.name}",
+                cast(VPCArgs, self._member_config(vpc_config)),
+                ResourceOptions(parent=self),
+                resource_prefix=f"{name}-{vpc_config.name}",
+            )
+            for vpc_config in self.config.vpcs
+        }
+        self.vpc_ids = Output.all(
+            **{name: vpc.vpc_id for name, vpc in self.vpcs.items()}
+        )
+        self.cidrs = Output.all(
+            **{name: vpc.vpc.cidr_block for name, vpc in self.vpcs.items()}
+        )
+        self.register_outputs(self.outputs)
+
+    def _allocate_vpc_cidrs(self, config: VPCFleetConfig) -> dict[str, str]:
+        if config.supernet is None:
+            return {}
+        sizes = {
+            vpc_config.name: vpc_config.primary_cidr.size
+            for vpc_config in config.vpcs
+            if config.needs_allocation(vpc_config)
+        }
+        if isinstance(ipam.allocator, ipam.LocalIpamAllocator):
+            pool_id = f"fleet:{self.ipam_owner}"
+            ipam.allocator.define_pool(pool_id, [str(config.supernet)])
+            return {
+                name: ipam.allocator.allocate(
+                    pool_id, f"{self.ipam_owner}/{name}", size
+                )
+                for name, size in sizes.items()
+                if size is not None
+            }
+        allocator = SubnetAllocator(str(config.supernet))
+        return {
+            name: allocator.allocate(size)
+            for name, size in sizes.items()
+            if size is not None
+        }
+
+    def _member_config(self, vpc_config: VPCConfig) -> VPCConfig:
+        """Member config with fleet tags and its allocated primary CIDR.
+
+        In previews, CIDRs from IPAM pools get their simulated block here, with
+        the fleet in the owner key.
+
+        The result is already validated, so `VPC` uses it as is.
+        """
+        update: dict[str, Any] = {
+            "common_tags": {**self.config.common_tags, **vpc_config.common_tags}
+        }
+        if vpc_config.name in self.allocated_cidrs:
+            primary = vpc_config.primary_cidr.model_copy(
+                update={"cidr": IPv4Network(self.allocated_cidrs[vpc_config.name])}
+            )
+            ipv4 = [primary, *vpc_config.secondary_ipv4_cidrs]
+            update["cidrs"] = vpc_config.cidrs.model_copy(update={"ipv4": ipv4})
+        return ipam.assign_cidrs(
+            vpc_config.model_copy(update=update),
+            f"{self.ipam_owner}/{vpc_config.name}",
+        )
+
+    @property
+    def outputs(self) -> dict[str, Any]:
+        return {"vpc_ids": self.vpc_ids, "cidrs": self.cidrs}
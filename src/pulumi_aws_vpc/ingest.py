@@ -0,0 +1,221 @@
+import itertools
+import json
+import os
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from ipaddress import IPv4Network, IPv6Network
+from pathlib import Path
+from typing import Any, Literal
+
+import pydantic
+
+from pulumi_aws_vpc.config import SubnetIPv4Cidr, SubnetIPv6Cidr, VPCConfig
+from pulumi_aws_vpc.errors import VPCConfigError
+from pulumi_aws_vpc.utils import divide_supernet_into_subnets
+
+Document = dict[str, Any]
+# Unparsed document text, so that parsing happens in the worker processes too
+RawDocument = tuple[Literal["json", "yaml"], str]
+Prepared = tuple[VPCConfig | None, list[str]]
+# chunks submitted to the pool per worker before the oldest one is collected
+PENDING_CHUNKS_PER_WORKER = 2
+
+
+def iter_documents(path: str | Path) -> Iterator[RawDocument]:
+    """Stream VPC config documents from a file without parsing them.
+
+    `.jsonl`/`.ndjson` files hold one config per line and `.yaml`/`.yml` files
+    one config (or a list of configs) per YAML document; documents are split on
+    `---` lines at the start of a line. A `.json` file is a single document
+    with one config or a list of configs. YAML support needs PyYAML.
+    """
+    path = Path(path)
+    with open(path) as f:
+        if path.suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield ("json", line)
+        elif path.suffix == ".json":
+            yield ("json", f.read())
+        elif path.suffix in (".yaml", ".yml"):
+            lines: list[str] = []
+            for line in itertools.chain(f, ["---"]):
+                if line.startswith("---"):
+                    text = "".join(lines)
+                    if text.strip():
+                        yield ("yaml", text)
+                    lines = [line[3:]]
+                else:
+                    lines.append(line)
+        else:
+            raise ValueError(f"Unsupported config file type: {path}")
+
+
+def parse_document(document: RawDocument) -> Any:
+    fmt, text = document
+    if fmt == "json":
+        return json.loads(text)
+    try:
+        import yaml
+    except ImportError as e:
+        raise ImportError("PyYAML is required to read YAML configs") from e
+    try:
+        # the libyaml based loader is an order of magnitude faster
+        return yaml.load(text, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML: {e}") from e
+
+
+def plan_subnet_cidrs(config: VPCConfig) -> VPCConfig:
+    """Fill in CIDRs of subnets that only define a size, where the VPC CIDR is known.
+
+    This is the same allocation `VPC` does at construction time, so a planned
+    config builds identical subnets without allocating again. Subnets in IPAM
+    or Amazon provided CIDRs are left alone.
+
+    The config is changed in place and returned; pass a `model_copy(deep=True)`
+    to keep the original. `load_configs` plans configs it just validated, so
+    nothing else sees them unplanned.
+    """
+    vpc_cidrs: dict[str, list[IPv4Network | IPv6Network | None]] = {
+        "ipv4": [cidr_obj.cidr for cidr_obj in config.cidrs.ipv4],
+        "ipv6": [cidr_obj.cidr for cidr_obj in config.cidrs.ipv6],
+    }
+    for ip_version in ("ipv4", "ipv6"):
+        groups: defaultdict[int, list[SubnetIPv4Cidr | SubnetIPv6Cidr]] = defaultdict(
+            list
+        )
+        sizes: defaultdict[int, list[int]] = defaultdict(list)
+        for subnet in config.subnets:
+            cidr_cfg = getattr(subnet, ip_version)
+            # validation makes sure subnets without a CIDR have a size
+            if cidr_cfg and not cidr_cfg.cidr and cidr_cfg.size is not None:
+                groups[cidr_cfg.cidr_num].append(cidr_cfg)
+                sizes[cidr_cfg.cidr_num].append(cidr_cfg.size)
+        for cidr_num, cidr_cfgs in groups.items():
+            vpc_cidr = vpc_cidrs[ip_version][cidr_num - 1]
+            if vpc_cidr is None:
+                continue
+            allocated_cidrs = divide_supernet_into_subnets(
+                str(vpc_cidr), sizes[cidr_num]
+            )
+            for cidr_cfg, cidr in zip(cidr_cfgs, allocated_cidrs):
+                cidr_cfg.cidr = cidr
+    return config
+
+
+def _error_messages(error: Exception) -> list[str]:
+    if not isinstance(error, pydantic.ValidationError):
+        return [str(error)]
+    messages = []
+    for details in error.errors():
+        ctx_error = details.get("ctx", {}).get("error")
+        if isinstance(ctx_error, VPCConfigError):
+            messages.extend(ctx_error.errors)
+        else:
+            location = ".".join(str(part) for part in details["loc"])
+            messages.append(
+                f"{location}: {details['msg']}" if location else details["msg"]
+            )
+    return messages
+
+
+def _prepare_one(document: Any, label: str) -> Prepared:
+    try:
+        return plan_subnet_cidrs(VPCConfig.model_validate(document)), []
+    except ValueError as e:
+        name = document.get("name") if isinstance(document, dict) else None
+        label += f" ({name!r})" if name else ""
+        return None, [f"{label}: {message}" for message in _error_messages(e)]
+
+
+def _prepare(item: tuple[int, Document | RawDocument]) -> list[Prepared]:
+    """Parse, validate and plan one document."""
+    index, document = item
+    label = f"Document {index}"
+    if isinstance(document, tuple):
+        try:
+            document = parse_document(document)
+        except ValueError as e:
+            return [(None, [f"{label}: {e}"])]
+    if isinstance(document, list):
+        return [
+            _prepare_one(config, f"{label}, item {i}")
+            for i, config in enumerate(document)
+        ]
+    return [_prepare_one(document, label)]
+
+
+def _prepare_chunk(items: list[tuple[int, Document | RawDocument]]) -> list[Prepared]:
+    """`_prepare` for a chunk of documents. Runs in worker processes."""
+    return [prepared for item in items for prepared in _prepare(item)]
+
+
+def _prepare_in_pool(
+    items: Iterator[tuple[int, Document | RawDocument]],
+    max_workers: int,
+    chunksize: int,
+) -> Iterator[Prepared]:
+    """Prepare documents in a process pool, in order.
+
+    Unlike `executor.map`, which submits the whole input up front, only a few
+    chunks per worker are pending at a time, so documents are read from
+    `items` as the workers get through them.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending: deque[Future[list[Prepared]]] = deque()
+        while chunk := list(itertools.islice(items, chunksize)):
+            if len(pending) >= max_workers * PENDING_CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_prepare_chunk, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def load_configs(
+    documents: Iterable[Document | RawDocument],
+    max_workers: int | None = None,
+    chunksize: int = 8,
+) -> list[VPCConfig]:
+    """Parse, validate and plan VPC configs in a process pool.
+
+    Documents are config dicts or unparsed documents from `iter_documents`; a
+    document holding a list of configs contributes all of them. Configs are
+    returned in input order, ready to be passed to `VPC`. Errors of
+    all documents are collected and raised as one `VPCConfigError`, ordered by
+    document, so the report doesn't depend on how work was scheduled.
+    `max_workers` defaults to the number of CPUs. With one worker, or on a
+    single CPU, all the work is done in the calling process, since shipping
+    validated configs back from a worker costs about as much as validating
+    them. Documents are sent to the workers in chunks of `chunksize`.
+    """
+    items = enumerate(documents)
+    cpu_count = os.cpu_count() or 1
+    if max_workers is None:
+        max_workers = cpu_count
+    results: Iterable[Prepared]
+    if max_workers == 1 or cpu_count == 1:
+        results = itertools.chain.from_iterable(map(_prepare, items))
+    else:
+        results = _prepare_in_pool(items, max_workers, chunksize)
+
+    configs = []
+    errors = []
+    for config, doc_errors in results:
+        errors.extend(doc_errors)
+        if config is not None:
+            configs.append(config)
+    if errors:
+        raise VPCConfigError(errors)
+    return configs
+
+
+def load_config_files(
+    *paths: str | Path,
+    max_workers: int | None = None,
+    chunksize: int = 8,
+) -> list[VPCConfig]:
+    """`load_configs` for the documents of one or more files, in order."""
+    documents = itertools.chain.from_iterable(iter_documents(path) for path in paths)
+    return load_configs(documents, max_workers=max_workers, chunksize=chunksize)
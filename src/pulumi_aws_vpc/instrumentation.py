@@ -0,0 +1,143 @@
+import json
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import pulumi
+
+
+@dataclass(slots=True)
+class PhaseStats:
+    name: str
+    start_ns: int
+    end_ns: int
+    resources: int
+    invokes: int
+    outputs: int
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+
+class _Counter:
+    """Counts calls to a method while patched in, restoring it afterwards."""
+
+    def __init__(self, cls: type, method: str) -> None:
+        self.cls = cls
+        self.method = method
+        self.count = 0
+
+    @contextmanager
+    def patch(self) -> Iterator[None]:
+        original = getattr(self.cls, self.method)
+
+        def counted(*args: Any, **kwargs: Any) -> Any:
+            self.count += 1
+            return original(*args, **kwargs)
+
+        setattr(self.cls, self.method, counted)
+        try:
+            yield
+        finally:
+            setattr(self.cls, self.method, original)
+
+
+class PhaseRecorder:
+    """Opt-in per-phase profiling of component construction.
+
+    For each phase it records wall time and how many resources, invokes and
+    Outputs were created. Resources and Outputs are counted by temporarily
+    wrapping `pulumi.Resource.__init__` and the SDK hook every Output goes
+    through, so nothing is patched unless instrumentation is enabled.
+    """
+
+    def __init__(
+        self,
+        component: str,
+        invoke_count: Callable[[], int],
+        spans_file: str | None = None,
+    ) -> None:
+        self.component = component
+        self.invoke_count = invoke_count
+        self.spans_file = spans_file
+        self.phases: list[PhaseStats] = []
+        self.start_ns = time.time_ns()
+        self._resources = _Counter(pulumi.Resource, "__init__")
+        self._outputs = _Counter(
+            pulumi.Output, "_track" if hasattr(pulumi.Output, "_track") else "__init__"
+        )
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        resources, outputs = self._resources.count, self._outputs.count
+        invokes = self.invoke_count()
+        start_ns = time.time_ns()
+        with self._resources.patch(), self._outputs.patch():
+            yield
+        self.phases.append(
+            PhaseStats(
+                name=name,
+                start_ns=start_ns,
+                end_ns=time.time_ns(),
+                resources=self._resources.count - resources,
+                invokes=self.invoke_count() - invokes,
+                outputs=self._outputs.count - outputs,
+            )
+        )
+
+    def summary(self) -> dict[str, dict[str, float | int]]:
+        return {
+            phase.name: {
+                "duration_ms": round(phase.duration_ms, 3),
+                "resources": phase.resources,
+                "invokes": phase.invokes,
+                "outputs": phase.outputs,
+            }
+            for phase in self.phases
+        }
+
+    def export(self, resource: pulumi.Resource) -> None:
+        """Log one structured record per phase and write spans if configured."""
+        for name, stats in self.summary().items():
+            record = {"component": self.component, "phase": name, **stats}
+            pulumi.log.info(json.dumps(record), resource=resource)
+        if self.spans_file:
+            self.write_spans(self.spans_file)
+
+    def write_spans(self, path: str) -> None:
+        """Append OpenTelemetry-style spans as JSON lines: one per phase under a root span."""
+        trace_id = os.urandom(16).hex()
+        root_span_id = os.urandom(8).hex()
+        end_ns = self.phases[-1].end_ns if self.phases else time.time_ns()
+        spans: list[dict[str, Any]] = [
+            {
+                "name": self.component,
+                "trace_id": trace_id,
+                "span_id": root_span_id,
+                "parent_span_id": None,
+                "start_time_unix_nano": self.start_ns,
+                "end_time_unix_nano": end_ns,
+                "attributes": {},
+            }
+        ]
+        for phase in self.phases:
+            attributes = asdict(phase)
+            del attributes["name"], attributes["start_ns"], attributes["end_ns"]
+            spans.append(
+                {
+                    "name": f"{self.component}.{phase.name}",
+                    "trace_id": trace_id,
+                    "span_id": os.urandom(8).hex(),
+                    "parent_span_id": root_span_id,
+                    "start_time_unix_nano": phase.start_ns,
+                    "end_time_unix_nano": phase.end_ns,
+                    "attributes": attributes,
+                }
+            )
+        with open(path, "a") as f:
+            for span in spans:
+                f.write(json.dumps(span) + "\n")
@@ -0,0 +1,218 @@
+"""IPAM allocators: VPC CIDRs from an IPAM pool that are known at preview.
+
+A VPC CIDR with an `ipam_pool_id` and a size is normally assigned by AWS IPAM
+when the VPC is created, so every subnet CIDR derived from it is unknown in
+previews. With an allocator configured, previews ask it for a block of that
+size before planning, so they show the subnets as they would be allocated
+from that block. The block is only used for subnet CIDRs: previews and
+`pulumi up` send the same pool and netmask length for the VPC CIDR and leave
+the choice to AWS IPAM, as the simulated block doesn't come from the real pool
+and sending it would change the CIDR of VPCs that AWS IPAM already assigned one.
+
+`LocalIpamAllocator` simulates pools in a JSON file, for previews and fleets
+without a live IPAM service:
+
+    {"pools": {"ipam-pool-0123": {"cidrs": ["10.0.0.0/8"], "allocations": {}}}}
+
+Allocations are kept per owner (project, stack, VPC and CIDR), so a block
+stays the same across runs and is never handed to another owner. Every
+allocation locks the file, so concurrent stack runs sharing it don't hand out
+overlapping blocks. Any object with an `allocate` method can be used instead,
+e.g. one backed by a team's own address management.
+"""
+
+import json
+import os
+import sys
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from ipaddress import ip_network
+from pathlib import Path
+from typing import IO, Any, Protocol
+
+import netaddr
+import pulumi
+
+from pulumi_aws_vpc.config import IPv4VPCCidr, IPv6VPCCidr, VPCConfig
+
+IPAM_FILE_ENV_VAR = "PULUMI_AWS_VPC_IPAM_FILE"
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock(file: IO[Any]) -> None:
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(file: IO[Any]) -> None:
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(file: IO[Any]) -> None:
+        fcntl.flock(file, fcntl.LOCK_EX)
+
+    def _unlock(file: IO[Any]) -> None:
+        fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class IpamAllocator(Protocol):
+    def allocate(self, pool_id: str, owner: str, prefixlen: int) -> str:
+        """CIDR of `prefixlen` from the pool, the same one for every call by `owner`."""
+        ...
+
+
+def _first_free(
+    pool: netaddr.IPNetwork, taken: list[netaddr.IPNetwork], prefixlen: int
+) -> netaddr.IPNetwork | None:
+    """Lowest aligned block of `prefixlen` in `pool` that overlaps nothing taken."""
+    width = 32 if pool.version == 4 else 128
+    if not pool.prefixlen <= prefixlen <= width:
+        return None
+    size = 1 << (width - prefixlen)
+    candidate = pool.first
+    for block in sorted(taken, key=lambda block: block.first):
+        if block.last < candidate:
+            continue
+        if candidate + size <= block.first:
+            break
+        # move past the block, up to the next aligned start
+        candidate = -(-(block.last + 1) // size) * size
+    if candidate + size - 1 > pool.last:
+        return None
+    return netaddr.IPNetwork((candidate, prefixlen), version=pool.version)
+
+
+class LocalIpamAllocator:
+    """IPAM pools simulated in a JSON file, see the module docstring.
+
+    Examples:
+    >>> import tempfile
+    >>> path = Path(tempfile.mkdtemp()) / "ipam.json"
+    >>> ipam = LocalIpamAllocator(path, {"pool-1": ["10.0.0.0/8"]})
+    >>> ipam.allocate("pool-1", "a", 16), ipam.allocate("pool-1", "b", 12)
+    ('10.0.0.0/16', '10.16.0.0/12')
+    >>> LocalIpamAllocator(path).allocate("pool-1", "a", 16)
+    '10.0.0.0/16'
+    """
+
+    def __init__(
+        self, path: str | Path, pools: dict[str, list[str]] | None = None
+    ) -> None:
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(f"{self.path.name}.lock")
+        for pool_id, cidrs in (pools or {}).items():
+            self.define_pool(pool_id, cidrs)
+
+    @classmethod
+    def from_env(cls) -> "LocalIpamAllocator | None":
+        path = os.environ.get(IPAM_FILE_ENV_VAR)
+        return cls(path) if path else None
+
+    def define_pool(self, pool_id: str, cidrs: list[str]) -> None:
+        """Create the pool or set its CIDRs, keeping its allocations.
+
+        Allocations outside the new CIDRs move on their owner's next request.
+        """
+        with self._state() as state:
+            pool = state["pools"].setdefault(pool_id, {"allocations": {}})
+            pool["cidrs"] = [str(netaddr.IPNetwork(cidr).cidr) for cidr in cidrs]
+
+    @contextmanager
+    def _state(self) -> Iterator[dict[str, Any]]:
+        """Read, yield and write back the state while holding the file lock."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+") as lock_file:
+            _lock(lock_file)
+            try:
+                state: dict[str, Any] = {"pools": {}}
+                if self.path.exists():
+                    state = json.loads(self.path.read_text())
+                yield state
+                tmp_file = self.path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_file.write_text(json.dumps(state, indent=2, sort_keys=True))
+                tmp_file.replace(self.path)
+            finally:
+                _unlock(lock_file)
+
+    def allocate(self, pool_id: str, owner: str, prefixlen: int) -> str:
+        with self._state() as state:
+            if pool_id not in state["pools"]:
+                raise ValueError(f"IPAM pool {pool_id!r} is not defined in {self.path}")
+            pool = state["pools"][pool_id]
+            allocations: dict[str, str] = pool.setdefault("allocations", {})
+            current = allocations.get(owner)
+            if current is not None:
+                block = netaddr.IPNetwork(current)
+                pool_cidrs = [netaddr.IPNetwork(cidr) for cidr in pool["cidrs"]]
+                if block.prefixlen == prefixlen and any(block in c for c in pool_cidrs):
+                    return current
+            # a new size releases the old block, like replacing the VPC would
+            taken = [
+                netaddr.IPNetwork(cidr) for o, cidr in allocations.items() if o != owner
+            ]
+            for cidr in pool["cidrs"]:
+                block = _first_free(netaddr.IPNetwork(cidr), taken, prefixlen)
+                if block is not None:
+                    allocations[owner] = str(block)
+                    return str(block)
+            # raised while the lock is held, so the state isn't written back
+            raise ValueError(
+                f"IPAM pool {pool_id!r} has no free /{prefixlen} for {owner!r}"
+            )
+
+    def release(self, owner_prefix: str) -> list[str]:
+        """Release the blocks of all owners starting with `owner_prefix`.
+
+        Destroyed VPCs keep their blocks until released, as the component can't
+        tell a removed VPC from one that is only not part of this run.
+        """
+        released = []
+        with self._state() as state:
+            for pool in state["pools"].values():
+                allocations = pool.get("allocations", {})
+                for owner in [o for o in allocations if o.startswith(owner_prefix)]:
+                    released.append(allocations.pop(owner))
+        return released
+
+
+allocator: IpamAllocator | None = LocalIpamAllocator.from_env()
+
+
+def assign_cidrs(
+    config: VPCConfig, owner: str, ipam: IpamAllocator | None = None
+) -> VPCConfig:
+    """Config with a simulated block for every VPC CIDR with only a pool and size.
+
+    Only in previews; otherwise, or without an allocator (`ipam` or the
+    module-level `allocator`), the config is returned as is. `owner` has to be
+    unique per VPC across all stacks sharing the allocator.
+    """
+    ipam = ipam or allocator
+    if ipam is None or not pulumi.runtime.is_dry_run():
+        return config
+    cidrs: dict[str, list[Any]] = {"ipv4": [], "ipv6": []}
+    changed = False
+    versions: list[tuple[str, Sequence[IPv4VPCCidr | IPv6VPCCidr]]] = [
+        ("ipv4", config.cidrs.ipv4),
+        ("ipv6", config.cidrs.ipv6),
+    ]
+    for ip_version, cidr_objs in versions:
+        for i, cidr_obj in enumerate(cidr_objs):
+            if (
+                cidr_obj.cidr is None
+                and cidr_obj.allocated_cidr is None
+                and cidr_obj.ipam_pool_id is not None
+                and cidr_obj.size is not None
+            ):
+                cidr = ipam.allocate(
+                    cidr_obj.ipam_pool_id, f"{owner}/{ip_version}/{i}", cidr_obj.size
+                )
+                cidr_obj = cidr_obj.model_copy(
+                    update={"allocated_cidr": ip_network(cidr)}
+                )
+                changed = True
+            cidrs[ip_version].append(cidr_obj)
+    if not changed:
+        return config
+    return config.model_copy(update={"cidrs": config.cidrs.model_copy(update=cidrs)})
@@ -0,0 +1,250 @@
+import json
+import os
+import time
+import weakref
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pulumi
+
+from pulumi_aws_vpc.utils import lazy_import
+
+if TYPE_CHECKING:
+    import pulumi_aws as aws
+    import pulumi_aws_native as awscc
+else:
+    aws = lazy_import("pulumi_aws")
+    awscc = lazy_import("pulumi_aws_native")
+
+CACHE_DIR_ENV_VAR = "PULUMI_AWS_VPC_CACHE_DIR"
+CACHE_TTL_ENV_VAR = "PULUMI_AWS_VPC_CACHE_TTL"
+OFFLINE_FIXTURE_ENV_VAR = "PULUMI_AWS_VPC_OFFLINE_FIXTURE"
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+CACHE_FILE_NAME = "facts.json"
+
+
+def current_run() -> tuple[object, ...]:
+    """(project, stack, root resource) of the current stack run.
+
+    The root Stack resource stands in for the engine connection, which isn't
+    public; it is created anew for every run in a process, e.g. by the
+    automation API.
+    """
+    return (
+        pulumi.get_project(),
+        pulumi.get_stack(),
+        pulumi.runtime.get_root_resource(),
+    )
+
+
+class FactsCache:
+    """Process-wide cache of region and availability zone IDs.
+
+    The region is cached per provider (the default provider of the current
+    stack run or an explicit provider object), AZ IDs are cached per region. AZ IDs can also be kept on
+    disk for `ttl` seconds, so new provider processes don't invoke again.
+    In offline mode all values come from a local JSON fixture:
+
+        {"region": "eu-central-1", "az_ids": {"eu-central-1": ["euc1-az1"]}}
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        ttl: float = DEFAULT_CACHE_TTL,
+        offline_fixture: str | Path | None = None,
+    ) -> None:
+        self.cache_file = Path(cache_dir) / CACHE_FILE_NAME if cache_dir else None
+        self.ttl = ttl
+        self.offline = None
+        if offline_fixture:
+            self.offline = json.loads(Path(offline_fixture).read_text())
+        self.invokes = 0
+        # stack run and region of its default provider, whose config can
+        # differ between runs in one process
+        self._default_region: tuple[tuple[object, ...], str] | None = None
+        self._provider_regions: weakref.WeakKeyDictionary[
+            pulumi.ProviderResource, str
+        ] = weakref.WeakKeyDictionary()
+        self._az_ids: dict[str, list[str]] = {}
+
+    @classmethod
+    def from_env(cls) -> "FactsCache":
+        return cls(
+            cache_dir=os.environ.get(CACHE_DIR_ENV_VAR),
+            ttl=float(os.environ.get(CACHE_TTL_ENV_VAR, DEFAULT_CACHE_TTL)),
+            offline_fixture=os.environ.get(OFFLINE_FIXTURE_ENV_VAR),
+        )
+
+    def get_region(self, parent: pulumi.Resource) -> str:
+        if self.offline is not None:
+            return str(self.offline["region"])
+
+        provider = parent.get_provider("aws-native::")
+        run = current_run()
+        if provider is None and self._default_region is not None:
+            default_run, default_region = self._default_region
+            if default_run == run:
+                return default_region
+        if provider is not None and provider in self._provider_regions:
+            return self._provider_regions[provider]
+
+        self.invokes += 1
+        region = awscc.get_region(opts=pulumi.InvokeOptions(parent=parent)).region
+        if provider is None:
+            self._default_region = (run, region)
+        else:
+            self._provider_regions[provider] = region
+        return region
+
+    def get_az_ids(self, parent: pulumi.Resource) -> list[str]:
+        region = self.get_region(parent)
+        if self.offline is not None:
+            return list(self.offline["az_ids"][region])
+        if region in self._az_ids:
+            return self._az_ids[region]
+
+        az_ids = self._read_disk("az_ids", region)
+        if az_ids is None:
+            self.invokes += 1
+            az_ids = list(
+                aws.get_availability_zones(
+                    state="available", opts=pulumi.InvokeOptions(parent=parent)
+                ).zone_ids
+            )
+            self._write_disk("az_ids", region, az_ids)
+        self._az_ids[region] = az_ids
+        return az_ids
+
+    def _read_disk(self, kind: str, key: str) -> list[str] | None:
+        if self.cache_file is None or not self.cache_file.exists():
+            return None
+        try:
+            entry = json.loads(self.cache_file.read_text())[kind][key]
+        except (KeyError, ValueError):
+            return None
+        if entry["expires"] < time.time():
+            return None
+        return list(entry["value"])
+
+    def _write_disk(self, kind: str, key: str, value: list[str]) -> None:
+        if self.cache_file is None:
+            return
+        data: dict[str, dict[str, dict[str, object]]] = {}
+        if self.cache_file.exists():
+            try:
+                data = json.loads(self.cache_file.read_text())
+            except ValueError:
+                data = {}
+        data.setdefault(kind, {})[key] = {
+            "value": value,
+            "expires": time.time() + self.ttl,
+        }
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(data, indent=2))
+        tmp_file.replace(self.cache_file)
+
+
+facts_cache = FactsCache.from_env()
+
+
+def default_provider_setting(parent: pulumi.Resource, name: str) -> str | None:
+    """`profile` or `role_arn` of the default aws-native provider.
+
+    The settings of an explicit provider can't be read back, so a component
+    with one has to set the values it needs itself.
+    """
+    if parent.get_provider("aws-native::") is not None:
+        raise ValueError(
+            f"The {name} of an explicit aws-native provider isn't available to "
+            "the RouteSets of bulk_routes, set deployment.route_set_profile or "
+            "deployment.route_set_role_arn"
+        )
+    config = pulumi.Config("aws-native")
+    if name == "profile":
+        return config.get("profile")
+    if name == "role_arn":
+        assume_role = config.get_object("assumeRole") or {}
+        role_arn = assume_role.get("roleArn")
+        return str(role_arn) if role_arn else None
+    raise ValueError(f"Unknown provider setting: {name}")
+
+
+def normalize_reference(ref: str) -> tuple[str, ...]:
+    """Normalize a `pcx@` reference so equivalent spellings share one lookup.
+
+    >>> normalize_reference(" ssm:/my-peering/id ")
+    ('ssm', '/my-peering/id')
+    >>> normalize_reference("tag:Name=MyPeering, tag:Environment=dev")
+    ('filter', 'tag:Environment=dev', 'tag:Name=MyPeering')
+    """
+    ref = ref.strip()
+    if ref.startswith("ssm:"):
+        return ("ssm", ref.removeprefix("ssm:").strip())
+    items = []
+    for item in ref.split(","):
+        k, _, v = item.partition("=")
+        items.append(f"{k.strip()}={v.strip()}")
+    return ("filter", *sorted(items))
+
+
+class ReferenceLookups:
+    """Deduplicated invokes for next hop references such as `pcx@...`.
+
+    Each distinct reference is looked up once per provider; the resulting
+    Outputs are shared by all components of a stack run through `shared`,
+    while hits and misses are counted per component.
+    """
+
+    shared: dict[tuple[object, ...], pulumi.Output[str]] = {}
+    # `current_run()` of the run the shared Outputs belong to
+    shared_run: tuple[object, ...] | None = None
+
+    @classmethod
+    def shared_lookups(cls) -> dict[tuple[object, ...], pulumi.Output[str]]:
+        """Shared Outputs of the current stack run.
+
+        Outputs are bound to the engine of the run that created them, so a new
+        run in the same process, e.g. of another stack or a second update with
+        the automation API, starts empty.
+        """
+        run = current_run()
+        if run != cls.shared_run:
+            cls.shared.clear()
+            cls.shared_run = run
+        return cls.shared
+
+    def __init__(self, parent: pulumi.Resource) -> None:
+        self.parent = parent
+        self.hits = 0
+        self.misses = 0
+
+    def vpc_peering_connection_id(self, ref: str) -> pulumi.Output[str]:
+        """Resolve `ssm:<parameter>` or `tag:<key>=<value>,<arg>=<value>`."""
+        key = normalize_reference(ref)
+        provider_pkg = "aws-native::" if key[0] == "ssm" else "aws::"
+        cache_key = (self.parent.get_provider(provider_pkg), *key)
+        shared = self.shared_lookups()
+        if cache_key in shared:
+            self.hits += 1
+            return shared[cache_key]
+
+        self.misses += 1
+        opts = pulumi.InvokeOptions(parent=self.parent)
+        if key[0] == "ssm":
+            pcx_id = awscc.get_ssm_parameter_string_output(name=key[1], opts=opts).value
+        else:
+            tags = {}
+            args: dict[str, Any] = {}
+            for item in key[1:]:
+                k, _, v = item.partition("=")
+                if k.startswith("tag:"):
+                    tags[k.removeprefix("tag:")] = v
+                else:
+                    args[k] = v
+            pcx_id = aws.ec2.get_vpc_peering_connection_output(
+                tags=tags if tags else None, **args, opts=opts
+            ).id
+        shared[cache_key] = pcx_id
+        return pcx_id
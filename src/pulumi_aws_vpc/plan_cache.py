@@ -0,0 +1,218 @@
+import gc
+import hashlib
+import importlib.metadata
+import marshal
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+from pulumi_aws_vpc import allocator, backends, planner, utils
+from pulumi_aws_vpc.config import VPCConfig
+from pulumi_aws_vpc.lookups import CACHE_DIR_ENV_VAR
+from pulumi_aws_vpc.planner import Lookup, Plan, PlannedResource, Ref, SubnetCidr
+
+MAX_BYTES_ENV_VAR = "PULUMI_AWS_VPC_PLAN_CACHE_MAX_BYTES"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+CACHE_SUBDIR = "plans"
+FORMAT = b"VPCPLAN3"
+
+
+def _encode_marker(marker: Ref | Lookup | SubnetCidr) -> tuple[Any, ...]:
+    if isinstance(marker, Ref):
+        return (0, marker.key, marker.attr)
+    if isinstance(marker, Lookup):
+        return (1, marker.kind, marker.key)
+    return (
+        2,
+        marker.source.key,
+        marker.source.attr,
+        marker.prefix_lengths,
+        marker.index,
+    )
+
+
+def _decode_marker(data: tuple[Any, ...]) -> Ref | Lookup | SubnetCidr:
+    if data[0] == 0:
+        return Ref(data[1], data[2])
+    if data[0] == 1:
+        return Lookup(data[1], data[2])
+    return SubnetCidr(Ref(data[1], data[2]), data[3], data[4])
+
+
+def _split_markers(
+    value: Any, path: tuple[Any, ...], markers: list[tuple[Any, ...]]
+) -> Any:
+    """Copy of `value` without markers, which are collected with their path.
+
+    Loading then only has to visit the few markers of a resource instead of
+    every input value.
+    """
+    if isinstance(value, dict):
+        return {k: _split_markers(v, (*path, k), markers) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_split_markers(v, (*path, i), markers) for i, v in enumerate(value)]
+    if isinstance(value, (Ref, Lookup, SubnetCidr)):
+        markers.append((path, _encode_marker(value)))
+        return None
+    return value
+
+
+def dumps_plan(plan: Plan) -> bytes:
+    """Serialize a plan as zlib compressed marshal data of plain tuples."""
+    rows = []
+    for r in plan.resources.values():
+        markers: list[tuple[Any, ...]] = []
+        inputs = _split_markers(r.inputs, (), markers)
+        rows.append(
+            (
+                r.key,
+                r.type,
+                r.name,
+                r.phase,
+                inputs,
+                tuple(markers),
+                r.parent,
+                r.depends_on,
+                r.delete_before_replace,
+                r.replace_on_changes,
+                r.alias_parents,
+                r.retain_on_delete,
+            )
+        )
+    return FORMAT + zlib.compress(marshal.dumps(rows), 1)
+
+
+def loads_plan(data: bytes) -> Plan:
+    if not data.startswith(FORMAT):
+        raise ValueError("Not a serialized plan")
+    # loading allocates many small containers that all survive, so collection
+    # passes while loading are wasted work
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        rows = marshal.loads(zlib.decompress(data[len(FORMAT) :]))
+        resources = {}
+        # markers are immutable and repeat a lot (the VPC ID, route table IDs)
+        decoded: dict[tuple[Any, ...], Ref | Lookup | SubnetCidr] = {}
+        for key, type_, name, phase, inputs, markers, *opts in rows:
+            for path, marker in markers:
+                container = inputs
+                for part in path[:-1]:
+                    container = container[part]
+                if marker not in decoded:
+                    decoded[marker] = _decode_marker(marker)
+                container[path[-1]] = decoded[marker]
+            resources[key] = PlannedResource(key, type_, name, phase, inputs, *opts)
+        return Plan(resources)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+class PlanCache:
+    """On-disk cache of VPC plans, keyed by a hash of the normalized config.
+
+    Plans don't depend on the region or AZ IDs (they are resolved when
+    resources are emitted), so entries stay valid across regions and accounts.
+    The key also covers the package version, the sources of the planner and
+    the modules it allocates CIDRs with, and the Python version, as the
+    marshal format is version specific. Least recently used entries are
+    removed once the cache grows past `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._planner_digest: bytes | None = None
+
+    @classmethod
+    def from_env(cls) -> "PlanCache":
+        cache_dir = os.environ.get(CACHE_DIR_ENV_VAR)
+        return cls(
+            cache_dir=Path(cache_dir) / CACHE_SUBDIR if cache_dir else None,
+            max_bytes=int(os.environ.get(MAX_BYTES_ENV_VAR, DEFAULT_MAX_BYTES)),
+        )
+
+    def key(self, config: VPCConfig, resource_prefix: str | None = None) -> str:
+        if self._planner_digest is None:
+            planner_digest = hashlib.sha256(
+                importlib.metadata.version("pulumi-aws-vpc").encode()
+            )
+            for module in (planner, backends, utils, allocator):
+                planner_digest.update(Path(module.__file__ or "").read_bytes())
+            self._planner_digest = planner_digest.digest()
+        digest = hashlib.sha256(FORMAT)
+        digest.update(self._planner_digest)
+        digest.update(f"{sys.version_info[:2]}|{resource_prefix}|".encode())
+        digest.update(config.model_dump_json().encode())
+        return digest.hexdigest()[:32]
+
+    def get_or_plan(
+        self, config: VPCConfig, resource_prefix: str | None = None
+    ) -> Plan:
+        if self.cache_dir is None:
+            return planner.plan_vpc(config, resource_prefix)
+        path = self.cache_dir / f"{self.key(config, resource_prefix)}.plan"
+        plan = self._read(path)
+        if plan is not None:
+            self.hits += 1
+            return plan
+        self.misses += 1
+        plan = planner.plan_vpc(config, resource_prefix)
+        self._write(path, plan)
+        return plan
+
+    def _read(self, path: Path) -> Plan | None:
+        try:
+            plan = loads_plan(path.read_bytes())
+            self._touch(path)
+        except OSError:
+            return None
+        except (ValueError, EOFError, TypeError, KeyError, IndexError, zlib.error):
+            # corrupt or truncated entry, it is replaced after planning
+            return None
+        return plan
+
+    def _write(self, path: Path, plan: Plan) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_bytes(dumps_plan(plan))
+            tmp_file.replace(path)
+            self._touch(path)
+            self._evict()
+        except OSError:
+            # caching is best effort, a read-only location just means no cache
+            pass
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        # the modification time orders entries for eviction; set it explicitly
+        # since file system timestamps can be coarser than a few milliseconds
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".plan"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            Path(entry_path).unlink(missing_ok=True)
+            total -= size
+
+
+plan_cache = PlanCache.from_env()
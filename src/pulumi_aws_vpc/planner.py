@@ -0,0 +1,792 @@
+"""Pure-Python planning stage of the VPC component.
+
+`plan_vpc` turns a validated `VPCConfig` into a `Plan`: every resource the
+component creates, with its inputs and options, in creation order. Planning
+needs no Pulumi engine and no AWS credentials. Values that are only known
+during a deployment are kept as markers that `VPC` resolves when it emits the
+resources:
+
+- `Ref` - an output of another planned resource, e.g. a subnet ID
+- `Lookup` - a value that needs an invoke, e.g. AZ IDs or the region
+- `SubnetCidr` - a subnet CIDR allocated from a VPC CIDR that is only known
+  after apply (IPAM or Amazon provided)
+"""
+
+import hashlib
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from ipaddress import IPv4Network, IPv6Network, ip_network
+from typing import Any, Literal, cast
+
+from pulumi_aws_vpc import backends, config
+from pulumi_aws_vpc.config import VPCConfig
+from pulumi_aws_vpc.utils import (
+    divide_supernet_into_subnets,
+    group_routes_into_prefix_lists,
+    summarize_routes,
+)
+
+TagType = Literal["dict", "aws"]
+PHASES = (
+    "vpc",
+    "secondary_ipv4_cidrs",
+    "ipv6_cidrs",
+    "subnets",
+    "gateways",
+    "route_tables",
+    "endpoints",
+    "route_table_associations",
+)
+# Route properties the EC2 API can't change on an existing route
+ROUTE_REPLACE_ON_CHANGES = (
+    "routeTableId",
+    "destinationCidrBlock",
+    "destinationIpv6CidrBlock",
+    "destinationPrefixListId",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Ref:
+    """Output `attr` of the planned resource `key`."""
+
+    key: str
+    attr: str = "id"
+
+    def __str__(self) -> str:
+        return f"${{{self.key}.{self.attr}}}"
+
+
+@dataclass(frozen=True, slots=True)
+class Lookup:
+    """Value resolved with an invoke: `az_id`, `region`, `service_name` or
+    `vpc_peering_connection_id`, or a `provider_setting` of the default provider."""
+
+    kind: str
+    key: str = ""
+
+    def __str__(self) -> str:
+        return (
+            f"${{lookup.{self.kind}:{self.key}}}"
+            if self.key
+            else f"${{lookup.{self.kind}}}"
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SubnetCidr:
+    """Subnet `index` of `prefix_lengths` allocated from the CIDR in `source`."""
+
+    source: Ref
+    prefix_lengths: tuple[int, ...]
+    index: int
+
+    def __str__(self) -> str:
+        return f"${{{self.source.key}.{self.source.attr}[{self.index}]}}/{self.prefix_lengths[self.index]}"
+
+
+@dataclass(slots=True)
+class PlannedResource:
+    key: str
+    type: str
+    name: str
+    phase: str
+    inputs: dict[str, Any]
+    parent: str | None = None
+    depends_on: tuple[str, ...] = ()
+    delete_before_replace: bool = False
+    replace_on_changes: tuple[str, ...] = ()
+    # keys of former parents (None for the component), so moving a resource
+    # doesn't replace it
+    alias_parents: tuple[str | None, ...] = ()
+    retain_on_delete: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "key": self.key,
+            "type": self.type,
+            "name": self.name,
+            "inputs": _describe(self.inputs),
+        }
+        if self.parent is not None:
+            result["parent"] = self.parent
+        if self.depends_on:
+            result["depends_on"] = list(self.depends_on)
+        if self.delete_before_replace:
+            result["delete_before_replace"] = True
+        if self.replace_on_changes:
+            result["replace_on_changes"] = list(self.replace_on_changes)
+        if self.alias_parents:
+            result["alias_parents"] = list(self.alias_parents)
+        if self.retain_on_delete:
+            result["retain_on_delete"] = True
+        return result
+
+
+@dataclass(slots=True)
+class Plan:
+    resources: dict[str, PlannedResource] = field(default_factory=dict)
+
+    def add(self, resource: PlannedResource) -> Ref:
+        if resource.key in self.resources:
+            raise ValueError(f"Resource {resource.key!r} is planned more than once")
+        self.resources[resource.key] = resource
+        return Ref(resource.key)
+
+    def by_phase(self, phase: str) -> list[PlannedResource]:
+        return [r for r in self.resources.values() if r.phase == phase]
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable plan, markers are rendered as `${...}` strings."""
+        return {"resources": [r.to_dict() for r in self.resources.values()]}
+
+
+def _describe(value: Any) -> Any:
+    if isinstance(value, (Ref, Lookup, SubnetCidr)):
+        return str(value)
+    if isinstance(value, dict):
+        return {k: _describe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_describe(v) for v in value]
+    return value
+
+
+def iter_refs(value: Any) -> Iterator[Ref]:
+    """`Ref` markers in `value`, including the sources of `SubnetCidr`s."""
+    if isinstance(value, Ref):
+        yield value
+    elif isinstance(value, SubnetCidr):
+        yield value.source
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from iter_refs(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from iter_refs(v)
+
+
+def build_tags(
+    common_tags: dict[str, str],
+    tags: dict[str, str],
+    format: TagType = "aws",
+    **kwargs: str,
+) -> dict[str, str] | list[dict[str, str]]:
+    tags = {**common_tags, **kwargs, **tags}
+    if format == "aws":
+        return [{"key": k, "value": v} for k, v in tags.items()]
+    elif format == "dict":
+        return tags
+    else:
+        raise ValueError(f"Invalid format: {format}")
+
+
+class Planner:
+    """Builds the `Plan` of one VPC, in the order `VPC` creates resources.
+
+    `region` and `az_ids` are optional facts; when they are given, lookups of
+    the region, AZ IDs and endpoint service names are resolved while planning.
+    """
+
+    def __init__(
+        self,
+        config: VPCConfig,
+        resource_prefix: str | None = None,
+        region: str | None = None,
+        az_ids: list[str] | None = None,
+    ) -> None:
+        self.config = config
+        self.resource_prefix = resource_prefix
+        self.region = region
+        self.az_ids = az_ids
+        self.plan = Plan()
+
+    def build(self) -> Plan:
+        self._plan_vpc()
+        self._plan_secondary_ipv4_cidrs()
+        self._plan_ipv6_cidrs()
+        self._plan_subnets()
+        self._plan_internet_gateway()
+        self._plan_virtual_private_gateway()
+        self._plan_egress_only_igw()
+        self._plan_route_tables()
+        self._plan_endpoints()
+        self._plan_route_table_associations()
+        return self.plan
+
+    def _name(self, name: str) -> str:
+        if self.resource_prefix is None:
+            return name
+        return f"{self.resource_prefix}-{name}"
+
+    def _tags(self, tags: dict[str, str], **kwargs: str) -> Any:
+        return build_tags(self.config.common_tags, tags, format="aws", **kwargs)
+
+    def _add(
+        self,
+        key: str,
+        type_: str,
+        name: str,
+        phase: str,
+        inputs: dict[str, Any],
+        depends_on: tuple[str, ...] = (),
+        **opts: Any,
+    ) -> Ref:
+        # explicit dependencies the engine already gets from inputs or the
+        # parent only add edges to the graph
+        implied: set[str | None] = {ref.key for ref in iter_refs(inputs)}
+        implied.add(opts.get("parent"))
+        depends_on = tuple(key for key in depends_on if key not in implied)
+        resource_type = cast(config.ResourceType, type_.rsplit(":", 1)[-1])
+        if (
+            type_.startswith("aws-native:")
+            and self.config.deployment.backend_for(resource_type) == "ec2"
+        ):
+            type_, inputs = backends.to_ec2(type_, inputs)
+        return self.plan.add(
+            PlannedResource(
+                key,
+                type_,
+                self._name(name),
+                phase,
+                inputs,
+                depends_on=depends_on,
+                **opts,
+            )
+        )
+
+    def _detachable_parent(self) -> dict[str, Any]:
+        """Parent of resources that don't need the VPC to exist to be created.
+
+        The other parent is always an alias, so turning `detach_gateways` on or
+        off moves the resources instead of replacing them.
+        """
+        if not self.config.deployment.detach_gateways:
+            return {"parent": "vpc", "alias_parents": (None,)}
+        return {"parent": None, "alias_parents": ("vpc",)}
+
+    def _route_set_credentials(self) -> dict[str, str | Lookup | None]:
+        """Profile and role of RouteSets, by default those of the default provider."""
+        deployment = self.config.deployment
+        if deployment.route_set_profile or deployment.route_set_role_arn:
+            return {
+                "profile": deployment.route_set_profile,
+                "role_arn": deployment.route_set_role_arn,
+            }
+        return {
+            "profile": Lookup("provider_setting", "profile"),
+            "role_arn": Lookup("provider_setting", "role_arn"),
+        }
+
+    @property
+    def _region(self) -> str | Lookup:
+        return self.region if self.region is not None else Lookup("region")
+
+    def _az_id(self, az_id: int | str) -> str | Lookup:
+        if isinstance(az_id, str):
+            return az_id
+        if self.az_ids is None:
+            return Lookup("az_id", str(az_id))
+        # euc1-az1 -> euc1-az
+        return f"{self.az_ids[0][:-1]}{az_id}"
+
+    def _plan_vpc(self) -> None:
+        vpc_config = self.config
+        primary = vpc_config.primary_cidr
+        inputs: dict[str, Any] = {
+            "cidr_block": str(primary.cidr) if primary.cidr else None,
+            "tags": self._tags(vpc_config.tags, Name=vpc_config.name),
+            "instance_tenancy": "default",
+            "enable_dns_hostnames": True,
+            "enable_dns_support": True,
+        }
+        if primary.ipam_pool_id is not None:
+            # with a literal CIDR, IPAM allocates exactly that block from the pool
+            inputs["ipv4_ipam_pool_id"] = primary.ipam_pool_id
+            if primary.cidr is None:
+                inputs["ipv4_netmask_length"] = primary.size
+        inputs.update(vpc_config.extra_args)
+        self._add("vpc", "aws-native:ec2:Vpc", "vpc", "vpc", inputs)
+
+    def _plan_secondary_ipv4_cidrs(self) -> None:
+        for i, cidr_obj in enumerate(self.config.secondary_ipv4_cidrs):
+            id_ = cidr_obj.cidr or f"/{cidr_obj.size}"
+            self._add(
+                f"ipv4_cidr:{i + 1}",
+                "aws-native:ec2:VpcCidrBlock",
+                f"ipv4|{i + 1}|{id_}",
+                "secondary_ipv4_cidrs",
+                {
+                    "vpc_id": Ref("vpc"),
+                    "cidr_block": str(cidr_obj.cidr) if cidr_obj.cidr else None,
+                    "ipv4_ipam_pool_id": cidr_obj.ipam_pool_id,
+                    "ipv4_netmask_length": cidr_obj.size if not cidr_obj.cidr else None,
+                },
+                parent="vpc",
+            )
+
+    def _plan_ipv6_cidrs(self) -> None:
+        for i, cidr_obj in enumerate(self.config.cidrs.ipv6):
+            id_ = cidr_obj.cidr or f"/{cidr_obj.size}"
+            amazon_provided = cidr_obj.ipam_pool_id is None and cidr_obj.cidr is None
+            self._add(
+                f"ipv6_cidr:{i}",
+                "aws-native:ec2:VpcCidrBlock",
+                f"ipv6|{i}|{id_}",
+                "ipv6_cidrs",
+                {
+                    "vpc_id": Ref("vpc"),
+                    "ipv6_cidr_block": str(cidr_obj.cidr) if cidr_obj.cidr else None,
+                    "ipv6_ipam_pool_id": cidr_obj.ipam_pool_id,
+                    "ipv6_netmask_length": (
+                        cidr_obj.size
+                        if cidr_obj.ipam_pool_id is not None and not cidr_obj.cidr
+                        else None
+                    ),
+                    "amazon_provided_ipv6_cidr_block": amazon_provided,
+                    "ipv6_cidr_block_network_border_group": (
+                        self._region if amazon_provided else None
+                    ),
+                },
+                parent="vpc",
+            )
+
+    def _vpc_cidr_ref(self, ip_version: str, cidr_num: int) -> Ref:
+        if ip_version == "ipv4":
+            if cidr_num == 1:
+                return Ref("vpc", "cidr_block")
+            return Ref(f"ipv4_cidr:{cidr_num - 1}", "cidr_block")
+        return Ref(f"ipv6_cidr:{cidr_num - 1}", "ipv6_cidr_block")
+
+    def _allocate_subnet_cidrs(self) -> dict[tuple[str, str], str | SubnetCidr]:
+        """Allocate CIDRs for subnets that only define a size.
+
+        Literal VPC CIDRs and blocks an allocator simulated for a preview (see
+        `ipam`) are divided right away, so previews show real values. Other IPAM
+        CIDRs and Amazon provided CIDRs are only known after apply.
+        """
+        vpc_config = self.config
+        # group subnets by cidr num preserving order
+        grouped: dict[str, defaultdict[int, list[config.Subnet]]] = {
+            "ipv4": defaultdict(list),
+            "ipv6": defaultdict(list),
+        }
+        for subnet_cfg in vpc_config.subnets:
+            if subnet_cfg.ipv4:
+                grouped["ipv4"][subnet_cfg.ipv4.cidr_num].append(subnet_cfg)
+            if subnet_cfg.ipv6:
+                grouped["ipv6"][subnet_cfg.ipv6.cidr_num].append(subnet_cfg)
+        literal_vpc_cidrs: dict[str, list[IPv4Network | IPv6Network | None]] = {
+            "ipv4": [
+                cidr_obj.cidr or cidr_obj.allocated_cidr
+                for cidr_obj in vpc_config.cidrs.ipv4
+            ],
+            "ipv6": [
+                cidr_obj.cidr or cidr_obj.allocated_cidr
+                for cidr_obj in vpc_config.cidrs.ipv6
+            ],
+        }
+
+        allocated: dict[tuple[str, str], str | SubnetCidr] = {}
+        for ip_version, groups in grouped.items():
+            for cidr_num, subnets in groups.items():
+                subnets_auto_allocate = [
+                    (subnet.name, getattr(subnet, ip_version).size)
+                    for subnet in subnets
+                    if not getattr(subnet, ip_version).cidr
+                ]
+                if not subnets_auto_allocate:
+                    continue
+                prefix_lengths = tuple(size for _, size in subnets_auto_allocate)
+                vpc_cidr = literal_vpc_cidrs[ip_version][cidr_num - 1]
+                if vpc_cidr is not None:
+                    cidrs: list[str | SubnetCidr] = list(
+                        divide_supernet_into_subnets(
+                            str(vpc_cidr), list(prefix_lengths)
+                        )
+                    )
+                else:
+                    source = self._vpc_cidr_ref(ip_version, cidr_num)
+                    cidrs = [
+                        SubnetCidr(source, prefix_lengths, i)
+                        for i in range(len(prefix_lengths))
+                    ]
+                for (subnet_name, _), cidr in zip(subnets_auto_allocate, cidrs):
+                    allocated[subnet_name, ip_version] = cidr
+        return allocated
+
+    def _plan_subnets(self) -> None:
+        vpc_config = self.config
+        allocated = self._allocate_subnet_cidrs()
+        for subnet_cfg in vpc_config.subnets:
+            dependencies = []
+            subnet_cidrs: dict[str, str | SubnetCidr | None] = {
+                "ipv4": None,
+                "ipv6": None,
+            }
+            for ip_version in ("ipv4", "ipv6"):
+                cidr_cfg = getattr(subnet_cfg, ip_version)
+                if cidr_cfg:
+                    dependencies.append(
+                        self._vpc_cidr_ref(ip_version, cidr_cfg.cidr_num).key
+                    )
+                    subnet_cidrs[ip_version] = (
+                        cidr_cfg.cidr or allocated[subnet_cfg.name, ip_version]
+                    )
+            self._add(
+                f"subnet:{subnet_cfg.name}",
+                "aws-native:ec2:Subnet",
+                subnet_cfg.name,
+                "subnets",
+                {
+                    "vpc_id": Ref("vpc"),
+                    "availability_zone_id": self._az_id(subnet_cfg.az_id),
+                    "cidr_block": subnet_cidrs["ipv4"],
+                    "ipv6_cidr_block": subnet_cidrs["ipv6"],
+                    "ipv6_native": bool(
+                        subnet_cidrs["ipv6"] and not subnet_cidrs["ipv4"]
+                    ),
+                    "assign_ipv6_address_on_creation": bool(subnet_cidrs["ipv6"]),
+                    "enable_dns64": bool(subnet_cidrs["ipv6"]),
+                    "tags": self._tags(
+                        subnet_cfg.tags, Name=f"{vpc_config.name}-{subnet_cfg.name}"
+                    ),
+                },
+                parent="vpc",
+                depends_on=tuple(dependencies),
+                delete_before_replace=True,
+            )
+
+    def _plan_internet_gateway(self) -> None:
+        igw_config = self.config.internet_gateway
+        if igw_config is None:
+            return
+        self._add(
+            "igw",
+            "aws-native:ec2:InternetGateway",
+            "igw",
+            "gateways",
+            {
+                "tags": self._tags(igw_config.tags, Name=f"{self.config.name}-igw"),
+                **igw_config.extra_args,
+            },
+            **self._detachable_parent(),
+        )
+        self._add(
+            "igw_attachment",
+            "aws-native:ec2:VpcGatewayAttachment",
+            "igw",
+            "gateways",
+            {"vpc_id": Ref("vpc"), "internet_gateway_id": Ref("igw")},
+            parent="igw",
+        )
+
+    def _plan_virtual_private_gateway(self) -> None:
+        vgw_config = self.config.virtual_private_gateway
+        if vgw_config is None:
+            return
+        self._add(
+            "vgw",
+            "aws-native:ec2:VpnGateway",
+            "vgw",
+            "gateways",
+            {
+                "tags": self._tags(vgw_config.tags, Name=f"{self.config.name}-vgw"),
+                "amazon_side_asn": vgw_config.asn,
+                "type": "ipsec.1",
+                **vgw_config.extra_args,
+            },
+            **self._detachable_parent(),
+            delete_before_replace=True,
+        )
+        self._add(
+            "vgw_attachment",
+            "aws-native:ec2:VpcGatewayAttachment",
+            "vgw",
+            "gateways",
+            {"vpc_id": Ref("vpc"), "vpn_gateway_id": Ref("vgw")},
+            parent="vgw",
+            depends_on=("vgw",),
+            delete_before_replace=True,
+        )
+
+    def _plan_egress_only_igw(self) -> None:
+        eigw_config = self.config.egress_only_internet_gateway
+        if eigw_config is None:
+            return
+        self._add(
+            "eigw",
+            "aws-native:ec2:EgressOnlyInternetGateway",
+            "eigw",
+            "gateways",
+            {"vpc_id": Ref("vpc"), **eigw_config.extra_args},
+            parent="vpc",
+        )
+
+    def _plan_route_tables(self) -> None:
+        vpc_config = self.config
+        for rt_config in vpc_config.route_tables:
+            rt_key = f"route_table:{rt_config.name}"
+            self._add(
+                rt_key,
+                "aws-native:ec2:RouteTable",
+                rt_config.name,
+                "route_tables",
+                {
+                    "vpc_id": Ref("vpc"),
+                    "tags": self._tags(
+                        rt_config.tags, Name=f"{vpc_config.name}-{rt_config.name}"
+                    ),
+                    **rt_config.extra_options,
+                },
+                parent="vpc",
+            )
+
+            route_entries = [
+                (route_cfg.destination, route_cfg.next_hop)
+                for route_cfg in rt_config.routes
+            ]
+            if rt_config.summarize:
+                route_entries = summarize_routes(route_entries)
+            prefix_list_groups: dict[tuple[str, int], list[list[str]]] = {}
+            if rt_config.prefix_list_threshold:
+                route_entries, prefix_list_groups = group_routes_into_prefix_lists(
+                    route_entries, rt_config.prefix_list_threshold
+                )
+
+            if vpc_config.deployment.route_updates == "in_place":
+                replace_on_changes = ROUTE_REPLACE_ON_CHANGES
+            else:
+                replace_on_changes = ("*",)
+            routes_to_create = []
+            for destination, next_hop_ref in route_entries:
+                dest_input, dest_id = self.parse_route_table_destination(destination)
+                routes_to_create.append(
+                    (destination, dest_input, dest_id, next_hop_ref)
+                )
+            for (next_hop_ref, ip_version), chunks in prefix_list_groups.items():
+                for i, cidrs in enumerate(chunks):
+                    # routes to lists past the first one of a group get a number
+                    suffix = f"_{i}" if i else ""
+                    prefix_list = self._get_or_create_prefix_list(cidrs)
+                    dest_id = f"{next_hop_ref}_ipv{ip_version}_pl{suffix}"
+                    routes_to_create.append(
+                        (
+                            dest_id,
+                            {"destination_prefix_list_id": prefix_list},
+                            dest_id,
+                            next_hop_ref,
+                        )
+                    )
+
+            if rt_config.bulk_routes:
+                self._add(
+                    f"route_set:{rt_config.name}",
+                    "aws-networking:bulk_routes:RouteSet",
+                    f"{rt_config.name}_routes",
+                    "route_tables",
+                    {
+                        "route_table_id": Ref(rt_key),
+                        "routes": [
+                            {**dest_input, **self.parse_route_table_next_hop(next_hop)}
+                            for _, dest_input, _, next_hop in routes_to_create
+                        ],
+                        "region": self._region,
+                        **self._route_set_credentials(),
+                        "retain_routes": rt_config.retain_routes,
+                    },
+                    parent=rt_key,
+                )
+                continue
+            for destination, dest_input, dest_id, next_hop_ref in routes_to_create:
+                self._add(
+                    f"route:{rt_config.name}:{destination}",
+                    "aws-native:ec2:Route",
+                    f"{rt_config.name}_{dest_id}",
+                    "route_tables",
+                    {
+                        "route_table_id": Ref(rt_key),
+                        **dest_input,
+                        **self.parse_route_table_next_hop(next_hop_ref),
+                    },
+                    parent=rt_key,
+                    delete_before_replace=True,
+                    replace_on_changes=replace_on_changes,
+                    retain_on_delete=rt_config.retain_routes,
+                )
+
+    def _get_or_create_prefix_list(self, cidrs: list[str]) -> Ref:
+        """Managed prefix list with the given CIDRs, created once per component.
+
+        The list is named after a hash of its sorted CIDRs rather than the route
+        table that needs it first, so adding, removing or reordering route
+        tables doesn't rename (and replace) it.
+        """
+        cidrs = sorted(cidrs, key=ip_network)
+        ip_version = ip_network(cidrs[0]).version
+        digest = hashlib.sha256(",".join(cidrs).encode()).hexdigest()[:12]
+        name = f"pl_ipv{ip_version}_{digest}"
+        key = f"prefix_list:ipv{ip_version}:{digest}"
+        if key not in self.plan.resources:
+            self._add(
+                key,
+                "aws-native:ec2:PrefixList",
+                name,
+                "route_tables",
+                {
+                    "address_family": f"IPv{ip_version}",
+                    "max_entries": len(cidrs),
+                    "prefix_list_name": f"{self.config.name}-{name}",
+                    "entries": [{"cidr": cidr} for cidr in cidrs],
+                    "tags": self._tags({}, Name=f"{self.config.name}-{name}"),
+                },
+                **self._detachable_parent(),
+            )
+        return Ref(key)
+
+    def parse_route_table_destination(
+        self, destination: str
+    ) -> tuple[dict[str, str | Ref], str]:
+        dest_id = destination
+        dest_input: dict[str, str | Ref]
+        if destination.startswith("pl-"):
+            dest_input = {"destination_prefix_list_id": destination}
+        elif destination.startswith("subnet@"):
+            match = config.SUBNET_REFERENCE_RE.match(destination)
+            if not match:
+                raise ValueError(f"Can't parse destination: {destination}")
+            subnet_name = match.group("subnet")
+            ip_version = match.group("attr")
+            dest_id = f"{subnet_name}.{ip_version}"
+            subnet_key = f"subnet:{subnet_name}"
+            if subnet_key not in self.plan.resources:
+                raise ValueError(f"Unknown subnet: {subnet_name}")
+            if ip_version == "ipv4":
+                dest_input = {"destination_cidr_block": Ref(subnet_key, "cidr_block")}
+            elif ip_version == "ipv6":
+                dest_input = {
+                    "destination_ipv6_cidr_block": Ref(subnet_key, "ipv6_cidr_block")
+                }
+            else:
+                raise ValueError(f"Unknown IP version: {ip_version}")
+        elif isinstance(ip_network(destination), IPv4Network):
+            dest_input = {"destination_cidr_block": destination}
+        elif isinstance(ip_network(destination), IPv6Network):
+            dest_input = {"destination_ipv6_cidr_block": destination}
+        else:
+            raise ValueError(f"Unknown destination: {destination}")
+        return dest_input, dest_id
+
+    def parse_route_table_next_hop(
+        self, next_hop: str
+    ) -> dict[str, str | Ref | Lookup]:
+        resources = self.plan.resources
+        if next_hop == "vgw":
+            if "vgw" not in resources:
+                raise ValueError("No Virtual Gateway has been created")
+            return {"gateway_id": Ref("vgw")}
+        elif next_hop.startswith("vgw-"):
+            return {"gateway_id": next_hop}
+        elif next_hop == "igw":
+            if "igw" not in resources:
+                raise ValueError("No Internet Gateway has been created")
+            return {"gateway_id": Ref("igw")}
+        elif next_hop.startswith("igw-"):
+            return {"gateway_id": next_hop}
+        elif next_hop == "eigw":
+            if "eigw" not in resources:
+                raise ValueError("No Egress-Only Internet Gateway has been created")
+            return {"egress_only_internet_gateway_id": Ref("eigw")}
+        elif next_hop.startswith("eigw-"):
+            return {"egress_only_internet_gateway_id": next_hop}
+        elif next_hop.startswith("eni-"):
+            return {"network_interface_id": next_hop}
+        elif next_hop.startswith("tgw-"):
+            return {"transit_gateway_id": next_hop}
+        elif next_hop.startswith("pcx-"):
+            return {"vpc_peering_connection_id": next_hop}
+        elif next_hop.startswith("pcx@"):
+            return {
+                "vpc_peering_connection_id": Lookup(
+                    "vpc_peering_connection_id", next_hop.removeprefix("pcx@")
+                )
+            }
+        elif "core-network" in next_hop:
+            return {"core_network_arn": next_hop}
+        raise ValueError(f"Unknown next hop: {next_hop}")
+
+    def _plan_endpoints(self) -> None:
+        vpc_config = self.config
+        for vpce in vpc_config.endpoints:
+            service: str | Lookup = vpce.service
+            if "." not in vpce.service:
+                service = (
+                    f"com.amazonaws.{self.region}.{vpce.service}"
+                    if self.region is not None
+                    else Lookup("service_name", vpce.service)
+                )
+            self._add(
+                f"endpoint:{vpce.name}",
+                "aws-native:ec2:VpcEndpoint",
+                vpce.name,
+                "endpoints",
+                {
+                    "vpc_id": Ref("vpc"),
+                    "service_name": service,
+                    "route_table_ids": [
+                        Ref(f"route_table:{rt}") for rt in vpce.route_tables
+                    ],
+                    "private_dns_enabled": vpce.private_dns,
+                    "tags": self._tags(
+                        vpce.tags, Name=f"{vpc_config.name}_{vpce.name}"
+                    ),
+                    **vpce.extra_args,
+                },
+                parent="vpc",
+            )
+
+    def _plan_route_table_associations(self) -> None:
+        vpc_config = self.config
+        for subnet_cfg in vpc_config.subnets:
+            rt_name = subnet_cfg.route_table
+            if rt_name is None:
+                continue
+            subnet_key = f"subnet:{subnet_cfg.name}"
+            self._add(
+                f"subnet_association:{subnet_cfg.name}",
+                "aws-native:ec2:SubnetRouteTableAssociation",
+                f"{subnet_cfg.name}_{rt_name}",
+                "route_table_associations",
+                {
+                    "route_table_id": Ref(f"route_table:{rt_name}"),
+                    "subnet_id": Ref(subnet_key),
+                },
+                parent=subnet_key,
+            )
+        gateways = {
+            "igw": vpc_config.internet_gateway,
+            "vgw": vpc_config.virtual_private_gateway,
+        }
+        for gateway_key, gateway_config in gateways.items():
+            if gateway_config is None or gateway_config.route_table is None:
+                continue
+            self._add(
+                f"{gateway_key}_association",
+                "aws-native:ec2:GatewayRouteTableAssociation",
+                f"{gateway_key}_{gateway_config.route_table}",
+                "route_table_associations",
+                {
+                    "route_table_id": Ref(f"route_table:{gateway_config.route_table}"),
+                    "gateway_id": Ref(gateway_key),
+                },
+                parent=gateway_key,
+            )
+
+
+def plan_vpc(
+    config: VPCConfig,
+    resource_prefix: str | None = None,
+    region: str | None = None,
+    az_ids: list[str] | None = None,
+) -> Plan:
+    return Planner(config, resource_prefix, region, az_ids).build()
@@ -0,0 +1,147 @@
+import hashlib
+import importlib.metadata
+import json
+import os
+import sys
+import typing
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from pulumi import ComponentResource, Inputs, ResourceOptions
+from pulumi.provider import ConstructResult, Provider, main
+from pulumi.provider.experimental.component import ComponentProvider
+
+SCHEMA_CACHE_DIR_ENV_VAR = "PULUMI_AWS_VPC_SCHEMA_CACHE_DIR"
+DEFAULT_SCHEMA_CACHE_DIR = Path(__file__).parent / "__pycache__"
+
+
+def _referenced_types(annotation: Any, seen: set[type]) -> None:
+    """Collect the TypedDicts and enums an annotation refers to, recursively."""
+    for arg in typing.get_args(annotation):
+        _referenced_types(arg, seen)
+    if not isinstance(annotation, type) or annotation in seen:
+        return
+    if typing.is_typeddict(annotation) or issubclass(annotation, ComponentResource):
+        seen.add(annotation)
+        # only the class's own annotations: the component outputs or TypedDict keys
+        for hint in vars(annotation).get("__annotations__", {}).values():
+            _referenced_types(hint, seen)
+    elif issubclass(annotation, Enum):
+        seen.add(annotation)
+
+
+def schema_sources(components: list[type[ComponentResource]]) -> list[Path]:
+    """Source files the inferred schema depends on.
+
+    Outputs are annotated on the component class itself, inputs on the args
+    TypedDicts, which may in turn be spread over several modules.
+    """
+    types: set[type] = set()
+    for component in components:
+        _referenced_types(component, types)
+        args_type = component.__init__.__annotations__.get("args")
+        _referenced_types(args_type, types)
+    modules = {t.__module__ for t in types}
+    return sorted(Path(sys.modules[module].__file__ or "") for module in modules)
+
+
+def schema_cache_key(
+    components: list[type[ComponentResource]],
+    name: str,
+    namespace: str | None,
+    version: str,
+) -> str:
+    """Hash of everything that goes into the schema: sources, SDK and metadata."""
+    digest = hashlib.sha256()
+    for part in (importlib.metadata.version("pulumi"), name, namespace or "", version):
+        digest.update(part.encode() + b"\0")
+    for path in schema_sources(components):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class CachedComponentProvider(ComponentProvider):
+    """`ComponentProvider` that reuses the schema inferred by a previous start.
+
+    Inferring the schema means walking `VPCArgs` and every nested TypedDict on
+    each provider host start. The generated schema is kept as JSON under a key
+    derived from the sources it was inferred from, so the cache is only rebuilt
+    after those sources, the Pulumi SDK or the provider metadata change. With a
+    cached schema the components are only analyzed on the first `construct`,
+    so schema requests skip the analysis. If the cache directory isn't writable
+    the provider works uncached.
+    """
+
+    def __init__(
+        self,
+        components: list[type[ComponentResource]],
+        name: str,
+        namespace: str | None = None,
+        version: str = "0.0.0",
+        cache_dir: str | Path | None = None,
+    ) -> None:
+        self._init_args = (components, name, namespace, version)
+        if cache_dir is None:
+            cache_dir = os.environ.get(
+                SCHEMA_CACHE_DIR_ENV_VAR, DEFAULT_SCHEMA_CACHE_DIR
+            )
+        key = schema_cache_key(components, name, namespace, version)
+        self.cache_file = Path(cache_dir) / f"schema-{key}.json"
+        schema = self._read_cache()
+        self.cache_hit = schema is not None
+        self.analyzed = False
+        if schema is None:
+            self.analyze()
+            self._write_cache()
+        else:
+            Provider.__init__(self, version, schema)
+
+    def analyze(self) -> None:
+        """Analyze the components, as `ComponentProvider` does on every start."""
+        if not self.analyzed:
+            super().__init__(*self._init_args)
+            self.analyzed = True
+
+    def construct(
+        self,
+        name: str,
+        resource_type: str,
+        inputs: Inputs,
+        options: ResourceOptions | None = None,
+    ) -> ConstructResult:
+        self.analyze()
+        return super().construct(name, resource_type, inputs, options)
+
+    def _read_cache(self) -> str | None:
+        try:
+            schema = self.cache_file.read_text()
+            json.loads(schema)
+        except (OSError, ValueError):
+            return None
+        return schema
+
+    def _write_cache(self) -> None:
+        if self.schema is None:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            for stale in self.cache_file.parent.glob("schema-*.json"):
+                stale.unlink(missing_ok=True)
+            tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_text(self.schema)
+            tmp_file.replace(self.cache_file)
+        except OSError:
+            pass
+
+
+def component_provider_host(
+    components: list[type[ComponentResource]],
+    name: str,
+    namespace: str | None = None,
+    version: str | None = None,
+) -> None:
+    """Drop-in for `pulumi.provider.experimental.component_provider_host`
+    serving the cached schema."""
+    provider = CachedComponentProvider(components, name, namespace, version or "0.0.0")
+    main(provider, sys.argv[1:])
@@ -1,11 +1,48 @@
-import netaddr
-import ipaddress
+import asyncio
+import importlib.util
+import itertools
+import sys
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+from ipaddress import IPv4Network, IPv6Network, ip_network
+from types import ModuleType
+from typing import Any, TypeVar
+
+from pulumi import Output
+
+from pulumi_aws_vpc.allocator import SubnetAllocator, iter_ipv6_subnets
+
+T = TypeVar("T")
+
+# quota of entries per managed prefix list
+MAX_PREFIX_LIST_ENTRIES = 1000
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import a module on first attribute access instead of right away.
+
+    Provider SDKs take hundreds of milliseconds to import, which every provider
+    host start pays even if a stack never constructs a component. Submodules
+    such as `pulumi_aws_native.ec2` are already lazy in the SDKs themselves.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
 
 
 def divide_supernet_into_subnets(supernet: str, prefix_lengths: list[int]) -> list[str]:
     """Divide a supernet into subnets of arbitrary prefix lengths.
 
-    Uses smart allocation of subnets using gaps between allocated blocks.
+    Uses smart allocation of subnets using gaps between allocated blocks: every
+    subnet is placed at the lowest free address aligned to its size.
 
     Args:
         supernet: The supernet to divide.
@@ -14,6 +51,9 @@ def divide_supernet_into_subnets(supernet: str, prefix_lengths: list[int]) -> li
     Returns:
         A list of subnets.
 
+    Raises:
+        ValueError: If a subnet does not fit into the remaining free space.
+
     Examples:
     >>> divide_supernet_into_subnets("10.10.10.0/24", [26, 25, 26])
     ['10.10.10.0/26', '10.10.10.128/25', '10.10.10.64/26']
@@ -26,28 +66,230 @@ def divide_supernet_into_subnets(supernet: str, prefix_lengths: list[int]) -> li
     > cidrsubnets("10.10.10.0/24", [2, 1, 2])
     Error: Invalid function argument
     """
-    subnets = []
     if not prefix_lengths:
-        return subnets
-
-    free_blocks = [netaddr.IPNetwork(supernet)]
-    for prefix in prefix_lengths:
-        if not free_blocks:
-            raise ValueError("No free blocks left to allocate")
-
-        for i, current_block in enumerate(free_blocks):
-            if prefix < current_block.prefixlen:
-                # Can't create subnet larger than parent
-                continue
-
-            subnet = next(current_block.subnet(prefix))
-            subnets.append(str(subnet))
-            free_blocks = (
-                free_blocks[:i]
-                + netaddr.cidr_exclude(current_block, subnet)
-                + free_blocks[i + 1 :]
-            )
-            free_blocks = netaddr.cidr_merge(free_blocks)
-            break
+        return []
+    if ":" in supernet and all(a <= b for a, b in itertools.pairwise(prefix_lengths)):
+        # without gaps to fill, bump allocation places subnets the same way
+        return list(iter_ipv6_subnets(supernet, prefix_lengths))
 
+    allocator = SubnetAllocator(supernet)
+    subnets: list[str] = []
+    # runs of equal prefix lengths (subnet tiers) are allocated in one call
+    for prefix, run in itertools.groupby(prefix_lengths):
+        count = len(list(run))
+        if count == 1:
+            subnets.append(allocator.allocate(prefix))
+        else:
+            subnets += allocator.allocate_many(prefix, count)
     return subnets
+
+
+def fan_out(output: Output[Sequence[T]], count: int) -> list[Output[T]]:
+    """Split an Output of a sequence into one Output per item.
+
+    The source Output is resolved once and a single done-callback fills the
+    futures of all items, instead of running a separate apply per item.
+    Unknown and secret flags and resource dependencies are carried over.
+    """
+    loop = asyncio.get_event_loop()
+    source = asyncio.ensure_future(
+        asyncio.gather(
+            output.resources(),
+            output.future(),
+            output.is_known(),
+            output.is_secret(),
+        )
+    )
+    resources, is_known, is_secret = (loop.create_future() for _ in range(3))
+    items: list[asyncio.Future[Any]] = [loop.create_future() for _ in range(count)]
+
+    def resolve(future: asyncio.Future[Any]) -> None:
+        targets = [resources, is_known, is_secret, *items]
+        if future.cancelled() or future.exception() is not None:
+            for target in targets:
+                if future.cancelled():
+                    target.cancel()
+                else:
+                    target.set_exception(future.exception())  # type: ignore[arg-type]
+            return
+        resolved_resources, values, known, secret = future.result()
+        resources.set_result(resolved_resources)
+        is_known.set_result(known)
+        is_secret.set_result(secret)
+        for i, item in enumerate(items):
+            item.set_result(values[i] if values is not None else None)
+
+    source.add_done_callback(resolve)
+    return [Output(resources, item, is_known, is_secret) for item in items]
+
+
+def resolve_nested(value: Any) -> Output[Any]:
+    """Resolve a structure of dicts and lists with Outputs in it as one Output.
+
+    All Outputs are gathered into a single `Output.all`, so the result is
+    resolved in one step rather than one apply per nested dict or list.
+    """
+    leaves: list[Output[Any]] = []
+
+    def collect(node: Any) -> Any:
+        if isinstance(node, dict):
+            return {k: collect(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [collect(v) for v in node]
+        if isinstance(node, Output):
+            leaves.append(node)
+            return Output  # placeholder for the next resolved leaf
+        return node
+
+    template = collect(value)
+
+    def rebuild(node: Any, values: Iterator[Any]) -> Any:
+        if isinstance(node, dict):
+            return {k: rebuild(v, values) for k, v in node.items()}
+        if isinstance(node, list):
+            return [rebuild(v, values) for v in node]
+        if node is Output:
+            return next(values)
+        return node
+
+    return Output.all(*leaves).apply(lambda values: rebuild(template, iter(values)))
+
+
+def summarize_routes(routes: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Collapse CIDR routes with the same next hop into the fewest CIDRs.
+
+    Sibling prefixes sharing a next hop are merged into their parent, and a
+    route is dropped when the closest less specific route already sends its
+    traffic to the same next hop. Both steps keep longest-prefix forwarding
+    unchanged for every address. Destinations that are not CIDRs (prefix
+    lists, subnet references) are returned as they are, after the CIDRs.
+
+    Args:
+        routes: (destination, next hop) pairs.
+
+    Returns:
+        Summarized (destination, next hop) pairs, CIDRs sorted by address.
+
+    Examples:
+    >>> summarize_routes([
+    ...     ("10.0.0.0/25", "vgw"), ("10.0.0.128/25", "vgw"), ("10.0.1.0/24", "tgw-1")
+    ... ])
+    [('10.0.0.0/24', 'vgw'), ('10.0.1.0/24', 'tgw-1')]
+    >>> summarize_routes([
+    ...     ("10.0.0.0/16", "vgw"), ("10.0.8.0/21", "tgw-1"), ("10.0.9.0/24", "vgw")
+    ... ])
+    [('10.0.0.0/16', 'vgw'), ('10.0.8.0/21', 'tgw-1'), ('10.0.9.0/24', 'vgw')]
+    """
+    other_routes = []
+    # (version, prefixlen, network address) -> next hop
+    table: dict[tuple[int, int, int], str] = {}
+    original_destinations: dict[tuple[int, int, int], str] = {}
+    for destination, next_hop in routes:
+        try:
+            network = ip_network(destination)
+        except ValueError:
+            other_routes.append((destination, next_hop))
+            continue
+        key = (network.version, network.prefixlen, int(network.network_address))
+        table[key] = next_hop
+        original_destinations[key] = destination
+
+    levels: defaultdict[tuple[int, int], list[int]] = defaultdict(list)
+    for version, prefixlen, address in table:
+        levels[(version, prefixlen)].append(address)
+
+    for version in (4, 6):
+        width = 32 if version == 4 else 128
+        for prefixlen in range(width, 0, -1):
+            for address in levels.pop((version, prefixlen), []):
+                key = (version, prefixlen, address)
+                if key not in table:
+                    continue
+                next_hop = table[key]
+
+                # drop the route if the closest covering route has the same next hop
+                for cover_prefixlen in range(prefixlen - 1, -1, -1):
+                    host_bits = width - cover_prefixlen
+                    cover = (
+                        version,
+                        cover_prefixlen,
+                        address >> host_bits << host_bits,
+                    )
+                    if cover in table:
+                        if table[cover] == next_hop:
+                            del table[key]
+                        break
+                if key not in table:
+                    continue
+
+                # merge with the sibling into the parent prefix
+                bit = 1 << (width - prefixlen)
+                sibling = (version, prefixlen, address ^ bit)
+                parent = (version, prefixlen - 1, address & ~bit)
+                if table.get(sibling) == next_hop and parent not in table:
+                    del table[key], table[sibling]
+                    table[parent] = next_hop
+                    levels[(version, prefixlen - 1)].append(parent[2])
+
+    summarized = []
+    for key, next_hop in sorted(
+        table.items(), key=lambda item: (item[0][0], item[0][2])
+    ):
+        version, prefixlen, address = key
+        network_class = IPv4Network if version == 4 else IPv6Network
+        destination = original_destinations.get(key) or str(
+            network_class((address, prefixlen))
+        )
+        summarized.append((destination, next_hop))
+    return summarized + other_routes
+
+
+def group_routes_into_prefix_lists(
+    routes: list[tuple[str, str]],
+    threshold: int,
+    max_entries: int = MAX_PREFIX_LIST_ENTRIES,
+) -> tuple[list[tuple[str, str]], dict[tuple[str, int], list[list[str]]]]:
+    """Pick CIDR routes that are better served by a managed prefix list.
+
+    CIDR destinations are grouped by next hop and IP version. Groups with at
+    least `threshold` destinations are split out, the rest of the routes are
+    returned as they are. Groups larger than a prefix list can hold are split
+    into several lists of at most `max_entries` CIDRs.
+
+    Args:
+        routes: (destination, next hop) pairs.
+        threshold: Minimal number of destinations sharing a next hop.
+        max_entries: Maximal number of CIDRs per prefix list.
+
+    Returns:
+        Remaining routes and {(next hop, IP version): [sorted CIDRs per list]}.
+
+    Examples:
+    >>> group_routes_into_prefix_lists(
+    ...     [("10.1.0.0/16", "vgw"), ("10.2.0.0/16", "vgw"), ("0.0.0.0/0", "igw")], 2
+    ... )
+    ([('0.0.0.0/0', 'igw')], {('vgw', 4): [['10.1.0.0/16', '10.2.0.0/16']]})
+    >>> group_routes_into_prefix_lists(
+    ...     [(f"10.{i}.0.0/16", "vgw") for i in range(3)], 2, max_entries=2
+    ... )[1]
+    {('vgw', 4): [['10.0.0.0/16', '10.1.0.0/16'], ['10.2.0.0/16']]}
+    """
+    groups: defaultdict[tuple[str, int], list[str]] = defaultdict(list)
+    for destination, next_hop in routes:
+        try:
+            version = ip_network(destination).version
+        except ValueError:
+            continue
+        groups[(next_hop, version)].append(destination)
+    groups_above_threshold: dict[tuple[str, int], list[list[str]]] = {}
+    grouped: set[tuple[str, str]] = set()
+    for (next_hop, version), cidrs in groups.items():
+        if len(cidrs) < threshold:
+            continue
+        cidrs.sort(key=ip_network)
+        groups_above_threshold[(next_hop, version)] = [
+            cidrs[i : i + max_entries] for i in range(0, len(cidrs), max_entries)
+        ]
+        grouped.update((cidr, next_hop) for cidr in cidrs)
+    remaining = [route for route in routes if route not in grouped]
+    return remaining, groups_above_threshold
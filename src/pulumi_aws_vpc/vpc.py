@@ -1,25 +1,54 @@
-import pulumi_aws as aws
-import pulumi_aws_native as awscc
+import importlib
 import pulumi
-import re
 from collections import defaultdict
 from pulumi import ResourceOptions, Output
-from typing import Any, NamedTuple, Literal, TypedDict, Protocol
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    NamedTuple,
+    Optional,
+    Protocol,
+    TypedDict,
+    cast,
+)
+from contextlib import AbstractContextManager, nullcontext
 from functools import cached_property
-from pulumi_aws_vpc import config
+from pulumi_aws_vpc import config, ipam, lookups, plan_cache, planner
 from pulumi_aws_vpc.args import VPCArgs
 from pulumi_aws_vpc.config import VPCConfig
-from pulumi_aws_vpc.utils import divide_supernet_into_subnets
-from ipaddress import ip_network, IPv4Network, IPv6Network
+from pulumi_aws_vpc.instrumentation import PhaseRecorder
+from pulumi_aws_vpc.planner import (
+    Lookup,
+    Plan,
+    PlannedResource,
+    Ref,
+    SubnetCidr,
+    TagType,
+)
+from pulumi_aws_vpc.utils import (
+    divide_supernet_into_subnets,
+    fan_out,
+    lazy_import,
+    resolve_nested,
+)
+
+if TYPE_CHECKING:
+    from pulumi_aws_vpc import bulk_routes
+    import pulumi_aws as aws
+    import pulumi_aws_native as awscc
+else:
+    # Provider SDKs are loaded on first use, so starting the provider host (and
+    # serving the schema) doesn't pay for importing them.
+    aws = lazy_import("pulumi_aws")
+    awscc = lazy_import("pulumi_aws_native")
 
 
 RESOURCE_TYPE = "aws-networking:index:VPC"
-TagType = Literal["dict", "aws"]
 
 
 class IPv4Cidr(Protocol):
     @property
-    def cidr_block(self) -> Output[str]:
+    def cidr_block(self) -> Output[str | None]:
         pass
 
 
@@ -34,31 +63,34 @@ class SubnetCidrs(TypedDict):
 
 
 class RouteTableInfo(NamedTuple):
-    rt: aws.ec2.RouteTable
-    routes: dict[str, aws.ec2.Route]
+    rt: "awscc.ec2.RouteTable"
+    routes: "dict[str, awscc.ec2.Route]"
+    # all routes of a table with bulk_routes, instead of `routes`
+    route_set: "bulk_routes.RouteSet | None" = None
 
 
 class SubnetInfo(NamedTuple):
-    subnet: aws.ec2.Subnet
-    route_table: aws.ec2.RouteTable | None = None
+    subnet: "awscc.ec2.Subnet"
+    # name of the route table in the config
+    route_table: str | None = None
 
 
 class InternetGatewayInfo(NamedTuple):
-    igw: aws.ec2.InternetGateway
+    igw: "awscc.ec2.InternetGateway | None"
     rt: str | None = None
-    attachment: str | None = None
+    attachment: Output[str] | None = None
 
 
 class VirtualPrivateGatewayInfo(NamedTuple):
-    vgw: aws.ec2.VpnGateway
+    vgw: "awscc.ec2.VpnGateway | None"
     rt: str | None = None
-    attachment: str | None = None
+    attachment: Output[str] | None = None
 
 
 class RouteTableAssociations(NamedTuple):
-    subnets: dict[str, awscc.ec2.SubnetRouteTableAssociation]
-    igw: awscc.ec2.GatewayRouteTableAssociation | None
-    vgw: awscc.ec2.GatewayRouteTableAssociation | None
+    subnets: "dict[str, awscc.ec2.SubnetRouteTableAssociation]"
+    igw: "awscc.ec2.GatewayRouteTableAssociation | None"
+    vgw: "awscc.ec2.GatewayRouteTableAssociation | None"
 
 
 # class AttachmentInfo(NamedTuple):
@@ -71,12 +103,14 @@ class RouteTableAssociations(NamedTuple):
 
 
 class VPCCidrs(TypedDict):
-    ipv4: list[Output[str]]
-    ipv6: list[Output[str]]
+    ipv4: list[Output[str | None]]
+    ipv6: list[Output[str | None]]
 
 
 class VPC(pulumi.ComponentResource):
     vpc_id: Output[str]
+    network: Output[dict[str, Any]]
+    instrumentation: Output[Optional[dict[str, Any]]]
     # cidrs: VPCCidrs
 
     def __init__(
@@ -84,233 +118,264 @@ class VPC(pulumi.ComponentResource):
         name: str,
         args: VPCArgs,
         opts: ResourceOptions | None = None,
+        *,
+        resource_prefix: str | None = None,
     ):
         self.config = VPCConfig.model_validate(args)
+        # URNs don't include the parent's name, so VPCs sharing a parent (e.g. in
+        # a fleet) need distinct child resource names
+        self.resource_prefix = resource_prefix
         super().__init__(RESOURCE_TYPE, name, None, opts)
+        self.lookups = lookups.ReferenceLookups(self)
+        self.recorder = None
+        if self.config.instrumentation is not None:
+            self.recorder = PhaseRecorder(
+                name,
+                invoke_count=lambda: lookups.facts_cache.invokes + self.lookups.misses,
+                spans_file=self.config.instrumentation.spans_file,
+            )
 
-        self.vpc = self._create_vpc(self.config)
+        with self._phase("plan"):
+            # in previews IPAM CIDRs get a simulated block, so subnets are known
+            self.config = ipam.assign_cidrs(
+                self.config, f"{pulumi.get_project()}/{pulumi.get_stack()}/{name}"
+            )
+            # Facts are looked up while emitting, when a resource needs them
+            self.resource_plan = plan_cache.plan_cache.get_or_plan(
+                self.config, resource_prefix
+            )
+        # resource classes are picked by the planned type, see _emit
+        self._resources: dict[str, pulumi.CustomResource] = {}
+        self._subnet_cidrs: dict[tuple[Ref, tuple[int, ...]], list[Output[str]]] = {}
+        phases: dict[str, list[PlannedResource]] = {
+            phase: [] for phase in planner.PHASES
+        }
+        for planned in self.resource_plan.resources.values():
+            phases[planned.phase].append(planned)
+        for phase, planned_resources in phases.items():
+            with self._phase(phase):
+                for planned in planned_resources:
+                    self._resources[planned.key] = self._emit(planned)
+            if phase == "route_tables":
+                pulumi.log.debug(
+                    f"Next hop lookups: {self.lookups.hits} hits, "
+                    f"{self.lookups.misses} misses",
+                    resource=self,
+                )
+        self._collect_resources()
+        self.network = self._network()
 
-        self.secondary_ipv4_cidr_associations = self._create_secondary_ipv4_cidrs(
-            self.config
+        if self.recorder is not None:
+            self.recorder.export(self)
+        self.instrumentation = Output.from_input(
+            self.recorder.summary() if self.recorder is not None else None
         )
-        self.ipv6_cidr_associations = self._create_ipv6_cidrs(self.config)
-        self.subnets = self._create_subnets(
-            self.config,
-        )
-
-        # self.elastic_ips = self._create_elastic_ips(config)
-
-        # self.nat_gateways = VPC._create_nat_gateways(
-        #     config, subnets=self.subnets, elastic_ips=self.elastic_ips
-        # )
-
-        self.internet_gateway = self._create_internet_gateway(self.config)
-        self.virtual_private_gateway = self._create_virtual_private_gateway(self.config)
-        self.egress_only_igw = self._create_egress_only_igw(self.config)
-
-        # self.attachments = VPC._create_attachments(
-        #     config, subnets=self.subnets, vpc=self.vpc
-        # )
-
-        self.route_tables = self._create_route_tables(self.config)
-        self.endpoints = self._create_endpoints(self.config)
+        self.register_outputs(self.outputs)
 
-        self.rt_associations = self._create_route_table_associations()
+    @staticmethod
+    def plan(
+        args: VPCArgs,
+        *,
+        resource_prefix: str | None = None,
+        region: str | None = None,
+        az_ids: list[str] | None = None,
+    ) -> Plan:
+        """Dry run: plan the resources of a VPC without a Pulumi engine.
+
+        Values that need invokes stay `Lookup` markers unless `region` and
+        `az_ids` are given.
+        """
+        return planner.plan_vpc(
+            VPCConfig.model_validate(args), resource_prefix, region, az_ids
+        )
 
-        self.register_outputs(self.outputs)
+    def _phase(self, name: str) -> AbstractContextManager[None]:
+        if self.recorder is None:
+            return nullcontext()
+        return self.recorder.phase(name)
 
     @property
     def ipv4_cidr_associations(self) -> list[IPv4Cidr]:
-        return [self.vpc] + self.secondary_ipv4_cidr_associations
+        return [self.vpc, *self.secondary_ipv4_cidr_associations]
 
-    @staticmethod
-    def get_az_ids() -> list[str]:
-        return list(aws.get_availability_zones(state="available").zone_ids)
+    def get_az_ids(self) -> list[str]:
+        return lookups.facts_cache.get_az_ids(self)
 
-    @staticmethod
-    def get_az_id_prefix() -> list[str]:
+    def get_az_id_prefix(self) -> str:
         """euc1-az1 -> euc1-az"""
-        return VPC.get_az_ids()[0][:-1]
+        return self.get_az_ids()[0][:-1]
 
     @cached_property
     def region(self) -> str:
-        return awscc.get_region().region
-
-    def _create_vpc(self, config: VPCConfig) -> awscc.ec2.Vpc:
-        extra_args = {
-            "instance_tenancy": "default",
-            "enable_dns_hostnames": True,
-            "enable_dns_support": True,
-            **config.extra_args,
-        }
-        vpc = awscc.ec2.Vpc(
-            "vpc",
-            cidr_block=str(config.primary_cidr.cidr),
-            tags=VPC.build_tags(
-                config.common_tags, config.tags, format="aws", Name=config.name
+        return lookups.facts_cache.get_region(self)
+
+    def _emit(self, planned: PlannedResource) -> pulumi.CustomResource:
+        package, module, name = planned.type.split(":")
+        if package == "aws-networking":
+            # resources implemented in this package, e.g. bulk_routes.RouteSet
+            sdk_module = importlib.import_module(f"pulumi_aws_vpc.{module}")
+        else:
+            sdk_module = getattr(aws if package == "aws" else awscc, module)
+        resource_class = getattr(sdk_module, name)
+        parent = self if planned.parent is None else self._resources[planned.parent]
+        resource: pulumi.CustomResource = resource_class(
+            planned.name,
+            **self._resolve(planned.inputs),
+            opts=ResourceOptions(
+                parent=parent,
+                depends_on=[self._resources[key] for key in planned.depends_on],
+                delete_before_replace=planned.delete_before_replace,
+                replace_on_changes=list(planned.replace_on_changes) or None,
+                retain_on_delete=planned.retain_on_delete or None,
+                aliases=[
+                    pulumi.Alias(parent=self if key is None else self._resources[key])
+                    for key in planned.alias_parents
+                ]
+                or None,
             ),
-            **extra_args,
-            opts=ResourceOptions(parent=self),
         )
-        return vpc
-
-    def _create_secondary_ipv4_cidrs(
-        self,
-        config: VPCConfig,
-    ) -> list[awscc.ec2.VpcCidrBlock]:
-        ipv4_cidr_associations = []
-        for i, cidr_obj in enumerate(config.secondary_ipv4_cidrs):
-            id_ = cidr_obj.cidr or f"/{cidr_obj.size}"
-            name = f"ipv4|{i + 1}|{id_}"
-            ipv4_cidr = awscc.ec2.VpcCidrBlock(
-                name,
-                vpc_id=self.vpc.id,
-                cidr_block=str(cidr_obj.cidr) if cidr_obj.cidr else None,
-                ipv4_ipam_pool_id=cidr_obj.ipam_pool_id,
-                ipv4_netmask_length=cidr_obj.size,
-                opts=ResourceOptions(parent=self.vpc),
-            )
-            ipv4_cidr_associations.append(ipv4_cidr)
-        return ipv4_cidr_associations
-
-    def _create_ipv6_cidrs(
-        self,
-        config: VPCConfig,
-    ) -> list[awscc.ec2.VpcCidrBlock]:
-        ipv6_cidr_associations = []
-        for i, cidr_obj in enumerate(config.cidrs.ipv6):
-            id_ = cidr_obj.cidr or f"/{cidr_obj.size}"
-            name = f"ipv6|{i}|{id_}"
-            amazon_provided = bool(
-                cidr_obj.ipam_pool_id is None and cidr_obj.cidr is None
+        return resource
+
+    def _resolve(self, value: Any) -> Any:
+        """Replace plan markers with Outputs of emitted resources and lookups."""
+        if isinstance(value, dict):
+            return {k: self._resolve(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(v) for v in value]
+        if isinstance(value, Ref):
+            return getattr(self._resources[value.key], value.attr)
+        if isinstance(value, Lookup):
+            return self._lookup(value)
+        if isinstance(value, SubnetCidr):
+            return self._subnet_cidr(value)
+        return value
+
+    def _lookup(self, lookup: Lookup) -> str | Output[str] | None:
+        if lookup.kind == "az_id":
+            return f"{self.get_az_id_prefix()}{lookup.key}"
+        if lookup.kind == "region":
+            return self.region
+        if lookup.kind == "service_name":
+            return f"com.amazonaws.{self.region}.{lookup.key}"
+        if lookup.kind == "vpc_peering_connection_id":
+            return self.lookups.vpc_peering_connection_id(lookup.key)
+        if lookup.kind == "provider_setting":
+            return lookups.default_provider_setting(self, lookup.key)
+        raise ValueError(f"Unknown lookup: {lookup.kind}")
+
+    def _subnet_cidr(self, cidr: SubnetCidr) -> Output[str]:
+        # one apply per VPC CIDR, fanned out to the subnets allocated from it
+        key = (cidr.source, cidr.prefix_lengths)
+        if key not in self._subnet_cidrs:
+            allocated_subnets = self._resolve(cidr.source).apply(
+                lambda vpc_cidr, sizes=list(cidr.prefix_lengths): (
+                    divide_supernet_into_subnets(vpc_cidr, sizes)
+                )
             )
-            nbg = (
-                self.region
-                if (cidr_obj.ipam_pool_id is None and cidr_obj.cidr is None)
-                else None
+            self._subnet_cidrs[key] = fan_out(
+                allocated_subnets, len(cidr.prefix_lengths)
             )
-            size = cidr_obj.size if cidr_obj.ipam_pool_id is not None else None
-            ipv6_cidr = awscc.ec2.VpcCidrBlock(
-                name,
-                vpc_id=self.vpc.id,
-                cidr_block=str(cidr_obj.cidr) if cidr_obj.cidr else None,
-                ipv6_ipam_pool_id=cidr_obj.ipam_pool_id,
-                ipv6_netmask_length=size,
-                amazon_provided_ipv6_cidr_block=amazon_provided,
-                ipv6_cidr_block_network_border_group=nbg,
-                opts=ResourceOptions(parent=self.vpc),
+        return self._subnet_cidrs[key][cidr.index]
+
+    def _collect_resources(self) -> None:
+        """Expose emitted resources the way callers and outputs expect them."""
+        config = self.config
+        # emitted classes depend on the backend, they are typed as Cloud Control
+        resources = self._resources
+        self.vpc = cast("awscc.ec2.Vpc", resources["vpc"])
+        self.vpc_id = self.vpc.id
+        self.secondary_ipv4_cidr_associations = [
+            cast("awscc.ec2.VpcCidrBlock", resources[f"ipv4_cidr:{i + 1}"])
+            for i in range(len(config.secondary_ipv4_cidrs))
+        ]
+        self.ipv6_cidr_associations = [
+            cast("awscc.ec2.VpcCidrBlock", resources[f"ipv6_cidr:{i}"])
+            for i in range(len(config.cidrs.ipv6))
+        ]
+        self.subnets = {
+            subnet_cfg.name: SubnetInfo(
+                subnet=cast("awscc.ec2.Subnet", resources[f"subnet:{subnet_cfg.name}"]),
+                route_table=subnet_cfg.route_table,
             )
-            ipv6_cidr_associations.append(ipv6_cidr)
-        return ipv6_cidr_associations
-
-    def _create_subnets(
-        self,
-        config: VPCConfig,
-    ) -> dict[str, aws.ec2.Subnet]:
-        class SubnetAutoAllocateCidr(TypedDict):
-            ipv4: Output[str]
-            ipv6: Output[str]
-
-        # group subnets by cidr num preserving order
-        grouped_subnets = GroupedSubnets(ipv4=defaultdict(list), ipv6=defaultdict(list))
-        for subnet_cfg in config.subnets:
-            if subnet_cfg.ipv4:
-                grouped_subnets["ipv4"][subnet_cfg.ipv4.cidr_num].append(subnet_cfg)
-            if subnet_cfg.ipv6:
-                grouped_subnets["ipv6"][subnet_cfg.ipv6.cidr_num].append(subnet_cfg)
-
-        subnet_name_to_cidrs = defaultdict(SubnetAutoAllocateCidr)
-        cidr_assoc_mapping = {
-            "ipv4": self.ipv4_cidr_associations,
-            "ipv6": self.ipv6_cidr_associations,
-        }
-        cidr_block_mapping = {
-            "ipv4": "cidr_block",
-            "ipv6": "ipv6_cidr_block",
+            for subnet_cfg in config.subnets
         }
 
-        for ip_version, groups in grouped_subnets.items():
-            for cidr_num, subnets in groups.items():
-                subnets_auto_allocate = [
-                    (subnet.name, getattr(subnet, ip_version).size)
-                    for subnet in subnets
-                    if not getattr(subnet, ip_version).cidr
-                ]
-                if not subnets_auto_allocate:
-                    continue
+        # self.elastic_ips = self._create_elastic_ips(config)
 
-                cidr_block = getattr(
-                    cidr_assoc_mapping[ip_version][cidr_num - 1],
-                    cidr_block_mapping[ip_version],
-                )
-                allocated_subnets = cidr_block.apply(
-                    lambda cidr,
-                    subnets=subnets_auto_allocate: divide_supernet_into_subnets(
-                        cidr, [s[1] for s in subnets]
-                    )
-                )
-                for i, (subnet_name, _) in enumerate(subnets_auto_allocate):
-                    subnet_name_to_cidrs[subnet_name][ip_version] = (
-                        allocated_subnets.apply(lambda cidrs, i=i: cidrs[i])
-                    )
-                    # def f(cidrs, i=i):
-                    #     pulumi.log.info(cidrs[i])
-                    #     return cidrs[i]
-
-                    # pulumi.log.info(subnet_name)
-                    # subnet_name_to_cidrs[subnet_name][ip_version] = (
-                    #     allocated_subnets.apply(f)
-                    # )
-
-        name_to_subnet = {}
-        az_id_prefix = VPC.get_az_id_prefix()
-        for subnet_cfg in config.subnets:
-            dependencies = []
-            subnet_cidrs = SubnetCidrs(ipv4=None, ipv6=None)
-            for ip_version in ["ipv4", "ipv6"]:
-                cidr_cfg = getattr(subnet_cfg, ip_version)
-                if cidr_cfg:
-                    dependencies.append(
-                        cidr_assoc_mapping[ip_version][cidr_cfg.cidr_num - 1]
-                    )
-                    cidr = cidr_cfg.cidr
-                    if cidr:
-                        subnet_cidrs[ip_version] = cidr
-                    else:
-                        subnet_cidrs[ip_version] = subnet_name_to_cidrs[
-                            subnet_cfg.name
-                        ][ip_version]
-
-            # Complete AZ id
-            if type(subnet_cfg.az_id) is int:
-                az_id = f"{az_id_prefix}{subnet_cfg.az_id}"
-            else:
-                az_id = subnet_cfg.az_id
-
-            subnet = awscc.ec2.Subnet(
-                subnet_cfg.name,
-                vpc_id=self.vpc.id,
-                availability_zone_id=az_id,
-                cidr_block=subnet_cidrs["ipv4"],
-                ipv6_cidr_block=subnet_cidrs["ipv6"],
-                ipv6_native=bool(subnet_cidrs["ipv6"] and not subnet_cidrs["ipv4"]),
-                assign_ipv6_address_on_creation=bool(subnet_cidrs["ipv6"]),
-                enable_dns64=bool(subnet_cidrs["ipv6"]),
-                tags=VPC.build_tags(
-                    config.common_tags,
-                    subnet_cfg.tags,
-                    Name=f"{config.name}-{subnet_cfg.name}",
-                ),
-                opts=ResourceOptions(
-                    depends_on=dependencies,
-                    parent=self.vpc,
-                    delete_before_replace=True,
-                ),
+        # self.nat_gateways = VPC._create_nat_gateways(
+        #     config, subnets=self.subnets, elastic_ips=self.elastic_ips
+        # )
+
+        self.internet_gateway = InternetGatewayInfo(igw=None, rt=None, attachment=None)
+        if config.internet_gateway is not None:
+            self.internet_gateway = InternetGatewayInfo(
+                igw=cast("awscc.ec2.InternetGateway", resources["igw"]),
+                rt=config.internet_gateway.route_table,
+                attachment=resources["igw_attachment"].id,
+            )
+        self.virtual_private_gateway = VirtualPrivateGatewayInfo(
+            vgw=None, rt=None, attachment=None
+        )
+        if config.virtual_private_gateway is not None:
+            self.virtual_private_gateway = VirtualPrivateGatewayInfo(
+                vgw=cast("awscc.ec2.VpnGateway", resources["vgw"]),
+                rt=config.virtual_private_gateway.route_table,
+                attachment=resources["vgw_attachment"].id,
             )
-            name_to_subnet[subnet_cfg.name] = SubnetInfo(
-                subnet=subnet, route_table=subnet_cfg.route_table
+        self.egress_only_igw = cast(
+            "awscc.ec2.EgressOnlyInternetGateway | None", resources.get("eigw")
+        )
+
+        # self.attachments = VPC._create_attachments(
+        #     config, subnets=self.subnets, vpc=self.vpc
+        # )
+
+        self.prefix_lists: dict[tuple[int, tuple[str, ...]], awscc.ec2.PrefixList] = {}
+        self.route_tables: dict[str, RouteTableInfo] = {
+            rt_config.name: RouteTableInfo(
+                rt=cast(
+                    "awscc.ec2.RouteTable", resources[f"route_table:{rt_config.name}"]
+                ),
+                routes={},
             )
-        return name_to_subnet
+            for rt_config in config.route_tables
+        }
+        self.endpoints: dict[str, awscc.ec2.VpcEndpoint] = {}
+        subnets_assoc: dict[str, awscc.ec2.SubnetRouteTableAssociation] = {}
+        for key, planned in self.resource_plan.resources.items():
+            kind, _, rest = key.partition(":")
+            if kind == "prefix_list":
+                ip_version = int(planned.inputs["address_family"].removeprefix("IPv"))
+                cidrs = tuple(entry["cidr"] for entry in planned.inputs["entries"])
+                self.prefix_lists[ip_version, cidrs] = cast(
+                    "awscc.ec2.PrefixList", resources[key]
+                )
+            elif kind == "route":
+                rt_name, destination = rest.split(":", 1)
+                self.route_tables[rt_name].routes[destination] = cast(
+                    "awscc.ec2.Route", resources[key]
+                )
+            elif kind == "route_set":
+                self.route_tables[rest] = self.route_tables[rest]._replace(
+                    route_set=cast("bulk_routes.RouteSet", resources[key])
+                )
+            elif kind == "endpoint":
+                self.endpoints[rest] = cast("awscc.ec2.VpcEndpoint", resources[key])
+            elif kind == "subnet_association":
+                subnets_assoc[rest] = cast(
+                    "awscc.ec2.SubnetRouteTableAssociation", resources[key]
+                )
+        self.rt_associations = RouteTableAssociations(
+            subnets=subnets_assoc,
+            igw=cast(
+                "awscc.ec2.GatewayRouteTableAssociation | None",
+                resources.get("igw_association"),
+            ),
+            vgw=cast(
+                "awscc.ec2.GatewayRouteTableAssociation | None",
+                resources.get("vgw_association"),
+            ),
+        )
 
     # def _create_elastic_ips(self, config: VPCConfig) -> dict[str, aws.ec2.Eip]:
     #     result = {}
@@ -357,237 +422,6 @@ class VPC(pulumi.ComponentResource):
     #         result[nat_config.name] = nat_gw
     #     return result
 
-    def _create_route_tables(
-        self,
-        config: VPCConfig,
-    ) -> dict[str, RouteTableInfo]:
-        name_to_rt = {}
-        for rt_config in config.route_tables:
-            route_table = awscc.ec2.RouteTable(
-                rt_config.name,
-                vpc_id=self.vpc.vpc_id,
-                tags=VPC.build_tags(
-                    config.common_tags,
-                    rt_config.tags,
-                    Name=f"{config.name}-{rt_config.name}",
-                ),
-                **rt_config.extra_options,
-                opts=ResourceOptions(parent=self.vpc),
-            )
-
-            routes = {}
-            for route_cfg in rt_config.routes:
-                dest_input, dest_id = self.parse_route_table_destination(
-                    route_cfg.destination
-                )
-                next_hop = self.parse_route_table_next_hop(route_cfg.next_hop)
-                route = awscc.ec2.Route(
-                    f"{rt_config.name}_{dest_id}",
-                    route_table_id=route_table.id,
-                    **dest_input,
-                    **next_hop,
-                    opts=ResourceOptions(
-                        parent=route_table,
-                        delete_before_replace=True,
-                        replace_on_changes=["*"],
-                    ),
-                )
-                routes[route_cfg.destination] = route
-            name_to_rt[rt_config.name] = RouteTableInfo(rt=route_table, routes=routes)
-        return name_to_rt
-
-    def parse_route_table_destination(
-        self, destination: str
-    ) -> tuple[dict[str, str], str]:
-        dest_id = destination
-        if destination.startswith("pl-"):
-            dest_input = {"destination_prefix_list_id": destination}
-        elif destination.startswith("subnet@"):
-            match = re.match(r"subnet\@(?P<subnet>[\w\-]+)\.(?P<attr>\w+)", destination)
-            if not match:
-                raise ValueError(f"Can't parse destination: {destination}")
-            subnet_name = match.group("subnet")
-            ip_version = match.group("attr")
-            dest_id = f"{subnet_name}.{ip_version}"
-            subnet = self.subnets[subnet_name].subnet
-            if ip_version == "ipv4":
-                dest_input = {"destination_cidr_block": subnet.cidr_block}
-            elif ip_version == "ipv6":
-                dest_input = {"destination_ipv6_cidr_block": subnet.ipv6_cidr_block}
-            else:
-                raise ValueError(f"Unknown IP version: {ip_version}")
-        elif isinstance(ip_network(destination), IPv4Network):
-            dest_input = {"destination_cidr_block": destination}
-        elif isinstance(ip_network(destination), IPv6Network):
-            dest_input = {"destination_ipv6_cidr_block": destination}
-        else:
-            raise ValueError(f"Unknown destination: {destination}")
-        return dest_input, dest_id
-
-    def parse_route_table_next_hop(self, next_hop: str) -> dict[str, str | Output[str]]:
-        if next_hop == "vgw":
-            if self.virtual_private_gateway is None:
-                raise ValueError("No Virtual Gateway has been created")
-            next_hop = {"gateway_id": self.virtual_private_gateway.vgw.id}
-        elif next_hop.startswith("vgw-"):
-            next_hop = {"gateway_id": next_hop}
-        elif next_hop == "igw":
-            if self.internet_gateway is None:
-                raise ValueError("No Internet Gateway has been created")
-            next_hop = {"gateway_id": self.internet_gateway.igw.id}
-        elif next_hop.startswith("igw-"):
-            next_hop = {"gateway_id": next_hop}
-        elif next_hop == "eigw":
-            if self.egress_only_igw is None:
-                raise ValueError("No Egress-Only Internet Gateway has been created")
-            next_hop = {"egress_only_internet_gateway_id": self.egress_only_igw.id}
-        elif next_hop.startswith("eigw-"):
-            next_hop = {"egress_only_internet_gateway_id": next_hop}
-        elif next_hop.startswith("eni-"):
-            next_hop = {"network_interface_id": next_hop}
-        elif next_hop.startswith("tgw-"):
-            next_hop = {"transit_gateway_id": next_hop}
-        elif next_hop.startswith("pcx-"):
-            next_hop = {"vpc_peering_connection_id": next_hop}
-        elif next_hop.startswith("pcx@"):
-            ref = next_hop.removeprefix("pcx@")
-            if ref.startswith("ssm:"):
-                pcx_id = awscc.get_ssm_parameter_string_output(
-                    name=ref.removeprefix("ssm:")
-                ).value
-            else:
-                tags = {}
-                args = {}
-                for s in ref.split(","):
-                    k, _, v = s.partition("=")
-                    if k.startswith("tag:"):
-                        tags[k.removeprefix("tag:")] = v
-                    else:
-                        args[k] = v
-
-                pcx_id = aws.ec2.get_vpc_peering_connection_output(
-                    tags=tags if tags else None, **args
-                ).id
-            next_hop = {"vpc_peering_connection_id": pcx_id}
-        elif "core-network" in next_hop:
-            next_hop = {"core_network_arn": next_hop}
-        else:
-            raise ValueError(f"Unknown next hop: {next_hop}")
-        return next_hop
-
-    def _create_route_table_associations(
-        self,
-    ) -> RouteTableAssociations:
-        subnets_assoc = {}
-        igw_assoc = None
-        vgw_assoc = None
-        for subnet_name, subnet_info in self.subnets.items():
-            rt_name = subnet_info.route_table
-            if rt_name is None:
-                continue
-            rt_id = self.route_tables[rt_name].rt.id
-            association = awscc.ec2.SubnetRouteTableAssociation(
-                f"{subnet_name}_{rt_name}",
-                route_table_id=rt_id,
-                subnet_id=subnet_info.subnet.id,
-                opts=ResourceOptions(parent=subnet_info.subnet),
-            )
-            subnets_assoc[subnet_name] = association
-
-        if self.internet_gateway.rt is not None:
-            igw_assoc = awscc.ec2.GatewayRouteTableAssociation(
-                f"igw_{self.internet_gateway.rt}",
-                route_table_id=self.route_tables[self.internet_gateway.rt].rt.id,
-                gateway_id=self.internet_gateway.igw.id,
-                opts=ResourceOptions(parent=self.internet_gateway.igw),
-            )
-
-        if self.virtual_private_gateway.rt is not None:
-            vgw_assoc = awscc.ec2.GatewayRouteTableAssociation(
-                f"vgw_{self.virtual_private_gateway.rt}",
-                route_table_id=self.route_tables[self.virtual_private_gateway.rt].rt.id,
-                gateway_id=self.virtual_private_gateway.vgw.id,
-                opts=ResourceOptions(parent=self.virtual_private_gateway.vgw),
-            )
-
-        return RouteTableAssociations(
-            subnets=subnets_assoc,
-            igw=igw_assoc,
-            vgw=vgw_assoc,
-        )
-
-    def _create_internet_gateway(self, config: VPCConfig) -> InternetGatewayInfo:
-        if config.internet_gateway is None:
-            return InternetGatewayInfo(igw=None, rt=None, attachment=None)
-        igw = awscc.ec2.InternetGateway(
-            "igw",
-            tags=VPC.build_tags(
-                config.common_tags,
-                config.internet_gateway.tags,
-                Name=f"{config.name}-igw",
-            ),
-            **config.internet_gateway.extra_args,
-            opts=ResourceOptions(parent=self.vpc),
-        )
-        attachment = awscc.ec2.VpcGatewayAttachment(
-            "igw",
-            opts=ResourceOptions(parent=igw),
-            vpc_id=self.vpc.id,
-            internet_gateway_id=igw.id,
-        )
-        return InternetGatewayInfo(
-            igw=igw, rt=config.internet_gateway.route_table, attachment=attachment.id
-        )
-
-    def _create_virtual_private_gateway(
-        self, config: VPCConfig
-    ) -> VirtualPrivateGatewayInfo:
-        if config.virtual_private_gateway is None:
-            return VirtualPrivateGatewayInfo(vgw=None, rt=None, attachment=None)
-        vgw = awscc.ec2.VpnGateway(
-            "vgw",
-            tags=VPC.build_tags(
-                config.common_tags,
-                config.virtual_private_gateway.tags,
-                Name=f"{config.name}-vgw",
-            ),
-            amazon_side_asn=config.virtual_private_gateway.asn,
-            type="ipsec.1",
-            **config.virtual_private_gateway.extra_args,
-            opts=ResourceOptions(
-                parent=self.vpc,
-                delete_before_replace=True,
-            ),
-        )
-        attachment = awscc.ec2.VpcGatewayAttachment(
-            "vgw",
-            opts=ResourceOptions(
-                parent=vgw,
-                delete_before_replace=True,
-                depends_on=[vgw],
-            ),
-            vpc_id=self.vpc.id,
-            vpn_gateway_id=vgw.id,
-        )
-        return VirtualPrivateGatewayInfo(
-            vgw=vgw,
-            rt=config.virtual_private_gateway.route_table,
-            attachment=attachment.id,
-        )
-
-    def _create_egress_only_igw(
-        self, config: VPCConfig
-    ) -> awscc.ec2.EgressOnlyInternetGateway | None:
-        if config.egress_only_internet_gateway is None:
-            return None
-        eigw = awscc.ec2.EgressOnlyInternetGateway(
-            "eigw",
-            vpc_id=self.vpc.id,
-            **config.egress_only_internet_gateway.extra_args,
-            opts=ResourceOptions(parent=self.vpc),
-        )
-        return eigw
-
     # @staticmethod
     # def _create_attachments(
     #     config: VPCConfig, subnets: dict[str, SubnetInfo], vpc: aws.ec2.Vpc
@@ -660,30 +494,6 @@ class VPC(pulumi.ComponentResource):
     #             )
     #     return attachments
 
-    def _create_endpoints(self, config: VPCConfig) -> dict[str, Any]:
-        endpoints = {}
-        for vpce in self.config.endpoints:
-            service = vpce.service
-            if "." not in service:
-                service = f"com.amazonaws.{self.region}.{service}"
-            rt_ids = [self.route_tables[rt].rt.id for rt in vpce.route_tables]
-            endpoint = awscc.ec2.VpcEndpoint(
-                vpce.name,
-                vpc_id=self.vpc.id,
-                service_name=service,
-                route_table_ids=rt_ids,
-                private_dns_enabled=vpce.private_dns,
-                tags=VPC.build_tags(
-                    config.common_tags,
-                    vpce.tags,
-                    Name=f"{config.name}_{vpce.name}",
-                ),
-                **vpce.extra_args,
-                opts=ResourceOptions(parent=self.vpc),
-            )
-            endpoints[vpce.name] = endpoint
-        return endpoints
-
     @staticmethod
     def build_tags(
         common_tags: dict[str, str],
@@ -691,23 +501,13 @@ class VPC(pulumi.ComponentResource):
         format: TagType = "aws",
         **kwargs: str,
     ) -> dict[str, str] | list[dict[str, str]]:
-        tags = {**common_tags, **kwargs, **tags}
-        if format == "aws":
-            return [{"key": k, "value": v} for k, v in tags.items()]
-        elif format == "dict":
-            return tags
-        else:
-            raise ValueError(f"Invalid format: {format}")
-
-    @property
-    def vpc_id(self) -> Output[str]:
-        return self.vpc.id
+        return planner.build_tags(common_tags, tags, format, **kwargs)
 
-    @property
+    @cached_property
     def cidrs(self) -> VPCCidrs:
         return {
-            "ipv4": [self.vpc.cidr_block]
-            + [
+            # the primary CIDR comes first, from the VPC itself
+            "ipv4": [
                 cidr_association.cidr_block
                 for cidr_association in self.ipv4_cidr_associations
             ],
@@ -717,6 +517,60 @@ class VPC(pulumi.ComponentResource):
             ],
         }
 
+    def _network(self) -> Output[dict[str, Any]]:
+        """IDs and CIDRs of the VPC, subnets, route tables, gateways and endpoints.
+
+        Everything is resolved with a single `Output.all`, so a stack reference
+        gets the whole map in one read. Subnets are also grouped by tier and by
+        AZ ID, as lists of subnet IDs in config order.
+        """
+        subnets = {}
+        for subnet_cfg in self.config.subnets:
+            subnet = self.subnets[subnet_cfg.name].subnet
+            subnets[subnet_cfg.name] = {
+                "id": subnet.id,
+                "az_id": subnet.availability_zone_id,
+                "ipv4_cidr": subnet.cidr_block if subnet_cfg.ipv4 else None,
+                "ipv6_cidr": subnet.ipv6_cidr_block if subnet_cfg.ipv6 else None,
+                "route_table": subnet_cfg.route_table,
+                "tier": subnet_cfg.tier,
+            }
+        gateways = {
+            "igw": self.internet_gateway.igw,
+            "vgw": self.virtual_private_gateway.vgw,
+            "eigw": self.egress_only_igw,
+        }
+        structure = {
+            "vpc": {"id": self.vpc.id, "cidrs": self.cidrs},
+            "subnets": subnets,
+            "route_tables": {
+                name: info.rt.id for name, info in self.route_tables.items()
+            },
+            "gateways": {
+                name: gateway.id
+                for name, gateway in gateways.items()
+                if gateway is not None
+            },
+            "endpoints": {
+                name: endpoint.id for name, endpoint in self.endpoints.items()
+            },
+        }
+
+        def group_subnets(network: dict[str, Any]) -> dict[str, Any]:
+            by_tier: defaultdict[str, list[str]] = defaultdict(list)
+            by_az: defaultdict[str, list[str]] = defaultdict(list)
+            for subnet in network["subnets"].values():
+                if subnet["tier"] is not None:
+                    by_tier[subnet["tier"]].append(subnet["id"])
+                by_az[subnet["az_id"]].append(subnet["id"])
+            return {
+                **network,
+                "subnets_by_tier": dict(by_tier),
+                "subnets_by_az": dict(by_az),
+            }
+
+        return resolve_nested(structure).apply(group_subnets)
+
     # @property
     # def vgw_id(self) -> Optional[Output[str]]:
     #     if self.virtual_gateway is None:
@@ -731,5 +585,7 @@ class VPC(pulumi.ComponentResource):
 
     @property
     def outputs(self) -> dict[str, Any]:
-        result = {"id": self.vpc.id}
+        result: dict[str, Any] = {"id": self.vpc.id, "network": self.network}
+        if self.recorder is not None:
+            result["instrumentation"] = self.instrumentation
         return result
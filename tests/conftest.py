@@ -0,0 +1,106 @@
+from pulumi_aws_vpc import lookups
+import copy
+import pulumi
+import pytest
+
+BASE_VPC_ARGS = {
+    "name": "test",
+    "cidrs": {"ipv4": [{"cidr": "10.20.0.0/16"}], "ipv6": [{}]},
+    "subnets": [
+        {"name": "a", "az_id": 1, "ipv4": {"size": 24}, "ipv6": {}},
+        {"name": "b", "az_id": "euc1-az2", "ipv4": {"size": 24}, "route_table": "rt"},
+    ],
+    "internet_gateway": {},
+    "route_tables": [
+        {
+            "name": "rt",
+            "routes": [
+                {"destination": "0.0.0.0/0", "next_hop": "igw"},
+                {"destination": "subnet@a.ipv4", "next_hop": "pcx@ssm:/peering"},
+            ],
+        },
+    ],
+    "endpoints": [
+        {"name": "s3", "service": "s3", "type": "Gateway", "route_tables": ["rt"]}
+    ],
+}
+
+
+class VPCMocks(pulumi.runtime.Mocks):
+    AZ_TOKEN = "aws:index/getAvailabilityZones:getAvailabilityZones"
+    REGION_TOKEN = "aws-native:index:getRegion"
+    SSM_TOKEN = "aws-native:index:getSsmParameterString"
+    PEERING_TOKEN = "aws:ec2/getVpcPeeringConnection:getVpcPeeringConnection"
+
+    def __init__(self) -> None:
+        self.resources: dict[str, pulumi.runtime.MockResourceArgs] = {}
+        self.calls: list[pulumi.runtime.MockCallArgs] = []
+
+    def new_resource(self, args: pulumi.runtime.MockResourceArgs):
+        self.resources[f"{args.typ}::{args.name}"] = args
+        state = dict(args.inputs)
+        if state.get("amazonProvidedIpv6CidrBlock") or state.get(
+            "assignGeneratedIpv6CidrBlock"
+        ):
+            # Amazon hands out a /56 from its own pool
+            state["ipv6CidrBlock"] = f"2a05:d014:0:{len(self.resources):x}00::/56"
+        # IPAM pools hand out a block of the requested size
+        if state.get("ipv4IpamPoolId") and not state.get("cidrBlock"):
+            state["cidrBlock"] = (
+                f"10.{len(self.resources)}.0.0/{int(state['ipv4NetmaskLength'])}"
+            )
+        if state.get("ipv6IpamPoolId") and not state.get("ipv6CidrBlock"):
+            state["ipv6CidrBlock"] = (
+                f"2600:1f14:0:{len(self.resources):x}00::/{int(state['ipv6NetmaskLength'])}"
+            )
+        return [f"{args.name}-id", state]
+
+    def call(self, args: pulumi.runtime.MockCallArgs):
+        self.calls.append(args)
+        if args.token == self.AZ_TOKEN:
+            return {
+                "names": ["eu-central-1a", "eu-central-1b", "eu-central-1c"],
+                "zoneIds": ["euc1-az2", "euc1-az3", "euc1-az1"],
+            }
+        if args.token == self.REGION_TOKEN:
+            return {"region": "eu-central-1"}
+        if args.token == self.SSM_TOKEN:
+            return {"value": "pcx-0ssm"}
+        if args.token == self.PEERING_TOKEN:
+            return {"id": "pcx-0filter"}
+        return {}
+
+    def invoked(self, token: str) -> int:
+        return sum(1 for call in self.calls if call.token == token)
+
+
+@pytest.fixture
+def mocks() -> VPCMocks:
+    mocks = VPCMocks()
+    pulumi.runtime.set_mocks(mocks, preview=False)
+    lookups.ReferenceLookups.shared.clear()
+    return mocks
+
+
+@pytest.fixture
+def facts_cache(monkeypatch) -> lookups.FactsCache:
+    cache = lookups.FactsCache()
+    monkeypatch.setattr(lookups, "facts_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def vpc_args_defaults() -> dict:
+    """Top-level VPC args a test module changes for all of its tests."""
+    return {}
+
+
+@pytest.fixture
+def vpc_args(vpc_args_defaults):
+    """Factory of VPC args: the base VPC with the module's and the test's overrides."""
+
+    def make(name="test", **overrides):
+        args = {**BASE_VPC_ARGS, "name": name, **vpc_args_defaults, **overrides}
+        return copy.deepcopy(args)
+
+    return make
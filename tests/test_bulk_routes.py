@@ -0,0 +1,348 @@
+from pulumi_aws_vpc import VPC
+from pulumi_aws_vpc.bulk_routes import RouteSetProvider, reconcile
+from pulumi.runtime.config import CONFIG
+import json
+import pulumi
+import pytest
+
+RT = "rtb-1"
+
+
+class ClientError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeEC2:
+    """In-memory stand-in for the boto3 EC2 client, for one route table."""
+
+    def __init__(self, routes=()):
+        self.routes = [
+            {
+                "DestinationCidrBlock": "10.0.0.0/16",
+                "GatewayId": "local",
+                "Origin": "CreateRouteTable",
+            },
+            {
+                "DestinationPrefixListId": "pl-s3",
+                "GatewayId": "vpce-1",
+                "Origin": "CreateRoute",
+            },
+            *routes,
+        ]
+        self.calls = []
+
+    def _find(self, params):
+        for route in self.routes:
+            if all(
+                route.get(key) == value
+                for key, value in params.items()
+                if key.startswith("Destination")
+            ):
+                return route
+        return None
+
+    def describe_route_tables(self, RouteTableIds):
+        self.calls.append("describe_route_tables")
+        assert RouteTableIds == [RT]
+        return {
+            "RouteTables": [
+                {"RouteTableId": RT, "Routes": [dict(r) for r in self.routes]}
+            ]
+        }
+
+    def create_route(self, RouteTableId, **params):
+        self.calls.append("create_route")
+        if self._find(params):
+            raise ClientError("RouteAlreadyExists")
+        self.routes.append({**params, "Origin": "CreateRoute"})
+
+    def replace_route(self, RouteTableId, **params):
+        self.calls.append("replace_route")
+        route = self._find(params)
+        if route is None:
+            raise ClientError("InvalidRoute.NotFound")
+        route.clear()
+        route.update({**params, "Origin": "CreateRoute"})
+
+    def delete_route(self, RouteTableId, **params):
+        self.calls.append("delete_route")
+        route = self._find(params)
+        if route is None:
+            raise ClientError("InvalidRoute.NotFound")
+        self.routes.remove(route)
+
+
+def routes(count, target="tgw-1"):
+    return [
+        {"destination_cidr_block": f"172.16.{i}.0/24", "transit_gateway_id": target}
+        for i in range(count)
+    ]
+
+
+def test_reconcile_applies_only_changes():
+    client = FakeEC2()
+    desired = routes(500)
+    assert reconcile(client, RT, desired) == {
+        "created": 500,
+        "replaced": 0,
+        "deleted": 0,
+        "unchanged": 0,
+    }
+
+    changed = routes(499)
+    changed[0] = {"destination_cidr_block": "172.16.0.0/24", "gateway_id": "igw-1"}
+    changed.append(
+        {
+            "destination_ipv6_cidr_block": "::/0",
+            "egress_only_internet_gateway_id": "eigw-1",
+        }
+    )
+    client.calls.clear()
+    counts = reconcile(client, RT, changed, previous=desired)
+
+    assert counts == {"created": 1, "replaced": 1, "deleted": 1, "unchanged": 498}
+    assert client.calls.count("describe_route_tables") == 1
+    assert len(client.calls) == 4
+    assert {
+        "DestinationIpv6CidrBlock": "::/0",
+        "EgressOnlyInternetGatewayId": "eigw-1",
+        "Origin": "CreateRoute",
+    } in client.routes
+    # routes the set didn't program are left alone
+    assert client.routes[1]["DestinationPrefixListId"] == "pl-s3"
+
+
+def test_provider_lifecycle():
+    client = FakeEC2()
+    provider = RouteSetProvider(lambda *settings: client)
+    props = {"route_table_id": RT, "routes": routes(2), "region": "eu-central-1"}
+
+    created = provider.create(props)
+    assert created.id == f"{RT}-routes"
+    assert created.outs["last_changes"] == {
+        "created": 2,
+        "replaced": 0,
+        "deleted": 0,
+        "unchanged": 0,
+    }
+
+    news = {**props, "routes": routes(2, "tgw-2")}
+    diff = provider.diff(created.id, created.outs, news)
+    assert diff.changes and not diff.replaces
+    assert not provider.diff(created.id, created.outs, {**props}).changes
+    assert provider.diff(
+        created.id, created.outs, {**news, "route_table_id": "rtb-2"}
+    ).replaces == ["route_table_id"]
+
+    updated = provider.update(created.id, created.outs, news)
+    assert updated.outs["last_changes"]["replaced"] == 2
+
+    client.routes.pop()  # deleted outside of Pulumi
+    provider.delete(created.id, updated.outs)
+    assert [r.get("Origin") for r in client.routes] == [
+        "CreateRouteTable",
+        "CreateRoute",
+    ]
+
+
+def test_existing_routes_are_only_adopted_with_retain_routes():
+    # routes of the Route resources a table had before bulk_routes
+    existing = [
+        {
+            "DestinationCidrBlock": "172.16.0.0/24",
+            "TransitGatewayId": "tgw-0",
+            "Origin": "CreateRoute",
+        },
+        {
+            "DestinationCidrBlock": "172.16.1.0/24",
+            "TransitGatewayId": "tgw-1",
+            "Origin": "CreateRoute",
+        },
+    ]
+    client = FakeEC2(existing)
+    provider = RouteSetProvider(lambda *settings: client)
+    props = {"route_table_id": RT, "routes": routes(3), "region": "eu-central-1"}
+
+    with pytest.raises(
+        ValueError, match=r"172\.16\.0\.0/24, 172\.16\.1\.0/24 in rtb-1 exist"
+    ):
+        provider.create(props)
+    assert client.calls == ["describe_route_tables"]
+
+    created = provider.create({**props, "retain_routes": True})
+    # the drifted route is corrected in place
+    assert created.outs["last_changes"] == {
+        "created": 1,
+        "replaced": 1,
+        "deleted": 0,
+        "unchanged": 1,
+    }
+    assert provider.diff(created.id, created.outs, props).changes
+
+    provider.delete(created.id, created.outs)
+    assert len(client.routes) == 5
+
+
+def test_read_reports_drift():
+    client = FakeEC2()
+    provider = RouteSetProvider(lambda *settings: client)
+    props = {"route_table_id": RT, "routes": routes(3), "region": "eu-central-1"}
+    created = provider.create(props)
+
+    client.delete_route(RT, DestinationCidrBlock="172.16.0.0/24")
+    client.replace_route(RT, DestinationCidrBlock="172.16.1.0/24", GatewayId="igw-1")
+    read = provider.read(created.id, created.outs)
+    assert read.id == created.id
+    assert read.outs["routes"] == [
+        {"destination_cidr_block": "172.16.1.0/24", "gateway_id": "igw-1"},
+        {"destination_cidr_block": "172.16.2.0/24", "transit_gateway_id": "tgw-1"},
+    ]
+
+    diff = provider.diff(read.id, read.outs, props)
+    assert diff.changes
+    updated = provider.update(read.id, read.outs, props)
+    assert updated.outs["last_changes"] == {
+        "created": 1,
+        "replaced": 1,
+        "deleted": 0,
+        "unchanged": 1,
+    }
+
+
+def test_client_is_built_from_the_route_set_settings():
+    settings = []
+
+    def client_factory(*args):
+        settings.append(args)
+        return FakeEC2()
+
+    provider = RouteSetProvider(client_factory)
+    props = {"route_table_id": RT, "routes": routes(1), "region": "eu-central-1"}
+    provider.create(
+        {**props, "profile": "network", "role_arn": "arn:aws:iam::1:role/net"}
+    )
+    assert settings == [("eu-central-1", "network", "arn:aws:iam::1:role/net")]
+
+    with pytest.raises(ValueError, match="needs a region"):
+        provider.create({**props, "region": None})
+
+
+def test_reconcile_raises_other_errors():
+    class FailingEC2(FakeEC2):
+        def create_route(self, RouteTableId, **params):
+            raise ClientError("RouteLimitExceeded")
+
+    with pytest.raises(ClientError):
+        reconcile(FailingEC2(), RT, routes(1))
+
+
+@pulumi.runtime.test
+def test_vpc_with_bulk_routes(mocks, facts_cache):
+    vpc = VPC(
+        "vpc",
+        {
+            "name": "test",
+            "cidrs": {"ipv4": [{"cidr": "10.20.0.0/16"}]},
+            "internet_gateway": {},
+            "route_tables": [
+                {
+                    "name": "rt",
+                    "bulk_routes": True,
+                    "routes": [
+                        {"destination": "0.0.0.0/0", "next_hop": "igw"},
+                        {"destination": "172.16.0.0/24", "next_hop": "tgw-1"},
+                    ],
+                }
+            ],
+        },
+    )
+    assert vpc.route_tables["rt"].routes == {}
+    planned = vpc.resource_plan.resources["route_set:rt"]
+    assert planned.parent == "route_table:rt"
+
+    def check(args):
+        route_table_id, route_list = args
+        assert route_table_id == "rt-id"
+        assert route_list == [
+            {"destination_cidr_block": "0.0.0.0/0", "gateway_id": "igw-id"},
+            {"destination_cidr_block": "172.16.0.0/24", "transit_gateway_id": "tgw-1"},
+        ]
+
+    route_set = vpc.route_tables["rt"].route_set
+    return pulumi.Output.all(route_set.route_table_id, route_set.routes).apply(check)
+
+
+@pulumi.runtime.test
+def test_routes_are_retained_with_retain_routes(mocks, facts_cache):
+    vpc = VPC(
+        "vpc",
+        {
+            "name": "test",
+            "cidrs": {"ipv4": [{"cidr": "10.20.0.0/16"}]},
+            "route_tables": [
+                {
+                    "name": "rt",
+                    "retain_routes": True,
+                    "routes": [{"destination": "172.16.0.0/24", "next_hop": "tgw-1"}],
+                }
+            ],
+        },
+    )
+    resources = vpc.resource_plan.resources
+    routes = [r for key, r in resources.items() if key.startswith("route:")]
+    assert routes and all(r.retain_on_delete for r in routes)
+    assert not resources["route_table:rt"].retain_on_delete
+
+
+def bulk_vpc_args(**deployment):
+    return {
+        "name": "test",
+        "cidrs": {"ipv4": [{"cidr": "10.20.0.0/16"}]},
+        "route_tables": [
+            {
+                "name": "rt",
+                "bulk_routes": True,
+                "routes": [{"destination": "172.16.0.0/24", "next_hop": "tgw-1"}],
+            }
+        ],
+        "deployment": deployment,
+    }
+
+
+@pulumi.runtime.test
+def test_route_sets_use_the_default_provider_credentials(
+    mocks, facts_cache, monkeypatch
+):
+    config = {
+        "aws-native:profile": "network",
+        "aws-native:assumeRole": json.dumps({"roleArn": "arn:aws:iam::1:role/net"}),
+    }
+    for key, value in config.items():
+        monkeypatch.setitem(CONFIG.get(), key, value)
+    vpc = VPC("vpc", bulk_vpc_args())
+
+    def check(_):
+        inputs = mocks.resources["pulumi-python:dynamic:Resource::rt_routes"].inputs
+        assert inputs["region"] == "eu-central-1"
+        assert inputs["profile"] == "network"
+        assert inputs["role_arn"] == "arn:aws:iam::1:role/net"
+
+    return vpc.route_tables["rt"].route_set.id.apply(check)
+
+
+@pulumi.runtime.test
+def test_route_sets_need_credentials_with_an_explicit_provider(mocks, facts_cache):
+    provider = pulumi.ProviderResource("aws-native", "explicit")
+    opts = pulumi.ResourceOptions(providers=[provider])
+    with pytest.raises(ValueError, match="explicit aws-native provider"):
+        VPC("vpc", bulk_vpc_args(), opts)
+
+    args = bulk_vpc_args(route_set_role_arn="arn:aws:iam::2:role/net")
+    vpc = VPC("vpc2", args, opts)
+    planned = vpc.resource_plan.resources["route_set:rt"].inputs
+    assert (planned["profile"], planned["role_arn"]) == (
+        None,
+        "arn:aws:iam::2:role/net",
+    )
@@ -0,0 +1,150 @@
+from pulumi_aws_vpc.config import VPCConfig
+from pulumi_aws_vpc.errors import VPCConfigError
+import pydantic
+import pytest
+
+
+def test_config_reports_all_reference_errors():
+    config = {
+        "name": "test",
+        "cidrs": {"ipv4": [{"cidr": "10.0.0.0/16"}]},
+        "subnets": [
+            {"name": "a", "az_id": 1, "ipv4": {"size": 24}, "route_table": "missing"},
+            {"name": "a", "az_id": 2, "ipv4": {"size": 24, "cidr_num": 2}},
+            {"name": "b", "az_id": 2, "ipv4": {}, "ipv6": {}},
+        ],
+        "internet_gateway": {"route_table": "nope"},
+        "route_tables": [
+            {
+                "name": "rt",
+                "routes": [
+                    {"destination": "subnet@c.ipv4", "next_hop": "eni-1"},
+                    {"destination": "subnet@a.ipv6", "next_hop": "eni-1"},
+                    {"destination": "10.1.0.0/16", "next_hop": "vgw"},
+                    {"destination": "10.1.0.0/16", "next_hop": "tgw-1"},
+                ],
+            },
+            {"name": "rt", "routes": []},
+        ],
+        "endpoints": [
+            {"name": "s3", "service": "s3", "type": "Gateway", "route_tables": ["x"]}
+        ],
+    }
+    with pytest.raises(pydantic.ValidationError) as exc_info:
+        VPCConfig.model_validate(config)
+
+    error = exc_info.value.errors()[0]["ctx"]["error"]
+    assert isinstance(error, VPCConfigError)
+    assert error.errors == [
+        "Subnet 'a' is defined more than once",
+        "Route table 'rt' is defined more than once",
+        "Subnet 'a' references a route table 'missing' which is not defined",
+        "Subnet 'a' references ipv4 VPC CIDR number 2, but 1 are defined",
+        "Subnet 'b' references ipv6 VPC CIDR number 1, but 0 are defined",
+        "Subnet 'b' needs an ipv4 cidr or size",
+        "Internet Gateway references a route table 'nope' which is not defined",
+        "Route table 'rt' references a subnet 'c' which is not defined",
+        "Route table 'rt' references ipv6 CIDR of subnet 'a' which has none",
+        "Route table 'rt' uses next hop 'vgw' which is not defined",
+        "Route table 'rt' has more than one route to '10.1.0.0/16'",
+        "Endpoint 's3' references a route table 'x' which is not defined",
+    ]
+
+
+def test_config_validation_large():
+    config = {
+        "name": "large",
+        "cidrs": {"ipv4": [{"cidr": "10.0.0.0/8"}]},
+        "subnets": [
+            {"name": f"s{i}", "az_id": 1, "ipv4": {"size": 24}, "route_table": "rt"}
+            for i in range(10_000)
+        ],
+        "route_tables": [
+            {
+                "name": "rt",
+                "routes": [
+                    {"destination": f"subnet@s{i}.ipv4", "next_hop": "eni-1"}
+                    for i in range(10_000)
+                ],
+            }
+        ],
+    }
+    assert len(VPCConfig.model_validate(config).subnets) == 10_000
+
+
+def test_subnet_tiers_expand_per_az():
+    config = VPCConfig.model_validate(
+        {
+            "name": "test",
+            "cidrs": {"ipv4": [{"cidr": "10.0.0.0/16"}], "ipv6": [{}]},
+            "subnets": [{"name": "mgmt", "az_id": 1, "ipv4": {"size": 28}}],
+            "subnet_tiers": [
+                {
+                    "name": "int-az{az}",
+                    "az_ids": [1, 2, 3],
+                    "ipv4": {"size": 24},
+                    "route_table": "rt",
+                    "tags": {"tier": "int"},
+                },
+                {"name": "ext-{az}", "az_ids": ["euc1-az1"], "ipv6": {}},
+                {"name": "db{az}", "az_ids": [1], "ipv4": {"size": 26}, "tier": "db"},
+            ],
+            "route_tables": [
+                {
+                    "name": "rt",
+                    "routes": [
+                        {"destination": "subnet@int-az2.ipv4", "next_hop": "eni-1"}
+                    ],
+                }
+            ],
+        }
+    )
+
+    assert [(s.name, s.az_id) for s in config.subnets] == [
+        ("mgmt", 1),
+        ("int-az1", 1),
+        ("int-az2", 2),
+        ("int-az3", 3),
+        ("ext-euc1-az1", "euc1-az1"),
+        ("db1", 1),
+    ]
+    # tiers label their subnets with the pattern without the AZ, or `tier`
+    assert [s.tier for s in config.subnets] == [
+        None,
+        "int-az",
+        "int-az",
+        "int-az",
+        "ext",
+        "db",
+    ]
+    int_az1, int_az2 = config.subnets[1:3]
+    assert int_az2.ipv4.size == 24
+    assert int_az2.route_table == "rt"
+    assert int_az2.tags == {"tier": "int"}
+    assert int_az1.ipv4 is not int_az2.ipv4
+    assert config.subnet_tiers == []
+    # a dumped config doesn't expand the tiers a second time
+    assert VPCConfig.model_validate(config.model_dump()) == config
+
+
+def test_subnet_tier_errors():
+    with pytest.raises(pydantic.ValidationError) as exc_info:
+        VPCConfig.model_validate(
+            {
+                "name": "test",
+                "cidrs": {"ipv4": [{"cidr": "10.0.0.0/16"}]},
+                "subnet_tiers": [
+                    {"name": "int", "az_ids": [1, 2], "ipv4": {"size": 24}},
+                    {
+                        "name": "ext-{az}",
+                        "az_ids": [1],
+                        "ipv4": {"cidr": "10.0.0.0/24"},
+                    },
+                ],
+            }
+        )
+
+    assert exc_info.value.errors()[0]["ctx"]["error"].errors == [
+        "Subnet tier 'int' needs an {az} placeholder",
+        "Subnet tier 'ext-{az}' can't have a literal ipv4 cidr",
+    ]
@@ -0,0 +1,108 @@
+from pulumi_aws_vpc import VPC, dag
+import pulumi
+import pytest
+
+
+@pytest.fixture
+def vpc_args_defaults():
+    return {
+        "cidrs": {"ipv4": [{"cidr": "10.20.0.0/16"}, {"cidr": "100.64.0.0/26"}]},
+        "subnets": [
+            {"name": "a", "az_id": 1, "ipv4": {"size": 24}, "route_table": "rt"},
+            {"name": "b", "az_id": 2, "ipv4": {"cidr": "100.64.0.0/28", "cidr_num": 2}},
+        ],
+        "virtual_private_gateway": {},
+        "route_tables": [
+            {
+                "name": "rt",
+                "routes": [
+                    {"destination": "0.0.0.0/0", "next_hop": "igw"},
+                    {"destination": "10.30.0.0/16", "next_hop": "vgw"},
+                    {"destination": "subnet@b.ipv4", "next_hop": "eni-1"},
+                ],
+            },
+        ],
+        "endpoints": [],
+    }
+
+
+def test_dependencies_and_report(vpc_args):
+    plan = VPC.plan(vpc_args())
+    graph = dag.dependencies(plan)
+
+    # a literal CIDR in a secondary block still needs the association first
+    assert plan.resources["subnet:b"].depends_on == ("ipv4_cidr:1",)
+    assert graph["subnet:b"] == ("vpc", "ipv4_cidr:1")
+    assert graph["route:rt:subnet@b.ipv4"] == ("route_table:rt", "subnet:b")
+    assert graph["vgw"] == ("vpc",)
+
+    report = dag.analyze(plan, create_seconds={"aws-native:ec2:Subnet": 60})
+    # vpc -> ipv4 cidr -> subnet b -> route
+    assert report.depth == 4
+    assert report.critical_path == [
+        "vpc",
+        "ipv4_cidr:1",
+        "subnet:b",
+        "route:rt:subnet@b.ipv4",
+    ]
+    assert report.critical_path_seconds == 10 + 15 + 60 + 5
+    assert report.deploy_seconds == report.critical_path_seconds
+    assert dag.simulate_deploy(plan, parallelism=1) == sum(
+        dag._create_seconds(plan, None).values()
+    )
+
+
+def test_detached_gateways_shorten_critical_path(vpc_args):
+    attached = dag.analyze(VPC.plan(vpc_args()))
+    plan = VPC.plan(vpc_args(deployment={"detach_gateways": True}))
+    detached = dag.analyze(plan)
+
+    assert attached.critical_path == ["vpc", "vgw", "vgw_attachment"]
+    assert detached.critical_path == ["vgw", "vgw_attachment"]
+    assert detached.deploy_seconds == attached.deploy_seconds - 10
+    assert plan.resources["vgw"].parent is None
+    assert plan.resources["vgw"].alias_parents == ("vpc",)
+
+
+def test_toggling_detached_gateways_moves_resources(vpc_args):
+    attached = VPC.plan(vpc_args())
+    detached = VPC.plan(vpc_args(deployment={"detach_gateways": True}))
+    assert attached.resources["vgw"].alias_parents == (None,)
+
+    # on -> off -> on
+    for old, new in [(detached, attached), (attached, detached)]:
+        assert dag.steps(old, new) == {}
+    # without the alias to the component, moving back would replace the gateway
+    vgw = attached.resources["vgw"]
+    vgw.alias_parents = ()
+    assert dag.steps(detached, attached) == {"vgw": "replace"}
+
+
+@pulumi.runtime.test
+def test_detached_gateways_keep_urns(mocks, facts_cache, vpc_args):
+    vpc = VPC("test", vpc_args(deployment={"detach_gateways": True}))
+
+    def check(urn):
+        assert urn.endswith(
+            "aws-networking:index:VPC$aws-native:ec2:InternetGateway::igw"
+        )
+
+    return vpc.internet_gateway.igw.urn.apply(check)
+
+
+def test_next_hop_change_updates_routes_in_place(vpc_args):
+    def plan(next_hop, route_updates):
+        args = vpc_args(deployment={"route_updates": route_updates})
+        args["route_tables"][0]["routes"][1]["next_hop"] = next_hop
+        return VPC.plan(args)
+
+    replaced = dag.steps(plan("vgw", "replace"), plan("tgw-1", "replace"))
+    in_place = dag.steps(plan("vgw", "in_place"), plan("tgw-1", "in_place"))
+    old = plan("vgw", "in_place")
+    new = plan("vgw", "in_place")
+    route = new.resources["route:rt:10.30.0.0/16"]
+    route.inputs["destination_cidr_block"] = "10.31.0.0/16"
+
+    assert replaced == {"route:rt:10.30.0.0/16": "replace"}
+    assert in_place == {"route:rt:10.30.0.0/16": "update"}
+    assert dag.steps(old, new) == {"route:rt:10.30.0.0/16": "replace"}
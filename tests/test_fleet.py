@@ -0,0 +1,126 @@
+from pulumi_aws_vpc import VPCFleet, ipam
+from pulumi_aws_vpc.config import VPCFleetConfig
+from pulumi_aws_vpc.errors import VPCConfigError
+import pulumi
+import pydantic
+import pytest
+
+
+@pytest.fixture
+def vpc_args_defaults():
+    # members with a /20 from the supernet and one subnet
+    return {
+        "cidrs": {"ipv4": [{"size": 20}]},
+        "subnets": [{"name": "a", "az_id": 1, "ipv4": {"size": 24}}],
+        "internet_gateway": None,
+        "route_tables": [],
+        "endpoints": [],
+    }
+
+
+@pulumi.runtime.test
+def test_fleet_allocates_vpc_cidrs_and_shares_lookups(mocks, facts_cache, vpc_args):
+    fleet = VPCFleet(
+        "fleet",
+        {
+            "supernet": "10.0.0.0/16",
+            "common_tags": {"team": "net"},
+            "vpcs": [
+                vpc_args("a", cidrs={"ipv4": [{"size": 18}]}),
+                vpc_args("b"),
+                vpc_args("c", cidrs={"ipv4": [{"cidr": "10.1.0.0/16"}]}),
+                vpc_args("d", cidrs={"ipv4": [{"size": 18}]}),
+            ],
+        },
+    )
+
+    assert fleet.allocated_cidrs == {
+        "a": "10.0.0.0/18",
+        "b": "10.0.64.0/20",
+        "d": "10.0.128.0/18",
+    }
+    assert mocks.invoked(mocks.AZ_TOKEN) == 1
+    assert mocks.invoked(mocks.REGION_TOKEN) == 1
+
+    def check(args):
+        cidrs, vpc_ids, _ = args
+        assert cidrs == {
+            "a": "10.0.0.0/18",
+            "b": "10.0.64.0/20",
+            "c": "10.1.0.0/16",
+            "d": "10.0.128.0/18",
+        }
+        assert vpc_ids == {name: f"fleet-{name}-vpc-id" for name in "abcd"}
+        subnet = mocks.resources["aws-native:ec2:Subnet::fleet-b-a"]
+        assert subnet.inputs["cidrBlock"] == "10.0.64.0/24"
+        assert {"key": "team", "value": "net"} in subnet.inputs["tags"]
+
+    # wait for the subnet too, it can register after the VPC outputs resolve
+    subnet_id = fleet.vpcs["b"].subnets["a"].subnet.id
+    return pulumi.Output.all(fleet.cidrs, fleet.vpc_ids, subnet_id).apply(check)
+
+
+@pulumi.runtime.test
+def test_fleet_keeps_allocated_cidrs(
+    mocks, facts_cache, tmp_path, monkeypatch, vpc_args
+):
+    monkeypatch.setattr(ipam, "allocator", ipam.LocalIpamAllocator(tmp_path / "a.json"))
+    args = {
+        "supernet": "10.0.0.0/16",
+        "vpcs": [vpc_args("a"), vpc_args("b"), vpc_args("c")],
+    }
+    first = VPCFleet("first", args)
+    assert first.allocated_cidrs == {
+        "a": "10.0.0.0/20",
+        "b": "10.0.16.0/20",
+        "c": "10.0.32.0/20",
+    }
+
+    # the next run drops a and resizes b: c stays, a keeps its block until it is
+    # released and the new member d gets the block b left
+    args["vpcs"] = [
+        vpc_args("b", cidrs={"ipv4": [{"size": 19}]}),
+        vpc_args("c"),
+        vpc_args("d"),
+    ]
+    second = VPCFleet("first", args)
+    assert second.allocated_cidrs == {
+        "b": "10.0.64.0/19",
+        "c": "10.0.32.0/20",
+        "d": "10.0.16.0/20",
+    }
+    # the same member names in another fleet are other VPCs
+    other = VPCFleet("other", {"supernet": "10.0.0.0/16", "vpcs": [vpc_args("c")]})
+    assert other.allocated_cidrs == {"c": "10.0.0.0/20"}
+
+    vpc_ids = [first.vpc_ids, other.vpc_ids, other.vpcs["c"].subnets["a"].subnet.id]
+    return pulumi.Output.all(*vpc_ids)
+
+
+def test_fleet_config_errors(vpc_args):
+    with pytest.raises(pydantic.ValidationError) as exc_info:
+        VPCFleetConfig.model_validate(
+            {
+                "supernet": "10.0.0.0/16",
+                "vpcs": [
+                    vpc_args("a"),
+                    vpc_args("a"),
+                    vpc_args("b", cidrs={"ipv4": [{"cidr": "10.0.1.0/24"}]}),
+                    vpc_args("c", cidrs={"ipv4": [{"size": 8}]}),
+                    {"name": "d", "cidrs": {"ipv4": []}},
+                ],
+            }
+        )
+    error = exc_info.value.errors()[0]["ctx"]["error"]
+    assert isinstance(error, VPCConfigError)
+    assert error.errors == [
+        "VPC 'a' is defined more than once",
+        "VPC 'c' size /8 doesn't fit supernet 10.0.0.0/16",
+        "VPC 'd' needs a primary ipv4 CIDR",
+        "10.0.1.0/24 of VPC 'b' overlaps 10.0.0.0/16 of the supernet",
+    ]
+
+
+def test_fleet_config_requires_supernet_for_sized_vpcs(vpc_args):
+    with pytest.raises(pydantic.ValidationError, match="no supernet is defined"):
+        VPCFleetConfig.model_validate({"vpcs": [vpc_args("a")]})
@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+
+def test_import_does_not_load_provider_sdks():
+    script = (
+        "import sys, pulumi_aws_vpc\n"
+        "loaded = [name for name, module in sys.modules.items()\n"
+        "          if name.split('.')[0] in ('pulumi_aws', 'pulumi_aws_native')\n"
+        "          and type(module).__name__ != '_LazyModule']\n"
+        "print(loaded)"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    assert completed.stdout.strip() == "[]"
@@ -0,0 +1,112 @@
+from pulumi_aws_vpc import VPC, ingest
+from pulumi_aws_vpc.errors import VPCConfigError
+from pulumi_aws_vpc.ingest import load_config_files, load_configs
+import json
+import pulumi
+import pytest
+
+
+@pytest.fixture
+def cpus(monkeypatch):
+    """Pretend to run on 4 CPUs, so the pool is used on any machine."""
+    monkeypatch.setattr(ingest.os, "cpu_count", lambda: 4)
+
+
+def document(name, **overrides):
+    config = {
+        "name": name,
+        "cidrs": {"ipv4": [{"cidr": "10.0.0.0/16"}], "ipv6": [{}]},
+        "subnets": [
+            {"name": "a", "az_id": 1, "ipv4": {"size": 24}, "ipv6": {}},
+            {"name": "b", "az_id": 2, "ipv4": {"size": 25}},
+            {"name": "c", "az_id": 3, "ipv4": {"cidr": "10.0.0.0/24"}},
+        ],
+    }
+    config.update(overrides)
+    return config
+
+
+def test_load_configs_keeps_order_and_plans_literal_cidrs(cpus):
+    configs = load_configs([document(f"vpc-{i}") for i in range(20)], max_workers=2)
+
+    assert [config.name for config in configs] == [f"vpc-{i}" for i in range(20)]
+    subnets = {subnet.name: subnet for subnet in configs[0].subnets}
+    assert subnets["a"].ipv4.cidr == "10.0.0.0/24"
+    assert subnets["b"].ipv4.cidr == "10.0.1.0/25"
+    # Amazon provided IPv6 is only known after apply
+    assert subnets["a"].ipv6.cidr is None
+
+
+def test_load_configs_reports_errors_in_document_order(cpus):
+    documents = [
+        document("ok"),
+        document("bad-ref", subnets=[{"name": "a", "az_id": 1, "route_table": "x"}]),
+        document("ok2"),
+        {"name": "bad-field", "cidrs": {}, "unknown": 1},
+        document("full", subnets=[{"name": "a", "az_id": 1, "ipv4": {"size": 15}}]),
+    ]
+    expected = [
+        "Document 1 ('bad-ref'): Subnet 'a' references a route table 'x' which is not defined",
+        "Document 3 ('bad-field'): unknown: Extra inputs are not permitted",
+        "Document 4 ('full'): Can't allocate /15 from 10.0.0.0/16: prefix length must be between 16 and 32",
+    ]
+    for max_workers in (1, 3):
+        with pytest.raises(VPCConfigError) as exc_info:
+            load_configs(documents, max_workers=max_workers, chunksize=1)
+        assert exc_info.value.errors == expected
+
+
+def test_pool_reads_documents_as_workers_need_them(cpus):
+    read = []
+
+    def documents():
+        for i in range(100):
+            read.append(i)
+            yield document(f"vpc-{i}")
+
+    results = ingest._prepare_in_pool(enumerate(documents()), 2, chunksize=3)
+    config, errors = next(results)
+    assert (config.name, errors) == ("vpc-0", [])
+    # 2 chunks pending per worker, and the chunk read before the first result
+    assert len(read) <= (2 * ingest.PENDING_CHUNKS_PER_WORKER + 1) * 3
+    assert [config.name for config, _ in results] == [f"vpc-{i}" for i in range(1, 100)]
+
+
+def test_single_cpu_loads_in_process(monkeypatch):
+    monkeypatch.setattr(ingest.os, "cpu_count", lambda: 1)
+    monkeypatch.setattr(ingest, "ProcessPoolExecutor", None)
+    configs = load_configs([document(f"vpc-{i}") for i in range(3)], max_workers=4)
+    assert [config.name for config in configs] == ["vpc-0", "vpc-1", "vpc-2"]
+
+
+def test_load_config_files(tmp_path):
+    jsonl_file = tmp_path / "vpcs.jsonl"
+    jsonl_file.write_text(
+        "\n".join(json.dumps(document(f"vpc-{i}")) for i in range(3)) + "\n"
+    )
+    yaml_file = tmp_path / "vpcs.yaml"
+    yaml_file.write_text(
+        "---\n"
+        + json.dumps(document("vpc-3"))
+        + "\n---\n"
+        + json.dumps([document("vpc-4"), document("vpc-5")])
+        + "\n"
+    )
+
+    configs = load_config_files(jsonl_file, yaml_file, max_workers=1)
+
+    assert [config.name for config in configs] == [f"vpc-{i}" for i in range(6)]
+
+
+@pulumi.runtime.test
+def test_planned_config_builds_same_subnets(mocks):
+    (planned,) = load_configs([document("planned")], max_workers=1)
+    vpc = VPC("vpc", planned)
+
+    assert vpc.config is planned
+
+    def check(_):
+        subnet = mocks.resources["aws-native:ec2:Subnet::b"]
+        assert subnet.inputs["cidrBlock"] == "10.0.1.0/25"
+
+    return vpc.subnets["b"].subnet.id.apply(check)
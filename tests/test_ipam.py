@@ -0,0 +1,156 @@
+from concurrent.futures import ProcessPoolExecutor
+from ipaddress import ip_network
+import json
+
+from pulumi_aws_vpc import VPCFleet, ipam
+from pulumi_aws_vpc.ipam import LocalIpamAllocator
+from pulumi_aws_vpc.planner import SubnetCidr
+import netaddr
+import pulumi
+import pytest
+
+POOLS = {"pool-v4": ["10.0.0.0/14", "10.8.0.0/16"], "pool-v6": ["2600:1f14::/48"]}
+
+
+@pytest.fixture
+def local_ipam(tmp_path, monkeypatch) -> LocalIpamAllocator:
+    allocator = LocalIpamAllocator(tmp_path / "ipam.json", POOLS)
+    monkeypatch.setattr(ipam, "allocator", allocator)
+    return allocator
+
+
+def test_allocations_are_persistent_and_disjoint(tmp_path):
+    allocator = LocalIpamAllocator(tmp_path / "ipam.json", POOLS)
+    first = [allocator.allocate("pool-v4", f"vpc-{i}", 16) for i in range(4)]
+    assert first == ["10.0.0.0/16", "10.1.0.0/16", "10.2.0.0/16", "10.3.0.0/16"]
+    # the first pool CIDR is full, the next one is used
+    assert allocator.allocate("pool-v4", "vpc-4", 17) == "10.8.0.0/17"
+    assert allocator.allocate("pool-v6", "vpc-0", 56) == "2600:1f14::/56"
+
+    reopened = LocalIpamAllocator(tmp_path / "ipam.json")
+    assert reopened.allocate("pool-v4", "vpc-2", 16) == "10.2.0.0/16"
+    # a smaller block fills the gap a released one leaves
+    assert reopened.release("vpc-1") == ["10.1.0.0/16"]
+    assert reopened.allocate("pool-v4", "vpc-5", 18) == "10.1.0.0/18"
+    assert reopened.allocate("pool-v4", "vpc-6", 17) == "10.1.128.0/17"
+
+    with pytest.raises(ValueError, match="no free /16"):
+        reopened.allocate("pool-v4", "vpc-7", 16)
+    with pytest.raises(ValueError, match="'pool-x' is not defined"):
+        reopened.allocate("pool-x", "vpc-0", 16)
+
+
+def test_failed_resize_keeps_the_block(tmp_path):
+    allocator = LocalIpamAllocator(tmp_path / "ipam.json", {"pool": ["10.0.0.0/16"]})
+    assert allocator.allocate("pool", "vpc1", 17) == "10.0.0.0/17"
+    assert allocator.allocate("pool", "vpc2", 17) == "10.0.128.0/17"
+    with pytest.raises(ValueError, match="no free /16"):
+        allocator.allocate("pool", "vpc1", 16)
+
+    assert allocator.allocate("pool", "vpc1", 17) == "10.0.0.0/17"
+    with pytest.raises(ValueError, match="no free /17"):
+        LocalIpamAllocator(allocator.path).allocate("pool", "vpc3", 17)
+
+
+def allocate_many(path, worker):
+    allocator = LocalIpamAllocator(path)
+    return [allocator.allocate("pool-v4", f"{worker}-{i}", 24) for i in range(20)]
+
+
+def test_concurrent_runs_get_disjoint_blocks(tmp_path):
+    path = tmp_path / "ipam.json"
+    LocalIpamAllocator(path, POOLS)
+    with ProcessPoolExecutor(4) as executor:
+        results = list(executor.map(allocate_many, [path] * 4, range(4)))
+
+    cidrs = [netaddr.IPNetwork(cidr) for result in results for cidr in result]
+    assert len(cidrs) == 80
+    assert netaddr.IPSet(cidrs).size == sum(cidr.size for cidr in cidrs)
+
+
+@pytest.fixture
+def preview(mocks):
+    pulumi.runtime.set_mocks(mocks, preview=True)
+    return mocks
+
+
+def fleet_args(*names):
+    return {
+        "vpcs": [
+            {
+                "name": name,
+                "cidrs": {
+                    "ipv4": [{"ipam_pool_id": "pool-v4", "size": 16}],
+                    "ipv6": [{"ipam_pool_id": "pool-v6", "size": 56}],
+                },
+                "subnets": [
+                    {"name": "a", "az_id": 1, "ipv4": {"size": 24}, "ipv6": {}}
+                ],
+            }
+            for name in names
+        ]
+    }
+
+
+@pulumi.runtime.test
+def test_preview_shows_subnets_of_simulated_blocks(preview, facts_cache, local_ipam):
+    fleet = VPCFleet("fleet", fleet_args("one", "two"))
+    other = VPCFleet("other", fleet_args("two"))
+    plans = {name: vpc.resource_plan.resources for name, vpc in fleet.vpcs.items()}
+    subnet = plans["two"]["subnet:a"].inputs
+    assert subnet["cidr_block"] == "10.1.0.0/24"
+    assert subnet["ipv6_cidr_block"] == "2600:1f14:0:100::/64"
+    # the VPC CIDRs are still left to AWS IPAM
+    assert plans["two"]["vpc"].inputs["cidr_block"] is None
+    assert plans["two"]["vpc"].inputs["ipv4_netmask_length"] == 16
+    assert plans["two"]["ipv6_cidr:0"].inputs["ipv6_cidr_block"] is None
+    # members of different fleets are different owners
+    primary = other.vpcs["two"].config.primary_cidr
+    assert primary.allocated_cidr == ip_network("10.2.0.0/16")
+
+    # a second run of the same stack gets the same blocks
+    owner = f"{pulumi.get_project()}/{pulumi.get_stack()}/fleet/two/ipv4/0"
+    reopened = LocalIpamAllocator(local_ipam.path)
+    assert reopened.allocate("pool-v4", owner, 16) == "10.1.0.0/16"
+
+
+@pulumi.runtime.test
+def test_update_leaves_the_block_to_aws_ipam(mocks, facts_cache, local_ipam):
+    fleet = VPCFleet("fleet", fleet_args("one"))
+    resources = fleet.vpcs["one"].resource_plan.resources
+    assert resources["vpc"].inputs["cidr_block"] is None
+    assert resources["vpc"].inputs["ipv4_netmask_length"] == 16
+    assert isinstance(resources["subnet:a"].inputs["cidr_block"], SubnetCidr)
+    assert (
+        json.loads(local_ipam.path.read_text())["pools"]["pool-v4"]["allocations"] == {}
+    )
+
+    def check(args):
+        vpc = mocks.resources["aws-native:ec2:Vpc::fleet-one-vpc"]
+        assert "cidrBlock" not in vpc.inputs
+        assert vpc.inputs["ipv4IpamPoolId"] == "pool-v4"
+
+    vpc = fleet.vpcs["one"]
+    return pulumi.Output.all(vpc.vpc_id, vpc.subnets["a"].subnet.id).apply(check)
+
+
+def test_preview_and_update_send_the_same_vpc_inputs(mocks, facts_cache, local_ipam):
+    plans = []
+    for preview in (True, False):
+        pulumi.runtime.set_mocks(mocks, preview=preview)
+        plans.append(VPCFleet("fleet", fleet_args("one")).vpcs["one"].resource_plan)
+    previewed, updated = plans
+
+    assert previewed.resources.keys() == updated.resources.keys()
+    for key, resource in previewed.resources.items():
+        inputs = dict(updated.resources[key].inputs)
+        if key.startswith("subnet:"):
+            # only subnets get CIDRs of the simulated block
+            assert isinstance(inputs.pop("cidr_block"), SubnetCidr)
+            assert isinstance(inputs.pop("ipv6_cidr_block"), SubnetCidr)
+            assert resource.inputs["cidr_block"] == "10.0.0.0/24"
+            inputs.update(
+                cidr_block=resource.inputs["cidr_block"],
+                ipv6_cidr_block=resource.inputs["ipv6_cidr_block"],
+            )
+        assert resource.inputs == inputs, key
@@ -0,0 +1,123 @@
+from pulumi_aws_vpc import VPC, lookups
+import json
+import pulumi
+import pytest
+import time
+
+
+@pytest.fixture
+def vpc_args_defaults():
+    # only the subnet needs facts, tests add their own next hop lookups
+    return {
+        "subnets": [{"name": "a", "az_id": 1, "ipv4": {"size": 24}}],
+        "route_tables": [],
+        "endpoints": [],
+    }
+
+
+@pulumi.runtime.test
+def test_facts_are_shared_across_components(mocks, facts_cache, vpc_args):
+    VPC("vpc1", vpc_args("vpc1"))
+    VPC("vpc2", vpc_args("vpc2"))
+
+    assert mocks.invoked(mocks.AZ_TOKEN) == 1
+    assert mocks.invoked(mocks.REGION_TOKEN) == 1
+    assert facts_cache.invokes == 2
+
+
+@pulumi.runtime.test
+def test_default_region_is_looked_up_again_for_a_new_stack_run(
+    mocks, facts_cache, monkeypatch
+):
+    component = pulumi.ComponentResource("test:index:Component", "c")
+    assert facts_cache.get_region(component) == "eu-central-1"
+    assert facts_cache.get_region(component) == "eu-central-1"
+    assert mocks.invoked(mocks.REGION_TOKEN) == 1
+
+    monkeypatch.setattr(pulumi, "get_stack", lambda: "other")
+    facts_cache.get_region(component)
+    assert mocks.invoked(mocks.REGION_TOKEN) == 2
+
+
+@pulumi.runtime.test
+def test_facts_disk_cache(mocks, tmp_path):
+    component = pulumi.ComponentResource("test:index:Component", "c")
+    assert lookups.FactsCache(cache_dir=tmp_path).get_az_ids(component) == [
+        "euc1-az2",
+        "euc1-az3",
+        "euc1-az1",
+    ]
+
+    cache = lookups.FactsCache(cache_dir=tmp_path)
+    cache.get_az_ids(component)
+    assert mocks.invoked(mocks.AZ_TOKEN) == 1
+    assert cache.invokes == 1  # region only
+
+    cache_file = tmp_path / lookups.CACHE_FILE_NAME
+    data = json.loads(cache_file.read_text())
+    data["az_ids"]["eu-central-1"]["expires"] = time.time() - 1
+    cache_file.write_text(json.dumps(data))
+    lookups.FactsCache(cache_dir=tmp_path).get_az_ids(component)
+    assert mocks.invoked(mocks.AZ_TOKEN) == 2
+
+
+@pulumi.runtime.test
+def test_facts_offline_fixture(mocks, tmp_path, monkeypatch, vpc_args):
+    fixture = tmp_path / "facts.json"
+    fixture.write_text(
+        json.dumps({"region": "us-east-1", "az_ids": {"us-east-1": ["use1-az4"]}})
+    )
+    monkeypatch.setenv(lookups.OFFLINE_FIXTURE_ENV_VAR, str(fixture))
+    monkeypatch.setattr(lookups, "facts_cache", lookups.FactsCache.from_env())
+
+    vpc = VPC("vpc", vpc_args("offline"))
+
+    assert vpc.region == "us-east-1"
+    assert vpc.get_az_id_prefix() == "use1-az"
+    assert mocks.calls == []
+
+
+@pulumi.runtime.test
+def test_reference_lookups_are_deduplicated(mocks, facts_cache, vpc_args):
+    routes = [
+        {"destination": "10.30.0.0/24", "next_hop": "pcx@tag:Name=A,tag:Env=dev"},
+        {"destination": "10.31.0.0/24", "next_hop": "pcx@tag:Env=dev, tag:Name=A"},
+        {"destination": "10.40.0.0/24", "next_hop": "pcx@ssm:/peering/id"},
+        {"destination": "10.41.0.0/24", "next_hop": "pcx@ssm: /peering/id"},
+    ]
+    route_tables = [
+        {"name": "rt1", "routes": routes},
+        {"name": "rt2", "routes": routes[:1]},
+    ]
+    vpc = VPC("vpc", vpc_args("pcx", route_tables=route_tables))
+    VPC("vpc2", vpc_args("pcx2", route_tables=route_tables))
+
+    assert (vpc.lookups.hits, vpc.lookups.misses) == (3, 2)
+
+    def check(ids):
+        assert ids == ["pcx-0filter", "pcx-0filter", "pcx-0ssm", "pcx-0ssm"]
+        assert mocks.invoked(mocks.PEERING_TOKEN) == 1
+        assert mocks.invoked(mocks.SSM_TOKEN) == 1
+
+    route_ids = [
+        route.vpc_peering_connection_id
+        for route in vpc.route_tables["rt1"].routes.values()
+    ]
+    return pulumi.Output.all(*route_ids).apply(check)
+
+
+@pulumi.runtime.test
+def test_shared_lookups_start_empty_for_a_new_stack_run(
+    mocks, facts_cache, monkeypatch, vpc_args
+):
+    route = {"destination": "10.30.0.0/24", "next_hop": "pcx@ssm:/peering/id"}
+    route_tables = [{"name": "rt", "routes": [route]}]
+    VPC("vpc", vpc_args("pcx", route_tables=route_tables))
+    monkeypatch.setattr(pulumi, "get_stack", lambda: "other")
+    vpc = VPC("vpc2", vpc_args("pcx2", route_tables=route_tables))
+
+    assert (vpc.lookups.hits, vpc.lookups.misses) == (0, 1)
+    assert list(lookups.ReferenceLookups.shared_run or ())[:2] == [
+        pulumi.get_project(),
+        "other",
+    ]
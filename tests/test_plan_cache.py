@@ -0,0 +1,128 @@
+import importlib.metadata
+import marshal
+import zlib
+
+from pulumi_aws_vpc import VPC, plan_cache
+from pulumi_aws_vpc.config import VPCConfig
+from pulumi_aws_vpc.plan_cache import FORMAT, PlanCache, dumps_plan, loads_plan
+import pulumi
+import pytest
+
+
+@pytest.fixture
+def vpc_args_defaults():
+    return {
+        "subnets": [
+            {"name": "a", "az_id": 1, "ipv4": {"size": 24}, "ipv6": {}},
+            {"name": "b", "az_id": 2, "ipv4": {"size": 24}, "route_table": "rt"},
+        ],
+        "route_tables": [
+            {
+                "name": "rt",
+                "prefix_list_threshold": 2,
+                "routes": [
+                    {"destination": "0.0.0.0/0", "next_hop": "igw"},
+                    {"destination": "172.16.0.0/24", "next_hop": "tgw-1"},
+                    {"destination": "172.17.0.0/24", "next_hop": "tgw-1"},
+                    {"destination": "subnet@a.ipv6", "next_hop": "pcx@ssm:/peering"},
+                ],
+            },
+        ],
+    }
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch) -> PlanCache:
+    cache = PlanCache(tmp_path)
+    monkeypatch.setattr(plan_cache, "plan_cache", cache)
+    return cache
+
+
+def test_plan_round_trip(vpc_args):
+    plan = VPC.plan(vpc_args())
+
+    assert loads_plan(dumps_plan(plan)) == plan
+
+
+@pulumi.runtime.test
+def test_vpc_reuses_cached_plan(mocks, facts_cache, cache, vpc_args):
+    first = VPC("first", vpc_args())
+    second = VPC("second", vpc_args(), resource_prefix="second")
+    third = VPC("third", vpc_args(), resource_prefix="second")
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert third.resource_plan == second.resource_plan
+    assert third.resource_plan is not second.resource_plan
+    assert first.resource_plan.resources["vpc"].name == "vpc"
+
+    def check(_):
+        route = mocks.resources["aws-native:ec2:Route::second-rt_a.ipv6"]
+        assert route.inputs["vpcPeeringConnectionId"] == "pcx-0ssm"
+        assert route.inputs["destinationIpv6CidrBlock"].endswith("::/64")
+
+    return third.route_tables["rt"].routes["subnet@a.ipv6"].id.apply(check)
+
+
+def test_cache_key_follows_normalized_config(vpc_args):
+    cache = PlanCache()
+    config = VPCConfig.model_validate(vpc_args())
+    # same config spelled differently, az_id normalizes to an int
+    respelled = VPCConfig.model_validate(
+        vpc_args(
+            subnets=[
+                {"name": "a", "az_id": 1, "ipv4": {"size": 24}, "ipv6": {"size": 64}},
+                {"name": "b", "az_id": 2, "ipv4": {"size": 24}, "route_table": "rt"},
+            ]
+        )
+    )
+
+    assert cache.key(config) == cache.key(respelled)
+    assert cache.key(config) != cache.key(config, resource_prefix="x")
+    assert cache.key(config) != cache.key(VPCConfig.model_validate(vpc_args("other")))
+
+
+def test_cache_key_follows_package_version(monkeypatch, vpc_args):
+    config = VPCConfig.model_validate(vpc_args())
+    key = PlanCache().key(config)
+    monkeypatch.setattr(importlib.metadata, "version", lambda name: "99.0.0")
+
+    assert PlanCache().key(config) != key
+
+
+def test_cache_evicts_least_recently_used(tmp_path, vpc_args):
+    configs = [VPCConfig.model_validate(vpc_args(f"vpc-{i}")) for i in range(4)]
+    entry_size = len(dumps_plan(VPC.plan(vpc_args())))
+    cache = PlanCache(tmp_path, max_bytes=entry_size * 2 + entry_size // 2)
+
+    cache.get_or_plan(configs[0])
+    cache.get_or_plan(configs[1])
+    cache.get_or_plan(configs[0])
+    cache.get_or_plan(configs[2])
+
+    assert sorted(path.stem for path in tmp_path.glob("*.plan")) == sorted(
+        cache.key(config) for config in (configs[0], configs[2])
+    )
+
+    (tmp_path / f"{cache.key(configs[2])}.plan").write_bytes(b"garbage")
+    assert cache.get_or_plan(configs[2]) == VPC.plan(vpc_args("vpc-2"))
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+@pytest.mark.parametrize(
+    "markers",
+    [
+        # marker paths into inputs the entry doesn't have
+        ((("missing", "key"), (0, "vpc", "id")),),
+        ((("inputs", 0), (0, "vpc", "id")),),
+        (((), (0, "vpc", "id")),),
+    ],
+)
+def test_malformed_entry_is_a_miss(tmp_path, markers, vpc_args):
+    cache = PlanCache(tmp_path)
+    config = VPCConfig.model_validate(vpc_args())
+    row = ("vpc", "aws-native:ec2:Vpc", "vpc", 0, {"inputs": []}, markers)
+    data = FORMAT + zlib.compress(marshal.dumps([row]))
+    (tmp_path / f"{cache.key(config)}.plan").write_bytes(data)
+
+    assert cache.get_or_plan(config) == VPC.plan(vpc_args())
+    assert (cache.hits, cache.misses) == (0, 1)
@@ -0,0 +1,120 @@
+from pulumi_aws_vpc import VPC
+from pulumi_aws_vpc.planner import Lookup, Ref, SubnetCidr
+import json
+import time
+
+
+def test_plan_without_engine(vpc_args):
+    start = time.perf_counter()
+    plan = VPC.plan(vpc_args())
+    assert time.perf_counter() - start < 0.5
+
+    resources = plan.resources
+    assert list(resources) == [
+        "vpc",
+        "ipv6_cidr:0",
+        "subnet:a",
+        "subnet:b",
+        "igw",
+        "igw_attachment",
+        "route_table:rt",
+        "route:rt:0.0.0.0/0",
+        "route:rt:subnet@a.ipv4",
+        "endpoint:s3",
+        "subnet_association:b",
+    ]
+    subnet = resources["subnet:a"]
+    assert subnet.inputs["cidr_block"] == "10.20.0.0/24"
+    assert subnet.inputs["ipv6_cidr_block"] == SubnetCidr(
+        Ref("ipv6_cidr:0", "ipv6_cidr_block"), (64,), 0
+    )
+    assert subnet.inputs["availability_zone_id"] == Lookup("az_id", "1")
+    # the VPC and the IPv6 CIDR are already dependencies through the inputs
+    assert subnet.depends_on == ()
+    route = resources["route:rt:subnet@a.ipv4"]
+    assert route.parent == "route_table:rt"
+    assert route.inputs["destination_cidr_block"] == Ref("subnet:a", "cidr_block")
+    assert route.inputs["vpc_peering_connection_id"] == Lookup(
+        "vpc_peering_connection_id", "ssm:/peering"
+    )
+    assert resources["endpoint:s3"].inputs["service_name"] == Lookup(
+        "service_name", "s3"
+    )
+
+
+def test_plan_with_facts(vpc_args):
+    plan = VPC.plan(
+        vpc_args(),
+        resource_prefix="x",
+        region="eu-central-1",
+        az_ids=["euc1-az2", "euc1-az3", "euc1-az1"],
+    )
+    resources = plan.resources
+
+    assert resources["subnet:a"].name == "x-a"
+    assert resources["subnet:a"].inputs["availability_zone_id"] == "euc1-az1"
+    assert resources["ipv6_cidr:0"].inputs["ipv6_cidr_block_network_border_group"] == (
+        "eu-central-1"
+    )
+    assert resources["endpoint:s3"].inputs["service_name"] == (
+        "com.amazonaws.eu-central-1.s3"
+    )
+
+    rendered = json.loads(json.dumps(plan.to_dict()))["resources"]
+    route = next(r for r in rendered if r["key"] == "route:rt:subnet@a.ipv4")
+    assert route["inputs"]["destination_cidr_block"] == "${subnet:a.cidr_block}"
+    assert route["delete_before_replace"] is True
+    subnet = next(r for r in rendered if r["key"] == "subnet:a")
+    assert subnet["inputs"]["ipv6_cidr_block"] == "${ipv6_cidr:0.ipv6_cidr_block[0]}/64"
+
+
+def test_prefix_lists_are_capped_at_max_entries(vpc_args):
+    routes = [
+        {"destination": f"172.{16 + i // 256}.{i % 256}.0/24", "next_hop": "vgw-0123"}
+        for i in range(2500)
+    ]
+    plan = VPC.plan(
+        vpc_args(
+            route_tables=[{"name": "rt", "routes": routes, "prefix_list_threshold": 2}]
+        )
+    )
+
+    prefix_lists = [
+        r for key, r in plan.resources.items() if key.startswith("prefix_list:")
+    ]
+    assert [r.inputs["max_entries"] for r in prefix_lists] == [1000, 1000, 500]
+    assert len({r.name for r in prefix_lists}) == 3
+    assert prefix_lists[1].inputs["entries"][0] == {"cidr": "172.19.232.0/24"}
+    routes = [key for key in plan.resources if key.startswith("route:")]
+    assert routes == [
+        "route:rt:vgw-0123_ipv4_pl",
+        "route:rt:vgw-0123_ipv4_pl_1",
+        "route:rt:vgw-0123_ipv4_pl_2",
+    ]
+
+
+def test_shared_prefix_list_name_only_depends_on_its_cidrs(vpc_args):
+    onprem = [
+        {"destination": f"172.16.{i}.0/24", "next_hop": "vgw-0123"} for i in range(4)
+    ]
+
+    def prefix_lists(*route_tables):
+        plan = VPC.plan(
+            vpc_args(
+                route_tables=[
+                    {"name": name, "routes": routes, "prefix_list_threshold": 2}
+                    for name, routes in route_tables
+                ]
+            )
+        )
+        return {
+            key: r.name
+            for key, r in plan.resources.items()
+            if key.startswith("prefix_list:")
+        }
+
+    both = prefix_lists(("other", onprem), ("rt", onprem[::-1]))
+    assert len(both) == 1
+    # the route table that asked first is removed or moved
+    assert prefix_lists(("rt", onprem)) == both
+    assert prefix_lists(("rt", onprem), ("other", onprem)) == both
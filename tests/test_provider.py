@@ -0,0 +1,70 @@
+from typing import Optional, TypedDict
+
+from pulumi.provider.experimental.component import ComponentProvider
+from pulumi_aws_vpc import VPC
+from pulumi_aws_vpc.args import SubnetArgs
+from pulumi_aws_vpc.provider import CachedComponentProvider, schema_sources
+import pulumi
+
+
+class NestedArgs(TypedDict):
+    subnets: Optional[list[SubnetArgs]]
+
+
+class Component(pulumi.ComponentResource):
+    def __init__(self, name: str, args: NestedArgs) -> None:
+        super().__init__("test:index:Component", name)
+
+
+def test_schema_sources():
+    assert {path.name for path in schema_sources([VPC])} == {"vpc.py", "args.py"}
+    # modules of nested args types count too
+    sources = {path.name for path in schema_sources([Component])}
+    assert sources == {"test_provider.py", "args.py"}
+
+
+def test_cached_schema_matches_inferred_schema(tmp_path):
+    reference = ComponentProvider([VPC], "aws-networking")
+
+    cold = CachedComponentProvider([VPC], "aws-networking", cache_dir=tmp_path)
+    warm = CachedComponentProvider([VPC], "aws-networking", cache_dir=tmp_path)
+
+    assert not cold.cache_hit and cold.analyzed
+    assert warm.cache_hit and not warm.analyzed
+    assert warm.cache_file.suffix == ".json"
+    warm.analyze()
+    for provider in (cold, warm):
+        assert provider.schema == reference.schema
+        assert provider._component_defs == reference._component_defs
+        assert provider._type_defs == reference._type_defs
+
+
+def test_invalid_cache_is_a_miss(tmp_path):
+    provider = CachedComponentProvider([VPC], "aws-networking", cache_dir=tmp_path)
+    provider.cache_file.write_text("not json")
+
+    rebuilt = CachedComponentProvider([VPC], "aws-networking", cache_dir=tmp_path)
+
+    assert not rebuilt.cache_hit
+    assert rebuilt.schema == provider.schema
+
+
+def test_cache_is_keyed_by_provider_metadata(tmp_path):
+    first = CachedComponentProvider([VPC], "aws-networking", cache_dir=tmp_path)
+    second = CachedComponentProvider(
+        [VPC], "aws-networking", version="1.0.0", cache_dir=tmp_path
+    )
+
+    assert first.cache_file != second.cache_file
+    assert not second.cache_hit
+    assert [path.name for path in tmp_path.iterdir()] == [second.cache_file.name]
+
+
+def test_unwritable_cache_dir(tmp_path):
+    cache_dir = tmp_path / "file"
+    cache_dir.write_text("")
+
+    provider = CachedComponentProvider([VPC], "aws-networking", cache_dir=cache_dir)
+
+    assert not provider.cache_hit
+    assert provider.schema == ComponentProvider([VPC], "aws-networking").schema
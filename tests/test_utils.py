@@ -1,5 +1,12 @@
-from pulumi_aws_vpc.utils import divide_supernet_into_subnets
+from pulumi_aws_vpc.allocator import _format_ipv6, iter_ipv6_subnets
+from pulumi_aws_vpc.utils import divide_supernet_into_subnets, fan_out, summarize_routes
+import asyncio
+import ipaddress
+import itertools
+import netaddr
+import pulumi
 import pytest
+import random
 
 
 @pytest.mark.parametrize(
@@ -34,3 +41,184 @@ import pytest
 )
 def test_divide_supernet_into_subnets(supernet, prefix_lengths, expected):
     assert divide_supernet_into_subnets(supernet, prefix_lengths) == expected
+
+
+def _reference_divide_supernet_into_subnets(
+    supernet: str, prefix_lengths: list[int]
+) -> list[str]:
+    """Original list-based algorithm, kept to check the allocator against."""
+    subnets = []
+    free_blocks = [netaddr.IPNetwork(supernet)]
+    for prefix in prefix_lengths:
+        for i, current_block in enumerate(free_blocks):
+            if prefix < current_block.prefixlen:
+                continue
+            subnet = next(current_block.subnet(prefix))
+            subnets.append(str(subnet))
+            free_blocks = (
+                free_blocks[:i]
+                + netaddr.cidr_exclude(current_block, subnet)
+                + free_blocks[i + 1 :]
+            )
+            free_blocks = netaddr.cidr_merge(free_blocks)
+            break
+        else:
+            raise ValueError("No free blocks left to allocate")
+    return subnets
+
+
+@pytest.mark.parametrize(
+    "supernet, prefix_range, count",
+    [
+        ("10.0.0.0/16", (22, 28), 150),
+        ("100.64.0.0/22", (26, 28), 20),
+        ("2001:db8::/44", (52, 64), 500),
+        ("2001:db8:1234::/56", (60, 64), 30),
+    ],
+)
+@pytest.mark.parametrize("seed", range(5))
+# runs of equal prefix lengths, as subnet tiers expand to, are allocated in bulk
+@pytest.mark.parametrize("run_length", [1, 3])
+def test_divide_supernet_into_subnets_matches_reference(
+    supernet, prefix_range, count, seed, run_length
+):
+    rng = random.Random(seed)
+    prefix_lengths = [
+        prefix
+        for prefix in (rng.randint(*prefix_range) for _ in range(count // run_length))
+        for _ in range(run_length)
+    ]
+    try:
+        expected = _reference_divide_supernet_into_subnets(supernet, prefix_lengths)
+    except ValueError:
+        with pytest.raises(ValueError):
+            divide_supernet_into_subnets(supernet, prefix_lengths)
+    else:
+        assert divide_supernet_into_subnets(supernet, prefix_lengths) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_iter_ipv6_subnets_matches_allocator(seed):
+    rng = random.Random(seed)
+    # largest subnets first, the only order bump allocation leaves no gaps in
+    prefix_lengths = sorted(rng.randint(52, 64) for _ in range(500))
+    expected = _reference_divide_supernet_into_subnets("2001:db8::/44", prefix_lengths)
+    assert list(iter_ipv6_subnets("2001:db8::/44", prefix_lengths)) == expected
+    assert divide_supernet_into_subnets("2001:db8::/44", prefix_lengths) == expected
+
+
+def test_iter_ipv6_subnets_is_lazy():
+    subnets = iter_ipv6_subnets("2600:1f14::/0", itertools.repeat(64))
+    assert list(itertools.islice(subnets, 2)) == ["::/64", "0:0:0:1::/64"]
+
+    nibble = iter_ipv6_subnets("2600:1f14::/40", [56, 62, 63, 61], nibble_aligned=True)
+    assert list(nibble) == [
+        "2600:1f14::/56",
+        "2600:1f14:0:100::/62",
+        "2600:1f14:0:110::/63",
+        "2600:1f14:0:120::/61",
+    ]
+
+    with pytest.raises(ValueError, match="No free blocks"):
+        list(iter_ipv6_subnets("2001:db8::/62", [64, 63, 63]))
+    with pytest.raises(ValueError, match="must be between 62 and 128"):
+        next(iter_ipv6_subnets("2001:db8::/62", [60]))
+
+
+def test_format_ipv6_matches_ipaddress():
+    rng = random.Random(0)
+    values = [0, 1 << 64, 1 << 127, 0x20010DB8 << 96, 0x20010000000000010000 << 48]
+    values += [rng.getrandbits(64) << 64 for _ in range(200)]
+    values += [rng.getrandbits(128) for _ in range(200)]
+    for value in values:
+        assert _format_ipv6(value) == str(ipaddress.IPv6Address(value))
+
+
+@pytest.mark.parametrize(
+    "supernet, prefix_lengths",
+    [
+        ("10.10.10.0/24", [25, 25, 26]),
+        ("10.10.10.0/24", [23]),
+        ("10.10.10.0/24", [33]),
+    ],
+)
+def test_divide_supernet_into_subnets_no_space(supernet, prefix_lengths):
+    with pytest.raises(ValueError):
+        divide_supernet_into_subnets(supernet, prefix_lengths)
+
+
+@pulumi.runtime.test
+def test_fan_out(mocks):
+    source = pulumi.Output.from_input(["a", "b", "c"]).apply(lambda v: v)
+    items = fan_out(source, 3)
+    return pulumi.Output.all(*items).apply(lambda v: assert_equal(v, ["a", "b", "c"]))
+
+
+@pulumi.runtime.test
+def test_fan_out_unknown(mocks):
+    source = pulumi.Output(set(), _resolved(None), _resolved(False))
+    items = fan_out(source, 2)
+
+    async def check():
+        assert [await item.is_known() for item in items] == [False, False]
+
+    return pulumi.Output.from_input(asyncio.ensure_future(check()))
+
+
+async def _resolved(value):
+    return value
+
+
+def assert_equal(actual, expected):
+    assert actual == expected
+
+
+def _longest_prefix_match(routes, address):
+    best = None
+    for destination, next_hop in routes:
+        network = ipaddress.ip_network(destination)
+        if address in network and (best is None or network.prefixlen > best[0]):
+            best = (network.prefixlen, next_hop)
+    return best[1] if best else None
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_summarize_routes_keeps_forwarding(seed):
+    rng = random.Random(seed)
+    routes = {}
+    for _ in range(rng.randint(5, 60)):
+        prefixlen = rng.randint(16, 26)
+        address = rng.getrandbits(prefixlen - 16) << (32 - prefixlen)
+        network = ipaddress.IPv4Network((0x0A000000 + address, prefixlen))
+        routes[str(network)] = rng.choice(["vgw", "tgw-1", "eni-1"])
+    routes = list(routes.items())
+
+    summarized = summarize_routes(routes)
+
+    assert len(summarized) <= len(routes)
+    for block in ipaddress.ip_network("10.0.0.0/16").subnets(new_prefix=26):
+        address = block.network_address
+        assert _longest_prefix_match(summarized, address) == _longest_prefix_match(
+            routes, address
+        )
+
+
+def test_summarize_routes():
+    routes = [
+        ("pl-0123456789", "vgw"),
+        ("10.1.0.0/24", "vgw"),
+        ("10.1.1.0/24", "vgw"),
+        ("10.1.2.0/23", "vgw"),
+        ("10.1.4.0/24", "vgw"),
+        ("2001:db8::/33", "tgw-1"),
+        ("2001:db8:8000::/33", "tgw-1"),
+        ("192.168.0.0/16", "tgw-1"),
+        ("192.168.0.0/24", "tgw-1"),
+    ]
+    assert summarize_routes(routes) == [
+        ("10.1.0.0/22", "vgw"),
+        ("10.1.4.0/24", "vgw"),
+        ("192.168.0.0/16", "tgw-1"),
+        ("2001:db8::/32", "tgw-1"),
+        ("pl-0123456789", "vgw"),
+    ]
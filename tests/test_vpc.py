@@ -0,0 +1,276 @@
+from pulumi_aws_vpc import VPC
+from pulumi_aws_vpc.planner import SubnetCidr
+from pulumi_aws_vpc.utils import divide_supernet_into_subnets
+import json
+import pulumi
+import pytest
+
+
+@pytest.fixture
+def vpc_args_defaults():
+    return {
+        "cidrs": {
+            "ipv4": [{"cidr": "10.20.0.0/16"}, {"cidr": "100.64.0.0/26"}],
+            "ipv6": [{}],
+        },
+        "subnets": [
+            {"name": "int-az1", "az_id": 1, "ipv4": {"size": 24}, "ipv6": {}},
+            {
+                "name": "ext-az1",
+                "az_id": 1,
+                "ipv4": {"size": 25},
+                "route_table": "public",
+            },
+            {"name": "int-az2", "az_id": "euc1-az2", "ipv4": {"size": 24}},
+            {"name": "attach-az1", "az_id": 1, "ipv4": {"size": 28, "cidr_num": 2}},
+        ],
+        "route_tables": [
+            {
+                "name": "public",
+                "routes": [{"destination": "0.0.0.0/0", "next_hop": "igw"}],
+            },
+        ],
+        "endpoints": [],
+    }
+
+
+@pulumi.runtime.test
+def test_subnet_cidrs_allocated_at_config_time_for_literal_vpc_cidrs(mocks, vpc_args):
+    vpc = VPC("vpc", vpc_args())
+    subnets = {
+        key.removeprefix("subnet:"): planned.inputs
+        for key, planned in vpc.resource_plan.resources.items()
+        if key.startswith("subnet:")
+    }
+
+    assert subnets["int-az1"]["cidr_block"] == "10.20.0.0/24"
+    assert subnets["ext-az1"]["cidr_block"] == "10.20.1.0/25"
+    assert subnets["int-az2"]["cidr_block"] == "10.20.2.0/24"
+    assert subnets["attach-az1"]["cidr_block"] == "100.64.0.0/28"
+    # Amazon provided IPv6 block is only known after apply
+    assert isinstance(subnets["int-az1"]["ipv6_cidr_block"], SubnetCidr)
+
+    def check(_):
+        subnet = mocks.resources["aws-native:ec2:Subnet::ext-az1"]
+        assert subnet.inputs["cidrBlock"] == "10.20.1.0/25"
+        assert subnet.inputs["availabilityZoneId"] == "euc1-az1"
+
+    return vpc.subnets["ext-az1"].subnet.id.apply(check)
+
+
+@pulumi.runtime.test
+def test_subnet_cidrs_allocated_from_amazon_provided_ipv6(mocks, vpc_args):
+    vpc = VPC(
+        "vpc",
+        vpc_args(
+            subnets=[
+                {"name": "a", "az_id": 1, "ipv6": {}},
+                {"name": "b", "az_id": 2, "ipv6": {"size": 60}},
+                {"name": "c", "az_id": 3, "ipv6": {}},
+            ]
+        ),
+    )
+    subnets = [vpc.subnets[name].subnet for name in "abc"]
+
+    def check(args):
+        vpc_cidr, *cidrs = args
+        assert cidrs == divide_supernet_into_subnets(vpc_cidr, [64, 60, 64])
+
+    return pulumi.Output.all(
+        vpc.ipv6_cidr_associations[0].ipv6_cidr_block,
+        *[subnet.ipv6_cidr_block for subnet in subnets],
+    ).apply(check)
+
+
+@pulumi.runtime.test
+def test_route_table_summarize(mocks, facts_cache, vpc_args):
+    routes = [
+        {"destination": f"172.16.{i}.0/24", "next_hop": "vgw-0123"} for i in range(8)
+    ] + [{"destination": "0.0.0.0/0", "next_hop": "igw"}]
+    vpc = VPC(
+        "vpc",
+        vpc_args(
+            route_tables=[
+                {"name": "public", "routes": routes},
+                {"name": "hub", "routes": routes, "summarize": True},
+            ]
+        ),
+    )
+
+    assert len(vpc.route_tables["public"].routes) == 9
+    assert list(vpc.route_tables["hub"].routes) == ["0.0.0.0/0", "172.16.0.0/21"]
+
+
+@pulumi.runtime.test
+def test_route_table_prefix_lists(mocks, facts_cache, vpc_args):
+    onprem = [
+        {"destination": f"172.16.{i}.0/24", "next_hop": "vgw-0123"}
+        for i in range(0, 16, 2)
+    ]
+    routes = onprem + [{"destination": "0.0.0.0/0", "next_hop": "igw"}]
+    vpc = VPC(
+        "vpc",
+        vpc_args(
+            route_tables=[
+                {"name": "public", "routes": routes, "prefix_list_threshold": 4},
+                {"name": "private", "routes": onprem, "prefix_list_threshold": 4},
+            ]
+        ),
+    )
+
+    assert len(vpc.prefix_lists) == 1
+    assert list(vpc.route_tables["public"].routes) == [
+        "0.0.0.0/0",
+        "vgw-0123_ipv4_pl",
+    ]
+    assert list(vpc.route_tables["private"].routes) == ["vgw-0123_ipv4_pl"]
+
+    prefix_list = next(iter(vpc.prefix_lists.values()))
+    (planned,) = [
+        r for key, r in vpc.resource_plan.resources.items() if key.startswith("prefix")
+    ]
+
+    def check(_):
+        inputs = mocks.resources[f"aws-native:ec2:PrefixList::{planned.name}"].inputs
+        assert inputs["maxEntries"] == 8
+        assert inputs["entries"][0] == {"cidr": "172.16.0.0/24"}
+        assert inputs["addressFamily"] == "IPv4"
+
+    return prefix_list.id.apply(check)
+
+
+@pulumi.runtime.test
+def test_instrumentation(mocks, facts_cache, tmp_path, vpc_args):
+    spans_file = tmp_path / "spans.jsonl"
+    vpc = VPC("vpc", vpc_args(instrumentation={"spans_file": str(spans_file)}))
+
+    summary = vpc.recorder.summary()
+    assert list(summary) == [
+        "plan",
+        "vpc",
+        "secondary_ipv4_cidrs",
+        "ipv6_cidrs",
+        "subnets",
+        "gateways",
+        "route_tables",
+        "endpoints",
+        "route_table_associations",
+    ]
+    assert summary["plan"]["resources"] == 0
+    assert summary["plan"]["duration_ms"] > 0
+    assert summary["vpc"]["resources"] == 1
+    assert summary["subnets"]["resources"] == 4
+    assert summary["subnets"]["invokes"] == 1  # AZ IDs, region was needed for IPv6
+    assert summary["ipv6_cidrs"]["invokes"] == 1
+    assert summary["route_table_associations"]["resources"] == 1
+    assert summary["subnets"]["outputs"] > 0
+
+    spans = [json.loads(line) for line in spans_file.read_text().splitlines()]
+    assert len(spans) == len(summary) + 1
+    assert {span["trace_id"] for span in spans} == {spans[0]["trace_id"]}
+    assert spans[1]["name"] == "vpc.plan"
+    assert spans[5]["name"] == "vpc.subnets"
+    assert spans[5]["parent_span_id"] == spans[0]["span_id"]
+    assert spans[5]["attributes"]["resources"] == 4
+
+    def check(value):
+        assert value == summary
+
+    return vpc.instrumentation.apply(check)
+
+
+@pulumi.runtime.test
+def test_instrumentation_disabled_by_default(mocks, facts_cache, vpc_args):
+    vpc = VPC("vpc", vpc_args())
+    assert vpc.recorder is None
+    assert "instrumentation" not in vpc.outputs
+    assert pulumi.Resource.__init__.__name__ == "__init__"
+
+
+@pulumi.runtime.test
+def test_ec2_backend(mocks, facts_cache, vpc_args):
+    vpc = VPC(
+        "vpc",
+        vpc_args(
+            virtual_private_gateway={},
+            deployment={"backend": "ec2", "backends": {"Vpc": "cloudcontrol"}},
+        ),
+    )
+    types = {planned.type for planned in vpc.resource_plan.resources.values()}
+
+    assert types == {
+        "aws-native:ec2:Vpc",
+        "aws:ec2:VpcIpv4CidrBlockAssociation",
+        "aws:ec2:VpcIpv6CidrBlockAssociation",
+        "aws:ec2:Subnet",
+        "aws:ec2:InternetGateway",
+        "aws:ec2:InternetGatewayAttachment",
+        "aws:ec2:VpnGateway",
+        "aws:ec2:VpnGatewayAttachment",
+        "aws:ec2:RouteTable",
+        "aws:ec2:Route",
+        "aws:ec2:RouteTableAssociation",
+    }
+
+    def check(args):
+        ipv6_cidr, *_ = args
+        subnet = mocks.resources["aws:ec2/subnet:Subnet::int-az1"]
+        assert subnet.inputs["cidrBlock"] == "10.20.0.0/24"
+        assert subnet.inputs["ipv6CidrBlock"] == ipv6_cidr.replace("/56", "/64")
+        assert subnet.inputs["tags"] == {"Name": "test-int-az1"}
+        route = mocks.resources["aws:ec2/route:Route::public_0.0.0.0/0"]
+        assert route.inputs["gatewayId"] == "igw-id"
+        vgw = mocks.resources["aws:ec2/vpnGateway:VpnGateway::vgw"]
+        assert "type" not in vgw.inputs
+        assert vgw.inputs["amazonSideAsn"] == "64512"
+
+    return pulumi.Output.all(
+        vpc.cidrs["ipv6"][0],
+        vpc.subnets["int-az1"].subnet.id,
+        vpc.route_tables["public"].routes["0.0.0.0/0"].id,
+        vpc.virtual_private_gateway.vgw.id,
+    ).apply(check)
+
+
+@pulumi.runtime.test
+def test_network_output(mocks, facts_cache, vpc_args):
+    vpc = VPC(
+        "vpc",
+        vpc_args(
+            subnet_tiers=[
+                {"name": "db-az{az}", "az_ids": [1, 2], "ipv4": {"size": 26}},
+            ],
+            egress_only_internet_gateway={},
+            endpoints=[
+                {
+                    "name": "s3",
+                    "service": "s3",
+                    "type": "Gateway",
+                    "route_tables": ["public"],
+                }
+            ],
+        ),
+    )
+    assert vpc.outputs["network"] is vpc.network
+
+    def check(network):
+        assert network["vpc"]["id"] == "vpc-id"
+        # the primary CIDR is listed once
+        assert network["vpc"]["cidrs"]["ipv4"] == ["10.20.0.0/16", "100.64.0.0/26"]
+        [ipv6_cidr] = network["vpc"]["cidrs"]["ipv6"]
+        assert ipv6_cidr.endswith("::/56")
+        assert network["subnets"]["ext-az1"] == {
+            "id": "ext-az1-id",
+            "az_id": "euc1-az1",
+            "ipv4_cidr": "10.20.1.0/25",
+            "ipv6_cidr": None,
+            "route_table": "public",
+            "tier": None,
+        }
+        assert network["subnets_by_tier"] == {"db-az": ["db-az1-id", "db-az2-id"]}
+        assert network["subnets_by_az"]["euc1-az2"] == ["int-az2-id", "db-az2-id"]
+        assert network["route_tables"] == {"public": "public-id"}
+        assert network["gateways"] == {"igw": "igw-id", "eigw": "eigw-id"}
+        assert network["endpoints"] == {"s3": "s3-id"}
+
+    return vpc.network.apply(check)